@@ -8,11 +8,13 @@ from routes.itinerary import itinerary_bp
 from routes.trips import trips_bp
 from routes.saved_destinations import saved_destinations_bp
 from routes.user import user_bp
+from routes.metrics import metrics_bp
+from middleware import http_caching, compression, request_metrics
 
 load_dotenv()
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}})
+CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=["X-Deck-Cursor", "Server-Timing"])
 
 # Register route blueprints
 app.register_blueprint(destinations_bp)
@@ -21,6 +23,13 @@ app.register_blueprint(itinerary_bp)
 app.register_blueprint(trips_bp)
 app.register_blueprint(saved_destinations_bp)
 app.register_blueprint(user_bp)
+app.register_blueprint(metrics_bp)
+
+# Response middleware (after_request handlers run in reverse: compression, then
+# caching, then request metrics, which sees the final response)
+request_metrics.init_app(app)
+http_caching.init_app(app)
+compression.init_app(app)
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
@@ -0,0 +1,65 @@
+# Gunicorn settings for the Flask API (used by the Dockerfile: gunicorn -c gunicorn.conf.py app:app)
+#
+# Itinerary and question requests block for many seconds in Gemini calls, so we use
+# threaded workers: a slow LLM call ties up one thread, not a whole worker, and the
+# cheap destination/trip reads keep flowing on the other threads.
+# Every value can be overridden with the GUNICORN_* environment variables below.
+import multiprocessing
+import os
+import glob
+import tempfile
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '5001')}")
+
+# gthread by default; "gevent" also works if gevent is installed in the image
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+# Work is mostly waiting on Supabase/Gemini, so a modest number of processes with
+# many threads each goes further than many single-threaded processes
+workers = int(os.environ.get("GUNICORN_WORKERS", min(cpu_count * 2 + 1, 8)))
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+
+# The Gemini rate limiter keeps its buckets per process, so each worker takes
+# its share of the configured quota (services/gemini_client.py)
+os.environ.setdefault("GEMINI_RATE_LIMIT_PROCESSES", str(workers))
+
+# gevent ignores `threads` and uses this instead
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 200))
+
+# Long enough for the slowest itinerary generation; the sync default of 30s
+# would kill a worker in the middle of a multi-week plan
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 180))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Optional worker recycling (off by default). A recycling worker stops accepting
+# while it drains, and with multi-second LLM calls in flight that shows up as
+# stalls on the fast endpoints, so only turn this on to contain a known leak.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 0))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+# Prometheus metrics from every worker are written to this directory and merged
+# by /metrics, whichever worker serves the scrape. Set before the app is imported.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "bucketgem_prometheus")
+)
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be summed into the new one
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(metrics_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(metrics_dir, "*.db")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
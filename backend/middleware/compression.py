@@ -0,0 +1,212 @@
+import gzip
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from flask import request
+from middleware.http_caching import cache_policy
+
+# brotli and zstandard are optional: without them we simply negotiate gzip only
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Bodies smaller than this are sent as-is; the headers would eat most of the saving
+MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
+# Upper bound on memory held by cached compressed variants (per worker)
+VARIANT_CACHE_BYTES = int(os.environ.get("COMPRESSION_CACHE_BYTES", 16 * 1024 * 1024))
+
+# Compress streamed responses (SSE / NDJSON) chunk by chunk with gzip
+COMPRESS_STREAMS = os.environ.get("COMPRESSION_STREAMS", "1") == "1"
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output deterministic, so the ETag of the gzip variant is stable
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _available_encoders() -> dict:
+    encoders = {}
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+    if zstandard is not None:
+        encoders["zstd"] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress
+    encoders["gzip"] = _gzip
+    return encoders
+
+
+# Server preference order when the client accepts several encodings equally
+ENCODERS = _available_encoders()
+
+
+class VariantCache:
+    """LRU of compressed bodies keyed by (sha256 of the identity body, encoding), bounded in bytes."""
+
+    def __init__(self, max_bytes: int = VARIANT_CACHE_BYTES):
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._variants = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._variants.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._variants.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body: bytes):
+        if len(body) > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._variants:
+                return
+            self._variants[key] = body
+            self._size += len(body)
+            while self._size > self._max_bytes:
+                _, evicted = self._variants.popitem(last=False)
+                self._size -= len(evicted)
+
+
+variant_cache = VariantCache()
+
+
+def init_app(app):
+    """
+    Register response compression.
+
+    Register this after http_caching: Flask runs after_request handlers in reverse
+    order, so the body is compressed first and the ETag then describes the bytes
+    actually sent (one strong ETag per encoding). A strong ETag a route already
+    set (e.g. a trip's "v3") gets the encoding appended instead ("v3-gzip").
+    """
+    app.after_request(compress_response)
+
+
+def _tag_etag_with_encoding(response, encoding: str):
+    # Strong ETags promise byte-identical bodies, so each encoding needs its own
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+
+
+def strip_encoding_suffix(etag: str) -> str:
+    """Undo _tag_etag_with_encoding: "v3-gzip" -> "v3". Other tags are returned unchanged."""
+    base, _, encoding = etag.rpartition("-")
+    return base if base and encoding in ("br", "zstd", "gzip") else etag
+
+
+def choose_encoding(accept_encodings) -> str:
+    """Pick the best encoding we support from an Accept-Encoding header, or None."""
+    best, best_quality = None, 0
+    for encoding in ENCODERS:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _is_compressible(response) -> bool:
+    return response.mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress_response(response):
+    """Compress the response body according to the client's Accept-Encoding."""
+    if not _is_compressible(response) or "Content-Encoding" in response.headers:
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    # File responses (send_file) are left alone
+    if response.direct_passthrough:
+        return response
+    if response.is_streamed:
+        return _compress_stream(response) if COMPRESS_STREAMS else response
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < MIN_SIZE:
+        return response
+
+    # Only keep variants of bodies every client gets. This runs before http_caching
+    # sets Cache-Control, so ask for the endpoint's policy rather than read the header.
+    cacheable = request.method in ("GET", "HEAD") and cache_policy().startswith("public")
+    key = (hashlib.sha256(body).digest(), encoding) if cacheable else None
+
+    compressed = variant_cache.get(key) if cacheable else None
+    if compressed is None:
+        compressed = ENCODERS[encoding](body)
+        if cacheable:
+            variant_cache.put(key, compressed)
+
+    if len(compressed) >= len(body):
+        return response
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    _tag_etag_with_encoding(response, encoding)
+    return response
+
+
+def _compress_stream(response):
+    """
+    Gzip a streamed body chunk by chunk.
+
+    Each chunk is sync-flushed, so the client can decode every event as soon as
+    it arrives instead of waiting for the compressor's buffer to fill.
+    """
+    if request.accept_encodings["gzip"] <= 0:
+        return response
+
+    chunks = response.response
+
+    def generate():
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                if data:
+                    yield data
+            yield compressor.flush()
+        finally:
+            # Propagate client disconnects to the wrapped generator
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+    response.response = generate()
+    response.headers["Content-Encoding"] = "gzip"
+    response.headers.pop("Content-Length", None)
+    _tag_etag_with_encoding(response, "gzip")
+    return response
@@ -0,0 +1,56 @@
+import hashlib
+from flask import request
+
+
+# Cache-Control per endpoint ("<blueprint>.<view function>").
+# Per-user data is private and always revalidated, so clients keep a copy and
+# get a bodiless 304 until it changes. Randomized listings are never cached.
+CACHE_POLICIES = {
+    'destinations.browse_destinations': 'public, max-age=60',
+    'destinations.random_destinations': 'no-store',
+    'destinations.personalized_destinations': 'no-store',
+    'destinations.destination_cache_stats': 'no-store',
+    'itinerary.itinerary_cache_stats': 'no-store',
+    'itinerary.get_itinerary_job': 'no-store',
+    'itinerary.itinerary_job_stats': 'no-store',
+    'metrics.metrics': 'no-store',
+    'saved_destinations.list_saved': 'private, no-cache',
+    'trips.list_trips': 'private, no-cache',
+    'trips.get_trip_detail': 'private, no-cache',
+}
+
+DEFAULT_CACHE_CONTROL = 'private, no-cache'
+
+
+def init_app(app):
+    """Register conditional-GET handling (ETag / If-None-Match) and Cache-Control headers."""
+    app.after_request(apply_http_caching)
+
+
+def cache_policy() -> str:
+    """Cache-Control policy for the current request's endpoint."""
+    return CACHE_POLICIES.get(request.endpoint, DEFAULT_CACHE_CONTROL)
+
+
+def apply_http_caching(response):
+    """
+    Add Cache-Control and a strong ETag to successful GET responses, and turn the
+    response into a 304 when the client's If-None-Match already has this ETag.
+    """
+    if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+        return response
+
+    # Streams (e.g. Server-Sent Events) have no complete body to hash
+    if response.is_streamed or response.direct_passthrough:
+        return response
+
+    policy = cache_policy()
+    response.headers['Cache-Control'] = policy
+    if 'no-store' in policy:
+        return response
+
+    if not response.get_etag()[0]:
+        # Strong ETag over the exact bytes being sent
+        response.set_etag(hashlib.sha256(response.get_data()).hexdigest()[:32])
+
+    return response.make_conditional(request)
@@ -0,0 +1,126 @@
+import os
+import time
+from collections import OrderedDict
+from flask import g, request
+from services.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_QUEUE_TIME, HTTP_RESPONSE_SIZE
+from services.tracing import request_spans
+
+# Add a Server-Timing header (total, per upstream service and proxy queue time).
+# Off by default because it reveals backend internals to every client.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "0") == "1"
+
+# Log a per-service breakdown for requests slower than this (0 = off)
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", 0))
+
+
+def init_app(app):
+    """
+    Register request timing. Call before the other response middleware so its
+    after_request runs last and sees the final (compressed) response.
+    """
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
+
+
+def _labels() -> tuple:
+    # Unmatched URLs share one label so scanners can't blow up the series count
+    return request.blueprint or "app", request.endpoint or "unmatched"
+
+
+def _queue_seconds():
+    """Seconds since the proxy stamped X-Request-Start ("t=<epoch>" in s, ms or us), or None."""
+    header = request.headers.get("X-Request-Start", "")
+    try:
+        stamp = float(header.replace("t=", "").strip())
+    except ValueError:
+        return None
+    if stamp > 1e14:
+        stamp /= 1_000_000
+    elif stamp > 1e11:
+        stamp /= 1000
+    return max(0.0, time.time() - stamp)
+
+
+def _start_request():
+    g._request_started = time.perf_counter()
+    g._request_labels = _labels()
+    HTTP_IN_FLIGHT.labels(*g._request_labels).inc()
+
+    queued = _queue_seconds()
+    if queued is not None:
+        g._request_queued = queued
+        HTTP_QUEUE_TIME.observe(queued)
+
+
+def _finish_request(response):
+    started = g.get('_request_started')
+    if started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    blueprint, endpoint = g._request_labels
+    HTTP_LATENCY.labels(blueprint, endpoint, request.method, str(response.status_code)).observe(elapsed)
+    if not response.is_streamed:
+        HTTP_RESPONSE_SIZE.labels(blueprint, endpoint).observe(response.calculate_content_length() or 0)
+
+    breakdown = _service_breakdown()
+    if SERVER_TIMING:
+        response.headers['Server-Timing'] = _server_timing(elapsed, breakdown)
+        response.headers['Timing-Allow-Origin'] = '*'
+
+    if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+        parts = ", ".join(f"{service} {seconds * 1000:.0f}ms/{calls}" for service, (seconds, calls) in breakdown.items())
+        print(f"🐢 {request.method} {request.path} {response.status_code} took {elapsed * 1000:.0f}ms"
+              f"{' (' + parts + ')' if parts else ''}", flush=True)
+    return response
+
+
+def _end_request(error=None):
+    labels = g.pop('_request_labels', None)
+    if labels is not None:
+        HTTP_IN_FLIGHT.labels(*labels).dec()
+
+
+def _covered_seconds(intervals) -> float:
+    """Wall-clock seconds covered by (start, end) intervals; overlapping calls count once."""
+    covered, reach = 0.0, None
+    for start, end in sorted(intervals):
+        if reach is None or start > reach:
+            covered += end - start
+            reach = end
+        elif end > reach:
+            covered += end - reach
+            reach = end
+    return covered
+
+
+def _service_breakdown() -> OrderedDict:
+    """
+    service -> (wall-clock seconds, call count) for upstream calls made by this
+    request. Calls made in parallel (e.g. itinerary segments) overlap, so their
+    time is counted once rather than summed past the request's own duration.
+    """
+    intervals = OrderedDict()
+    for service, _, seconds, ended in request_spans():
+        intervals.setdefault(service, []).append((ended - seconds, ended))
+    return OrderedDict(
+        (service, (_covered_seconds(spans), len(spans))) for service, spans in intervals.items()
+    )
+
+
+def _upstream_seconds() -> float:
+    return _covered_seconds((ended - seconds, ended) for _, _, seconds, ended in request_spans())
+
+
+def _server_timing(elapsed: float, breakdown: OrderedDict) -> str:
+    # "app" is whatever the request spent outside upstream calls: routing, encoding, compression
+    upstream = _upstream_seconds()
+    entries = [f"total;dur={elapsed * 1000:.1f}"]
+    for service, (seconds, calls) in breakdown.items():
+        entries.append(f'{service};dur={seconds * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"')
+    entries.append(f"app;dur={max(0.0, elapsed - upstream) * 1000:.1f}")
+    queued = g.get('_request_queued')
+    if queued is not None:
+        entries.append(f"queue;dur={queued * 1000:.1f}")
+    return ", ".join(entries)
@@ -1,34 +1,83 @@
 from flask import Blueprint, jsonify, request
-from services.database import get_random_batch, get_destinations_by_tags
+from services.database import get_deck_page, get_destinations_by_tags, get_destinations_page, destination_catalog
+from services.destination_record import CARD_COLUMNS, BROWSE_COLUMNS
+from services.json_fragments import destination_fragments, json_array_response
 
 destinations_bp = Blueprint('destinations', __name__)
 
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+@destinations_bp.route('/api/destinations', methods=['GET'])
+def browse_destinations():
+    """
+    Browse the whole catalog, newest first, one page at a time.
+
+    Query Parameters:
+        limit: Page size (default 20, max 100)
+        cursor: nextCursor from the previous page (omit for the first page)
+        region: Optional region filter (e.g. "Europe")
+        country: Optional country filter (e.g. "Japan")
+        tag: Optional tag filter, case-insensitive (e.g. "beach"; needs
+             sql/destinations_browse_indexes.sql for the tags_normalized column)
+
+    Returns:
+        JSON with 'destinations' (array) and 'nextCursor' (null on the last page);
+        400 for a malformed cursor, 500 if the database query fails
+    """
+    page_size = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    destinations, next_cursor, error = get_destinations_page(
+        page_size=page_size,
+        cursor=request.args.get('cursor'),
+        region=request.args.get('region'),
+        country=request.args.get('country'),
+        tag=request.args.get('tag'),
+    )
+
+    if error == "invalid_cursor":
+        return jsonify({"error": "Invalid cursor"}), 400
+    if error:
+        return jsonify({"error": "Failed to fetch destinations"}), 500
+    return jsonify({
+        "destinations": [dest.to_json(BROWSE_COLUMNS) for dest in destinations],
+        "nextCursor": next_cursor,
+    })
+
+
 @destinations_bp.route('/api/destinations/random', methods=['GET'])
 def random_destinations():
+    """
+    Returns the next 4 destinations from a shuffled deck of the whole catalog.
+
+    Query Parameters:
+        cursor: Optional token from the previous response's X-Deck-Cursor header.
+                Pages resumed from a cursor never repeat until the deck runs out.
+                (The header is left out when a cold worker sampled in Postgres.)
+        seed: Optional integer seed for a new deck (ignored when cursor is given)
+        exclude: Optional comma-separated list of destination ids to leave out
+    """
+    cursor = request.args.get('cursor')
+    seed = request.args.get('seed', type=int)
+    exclude_param = request.args.get('exclude', '')
+    exclude_ids = [i.strip() for i in exclude_param.split(',') if i.strip()]
+
     # 1. Let database.py do the work
-    destinations = get_random_batch(limit=4)
+    destinations, next_cursor = get_deck_page(limit=4, cursor=cursor, seed=seed, exclude_ids=exclude_ids)
 
     if not destinations:
         return jsonify({"message": "Database is empty"}), 404
 
-    # 2. Transform snake_case (DB) to camelCase (Frontend)
-    transformed = []
-    for dest in destinations:
-        transformed.append({
-            "id": str(dest.get("id")),
-            "name": dest.get("name"),
-            "location": dest.get("location"),
-            "description": dest.get("description"),
-            "tags": dest.get("tags", []),
-            "imagePrompt": dest.get("image_prompt", ""),
-            "imageUrl": dest.get("image_url"),
-            "isPersonalized": dest.get("is_personalized", False),
-            "country": dest.get("country", ""),
-            "region": dest.get("region", "")
-        })
-
-    return jsonify(transformed)
+    # 2. Transform snake_case (DB) to camelCase (Frontend), reusing cached encodings
+    fragments = [destination_fragments.encode(dest, CARD_COLUMNS) for dest in destinations]
+
+    response = json_array_response(fragments)
+    if next_cursor:
+        response.headers['X-Deck-Cursor'] = next_cursor
+    return response
 
 
 @destinations_bp.route('/api/destinations/personalized', methods=['GET'])
@@ -60,20 +109,19 @@ def personalized_destinations():
     if not destinations:
         return jsonify({"message": "No destinations found matching your interests"}), 404
 
-    # Transform snake_case (DB) to camelCase (Frontend)
-    transformed = []
-    for dest in destinations:
-        transformed.append({
-            "id": str(dest.get("id")),
-            "name": dest.get("name"),
-            "location": dest.get("location"),
-            "description": dest.get("description"),
-            "tags": dest.get("tags", []),
-            "imagePrompt": dest.get("image_prompt", ""),
-            "imageUrl": dest.get("image_url"),
-            "isPersonalized": True,
-            "country": dest.get("country", ""),
-            "region": dest.get("region", "")
-        })
-
-    return jsonify(transformed)
+    # Transform snake_case (DB) to camelCase (Frontend), reusing cached encodings
+    fragments = [
+        destination_fragments.encode(dest, CARD_COLUMNS, is_personalized=True)
+        for dest in destinations
+    ]
+
+    return json_array_response(fragments)
+
+
+@destinations_bp.route('/api/destinations/cache-stats', methods=['GET'])
+def destination_cache_stats():
+    """Report hit/miss counters for this worker's destination catalog and JSON fragment caches."""
+    return jsonify({
+        "catalog": destination_catalog.stats(),
+        "fragments": destination_fragments.stats(),
+    })
@@ -1,8 +1,17 @@
-from flask import Blueprint, jsonify, request
-from services.itinerary_service import generate_itinerary, generate_clarifying_questions
+import json
+import math
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
+from services.itinerary_service import generate_itinerary, generate_itinerary_stream, generate_clarifying_questions
+from services.itinerary_cache import itinerary_cache
+from services.questions_cache import questions_cache
+from services.itinerary_jobs import QueueFull, get_job_backend
+from services.gemini_client import RateLimited, max_throttle_wait
 
 itinerary_bp = Blueprint('itinerary', __name__)
 
+# Roughly one itinerary generation; how long a rejected client should back off
+JOB_RETRY_AFTER_SECONDS = 15
+
 
 @itinerary_bp.route('/api/itinerary/questions', methods=['POST'])
 def get_questions():
@@ -19,10 +28,37 @@ def get_questions():
     if not data:
         return jsonify({"questions": []}), 200
 
-    questions = generate_clarifying_questions(data)
+    # Questions are optional: when Gemini is saturated this returns [] instead of waiting
+    with max_throttle_wait():
+        questions = generate_clarifying_questions(data)
     return jsonify({"questions": questions}), 200
 
 
+def _validate_trip_request(data):
+    """Return an (error response, status) tuple for an invalid generate request, or None."""
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    if not data.get('destination'):
+        return jsonify({"error": "Destination is required"}), 400
+
+    if not data.get('startDate') or not data.get('endDate'):
+        return jsonify({"error": "Start and end dates are required"}), 400
+
+    return None
+
+
+def _rate_limited(error: RateLimited):
+    """503 + Retry-After for a request that would have waited too long for Gemini."""
+    response = jsonify({"error": "Itinerary generation is busy, please retry shortly"})
+    response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return response, 503
+
+
+def _sse(event: str, payload) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
 @itinerary_bp.route('/api/itinerary/generate', methods=['POST'])
 def generate():
     """
@@ -39,22 +75,136 @@ def generate():
         specificDestinations: Array of {name, address} objects (optional hints)
 
     Returns:
-        JSON with 'itinerary' (array of days) and 'countries' (array of country names)
+        JSON with 'itinerary' (array of days) and 'countries' (array of country names).
+        503 with a Retry-After header when Gemini's rate limit has no slot soon
+        (POST /api/itinerary/jobs waits for one instead).
     """
     data = request.get_json()
 
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
-
-    if not data.get('destination'):
-        return jsonify({"error": "Destination is required"}), 400
-
-    if not data.get('startDate') or not data.get('endDate'):
-        return jsonify({"error": "Start and end dates are required"}), 400
+    invalid = _validate_trip_request(data)
+    if invalid:
+        return invalid
 
-    result = generate_itinerary(data)
+    try:
+        with max_throttle_wait():
+            result = generate_itinerary(data)
+    except RateLimited as e:
+        return _rate_limited(e)
 
     if result and "error" not in result:
         return jsonify(result), 200
     else:
         return jsonify({"error": f"Failed to generate itinerary: {result.get('error', 'unknown')}"}), 500
+
+
+@itinerary_bp.route('/api/itinerary/generate/stream', methods=['POST'])
+def generate_stream():
+    """
+    Stream a day-by-day itinerary as Server-Sent Events while Gemini writes it.
+
+    Request Body: Same as /generate endpoint.
+
+    Events:
+        day:       one day object ({day, date, activities}) as soon as it is complete
+        countries: array of country names, after the last day
+        error:     {"error": message} if generation fails part-way, plus
+                   "retryAfter" (seconds) when Gemini's rate limit has no slot soon
+        done:      {} when the stream is finished
+    """
+    data = request.get_json()
+
+    invalid = _validate_trip_request(data)
+    if invalid:
+        return invalid
+
+    def events():
+        # The status line is already sent once the stream starts, so a rate limit
+        # is reported as an error event rather than a 503
+        try:
+            with max_throttle_wait():
+                for kind, payload in generate_itinerary_stream(data):
+                    if kind == "error":
+                        yield _sse("error", {"error": f"Failed to generate itinerary: {payload}"})
+                        break
+                    yield _sse(kind, payload)
+        except RateLimited as e:
+            yield _sse("error", {
+                "error": "Itinerary generation is busy, please retry shortly",
+                "retryAfter": max(1, math.ceil(e.retry_after)),
+            })
+        yield _sse("done", {})
+
+    response = Response(stream_with_context(events()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx / Azure front ends from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@itinerary_bp.route('/api/itinerary/cache-stats', methods=['GET'])
+def itinerary_cache_stats():
+    """
+    Report itinerary and clarifying-question cache statistics for this worker process.
+
+    Returns:
+        JSON with 'itineraries' (entry count shared across workers, hits, misses,
+        coalesced in-flight requests, stores, hit rate) and 'questions' (memo hits,
+        persistent-store hits, misses, size)
+    """
+    return jsonify({
+        "itineraries": itinerary_cache.stats(),
+        "questions": questions_cache.stats(),
+    }), 200
+
+
+@itinerary_bp.route('/api/itinerary/jobs', methods=['POST'])
+def create_itinerary_job():
+    """
+    Queue an itinerary generation and return immediately.
+
+    Request Body: Same as /generate endpoint.
+
+    Returns:
+        202 with 'jobId', 'status' and 'statusUrl' (also in the Location header);
+        poll GET /api/itinerary/jobs/<jobId> for the result.
+        503 with a Retry-After header when the queue is full.
+    """
+    data = request.get_json()
+
+    invalid = _validate_trip_request(data)
+    if invalid:
+        return invalid
+
+    try:
+        job_id = get_job_backend().submit(data)
+    except QueueFull:
+        response = jsonify({"error": "Itinerary queue is full, please retry shortly"})
+        response.headers['Retry-After'] = str(JOB_RETRY_AFTER_SECONDS)
+        return response, 503
+
+    status_url = url_for('itinerary.get_itinerary_job', job_id=job_id)
+    response = jsonify({"jobId": job_id, "status": "queued", "statusUrl": status_url})
+    response.headers['Location'] = status_url
+    return response, 202
+
+
+@itinerary_bp.route('/api/itinerary/jobs/<job_id>', methods=['GET'])
+def get_itinerary_job(job_id):
+    """
+    Report the status of a queued itinerary generation.
+
+    Returns:
+        JSON with 'jobId' and 'status' ("queued", "running", "succeeded" or "failed"),
+        plus 'result' ({itinerary, countries}) once succeeded or 'error' once failed.
+        404 if the job is unknown or has expired.
+    """
+    job = get_job_backend().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
+
+
+@itinerary_bp.route('/api/itinerary/jobs/stats', methods=['GET'])
+def itinerary_job_stats():
+    """Report queue depth, running jobs and totals for this worker process."""
+    return jsonify(get_job_backend().stats()), 200
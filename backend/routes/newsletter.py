@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from services.database import get_random_batch, get_destinations_by_tags, get_subscribed_users
 from services.email_service import send_welcome_email, send_weekly_newsletter
+from services.destination_record import EMAIL_COLUMNS
 
 newsletter_bp = Blueprint('newsletter', __name__)
 
@@ -67,7 +68,7 @@ def send_newsletter():
     if tags:
         destinations = get_destinations_by_tags(tags, limit=4)
     else:
-        destinations = get_random_batch(limit=4)
+        destinations = get_random_batch(limit=4, columns=EMAIL_COLUMNS)
 
     if not destinations:
         return jsonify({"error": "No destinations available to send"}), 404
@@ -108,7 +109,7 @@ def send_newsletter_to_all():
         }), 200
 
     # Get random destinations for this week's newsletter
-    destinations = get_random_batch(limit=4)
+    destinations = get_random_batch(limit=4, columns=EMAIL_COLUMNS)
 
     if not destinations:
         return jsonify({"error": "No destinations available to send"}), 404
@@ -4,25 +4,15 @@ from services.saved_destinations_service import (
     save_destination,
     unsave_destination,
 )
+from services.destination_record import DestinationRecord, CARD_COLUMNS
+from services.json_fragments import destination_fragments, json_array_response
 
 saved_destinations_bp = Blueprint('saved_destinations', __name__)
 
 
-def transform_destination(row: dict) -> dict:
-    """Transform a saved_destinations join row to a camelCase destination for the frontend."""
-    dest = row.get("destinations", {})
-    return {
-        "id": str(dest.get("id")),
-        "name": dest.get("name"),
-        "location": dest.get("location"),
-        "description": dest.get("description"),
-        "tags": dest.get("tags", []),
-        "imagePrompt": dest.get("image_prompt", ""),
-        "imageUrl": dest.get("image_url"),
-        "isPersonalized": dest.get("is_personalized", False),
-        "country": dest.get("country", ""),
-        "region": dest.get("region", ""),
-    }
+def destination_record(row: dict) -> DestinationRecord:
+    """Pull the joined destination out of a saved_destinations row."""
+    return DestinationRecord.from_row(row.get("destinations") or {})
 
 
 @saved_destinations_bp.route('/api/saved-destinations', methods=['GET'])
@@ -33,7 +23,8 @@ def list_saved():
         return jsonify({"error": "userId is required"}), 400
 
     rows = get_saved_destinations(user_id)
-    return jsonify([transform_destination(r) for r in rows]), 200
+    fragments = [destination_fragments.encode(destination_record(r), CARD_COLUMNS) for r in rows]
+    return json_array_response(fragments)
 
 
 @saved_destinations_bp.route('/api/saved-destinations', methods=['POST'])
@@ -1,5 +1,14 @@
 from flask import Blueprint, jsonify, request
-from services.trips_service import save_trip, get_user_trips, update_trip, delete_trip
+from middleware.compression import strip_encoding_suffix
+from services.trips_service import (
+    save_trip,
+    get_user_trips,
+    get_user_trip_summaries,
+    get_trip,
+    update_trip,
+    patch_trip,
+    delete_trip,
+)
 
 trips_bp = Blueprint('trips', __name__)
 
@@ -22,9 +31,54 @@ def transform_trip(trip: dict) -> dict:
         "itinerary": trip.get("itinerary", []),
         "countries": trip.get("countries", []),
         "createdAt": trip.get("created_at", ""),
+        "version": trip.get("version"),
     }
 
 
+def transform_trip_summary(trip: dict) -> dict:
+    """Transform a trip summary row (no itinerary) to camelCase for the trips list."""
+    countries = trip.get("countries") or []
+    return {
+        "id": trip.get("id"),
+        "userId": trip.get("user_id"),
+        "tripName": trip.get("trip_name", ""),
+        "destination": trip.get("destination", ""),
+        "startDate": trip.get("start_date", ""),
+        "endDate": trip.get("end_date", ""),
+        "currency": trip.get("currency", "USD"),
+        "budgetRange": trip.get("budget_range", ""),
+        "budgetAmount": trip.get("budget_amount", 0),
+        "companions": trip.get("companions", "solo"),
+        "numberOfPeople": trip.get("number_of_people"),
+        "countries": countries,
+        "createdAt": trip.get("created_at", ""),
+        "dayCount": trip.get("day_count", 0),
+        "activityCount": trip.get("activity_count", 0),
+        "countryCount": len(countries),
+    }
+
+
+def version_etag(trip: dict):
+    """ETag for a trip row, "v<version>", or None without sql/trips_version.sql."""
+    version = trip.get("version")
+    return f"v{version}" if version is not None else None
+
+
+def parse_version_etag(if_match):
+    """
+    Return the trip version an If-Match header asks for, or None if it names no
+    single version (weak tags, several tags, or an ETag we didn't hand out).
+    Compressed responses carry "v3-gzip" etc., which name the same version.
+    """
+    tags = if_match.as_set()
+    if len(tags) != 1:
+        return None
+    tag = strip_encoding_suffix(tags.pop())
+    # Bare numbers are accepted for clients that send the body's "version" field
+    digits = tag[1:] if tag.startswith("v") else tag
+    return int(digits) if digits.isdigit() else None
+
+
 @trips_bp.route('/api/trips', methods=['POST'])
 def create_trip():
     """Save a new trip."""
@@ -41,15 +95,45 @@ def create_trip():
 
 @trips_bp.route('/api/trips', methods=['GET'])
 def list_trips():
-    """Get all trips for a user."""
+    """
+    Get all trips for a user.
+
+    Query Parameters:
+        userId: The user's id
+        view: "full" (default) includes every itinerary; "summary" returns only the
+              list columns plus dayCount, activityCount and countryCount
+    """
     user_id = request.args.get('userId')
     if not user_id:
         return jsonify({"error": "userId is required"}), 400
 
+    if request.args.get('view') == 'summary':
+        summaries = get_user_trip_summaries(user_id)
+        return jsonify([transform_trip_summary(t) for t in summaries]), 200
+
     trips = get_user_trips(user_id)
     return jsonify([transform_trip(t) for t in trips]), 200
 
 
+@trips_bp.route('/api/trips/<trip_id>', methods=['GET'])
+def get_trip_detail(trip_id):
+    """Get one trip with its full itinerary (for when the user opens it from the list)."""
+    user_id = request.args.get('userId')
+    if not user_id:
+        return jsonify({"error": "userId is required"}), 400
+
+    trip = get_trip(trip_id, user_id)
+    if not trip:
+        return jsonify({"error": "Trip not found"}), 404
+
+    # The version ETag can be sent back as If-Match on PATCH
+    response = jsonify(transform_trip(trip))
+    etag = version_etag(trip)
+    if etag:
+        response.set_etag(etag)
+    return response, 200
+
+
 @trips_bp.route('/api/trips/<trip_id>', methods=['PUT'])
 def edit_trip(trip_id):
     """Update an existing trip."""
@@ -64,6 +148,70 @@ def edit_trip(trip_id):
         return jsonify({"error": "Failed to update trip"}), 500
 
 
+@trips_bp.route('/api/trips/<trip_id>', methods=['PATCH'])
+def patch_trip_fields(trip_id):
+    """
+    Partially update a trip with RFC 6902 JSON Patch operations.
+
+    Request Body (application/json-patch+json or application/json), either:
+        [ {"op": "replace", "path": "/itinerary/0/activities/1/time", "value": "10:00"}, ... ]
+    or:
+        {"operations": [...], "version": 3}
+
+    If the trip has changed since that version, nothing is written and 409 is
+    returned with the current version. The version can instead be sent as an
+    If-Match header with the ETag from GET /api/trips/<id> ("v3"); then a stale
+    or unrecognised ETag gets 412. Successful patches return the new ETag.
+    """
+    data = request.get_json(force=True, silent=True)
+    if isinstance(data, dict):
+        operations = data.get('operations')
+        expected_version = data.get('version')
+        if expected_version is not None:
+            try:
+                if isinstance(expected_version, (bool, float)):
+                    raise TypeError
+                expected_version = int(expected_version)
+            except (TypeError, ValueError):
+                return jsonify({"error": "version must be an integer"}), 400
+    else:
+        operations = data
+        expected_version = None
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "A non-empty array of JSON Patch operations is required"}), 400
+
+    precondition = expected_version is None and 'If-Match' in request.headers
+    if precondition and not request.if_match.star_tag:
+        expected_version = parse_version_etag(request.if_match)
+        if expected_version is None:
+            return jsonify({"error": "If-Match must be a single trip ETag such as \"v3\""}), 412
+
+    result, error = patch_trip(trip_id, operations, expected_version)
+
+    if error is None:
+        response = jsonify(transform_trip(result))
+        etag = version_etag(result)
+        if etag:
+            response.set_etag(etag)
+        return response, 200
+    if error == "not_found":
+        return jsonify({"error": "Trip not found"}), 404
+    if error == "conflict" and precondition:
+        return jsonify({
+            "error": "Trip was modified since the If-Match version",
+            "version": result.get("version") if result else None,
+        }), 412
+    if error == "conflict":
+        return jsonify({
+            "error": "Trip was modified by someone else",
+            "version": result.get("version") if result else None,
+        }), 409
+    if error.startswith("invalid_patch"):
+        return jsonify({"error": f"Invalid patch: {error.split(': ', 1)[-1]}"}), 422
+    return jsonify({"error": "Failed to update trip"}), 500
+
+
 @trips_bp.route('/api/trips/<trip_id>', methods=['DELETE'])
 def remove_trip(trip_id):
     """Delete a trip."""
@@ -1,22 +1,21 @@
-import time
+import argparse
 import random
 import os
 import json
+import queue
+import threading
+import time
 import uuid
-from difflib import SequenceMatcher
 from pathlib import Path
-from google import genai
 from google.genai import types
 from dotenv import load_dotenv
 from services.database import init_db, add_destination, get_all_destination_names
-from supabase import create_client
+from services.gemini_client import gemini
+from services.name_index import FuzzyNameIndex
+from services.supabase_client import supabase
 
 load_dotenv()
 
-# --- CONFIGURATION ---
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-supabase = create_client(os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY"))
-
 init_db()
 
 # --- LOAD DATA FROM JSON ---
@@ -30,27 +29,6 @@ TRAVEL_STYLES = theme_data["travel_styles"]
 
 DUPLICATE_THRESHOLD = 0.75  # Similarity ratio above this = duplicate
 
-def normalize_name(name: str) -> str:
-    """Normalize a destination name for comparison: lowercase, strip punctuation, sort words."""
-    import re
-    name = re.sub(r'[^\w\s]', '', name.lower())
-    return ' '.join(sorted(name.split()))
-
-def is_duplicate(new_name: str, existing_entries: list[dict]) -> str | None:
-    """
-    Check if a new destination name is a fuzzy duplicate of any existing name.
-    existing_entries: list of {"name": ..., "country": ...} dicts.
-    Returns the matched existing name if duplicate, None otherwise.
-    """
-    norm_new = normalize_name(new_name)
-    for entry in existing_entries:
-        norm_existing = normalize_name(entry['name'])
-        ratio = SequenceMatcher(None, norm_new, norm_existing).ratio()
-        if ratio >= DUPLICATE_THRESHOLD:
-            return entry['name']
-    return None
-
-
 def upload_image(image_bytes, destination_name):
     try:
         clean_name = destination_name.replace(" ", "-").lower()[:20]
@@ -64,153 +42,483 @@ def upload_image(image_bytes, destination_name):
         print(f"   ⚠️ Upload Failed: {e}")
         return None
 
-def generate_single_destination(existing_entries: list[dict]) -> dict | None:
-    """
-    Generates ONE completely random destination with its own unique theme.
-    existing_entries: list of {"name": ..., "country": ...} dicts from the DB + this batch.
-    Returns {"name": ..., "country": ...} if successful, or None if failed.
+# --- PIPELINE ---
+# Each destination ("slot") moves through five stages, each with its own worker
+# threads: text generation -> dedup -> image generation -> upload -> DB insert.
+# Queues between stages are bounded so a fast stage can't pile up work (or, after
+# the image stage, megabytes of PNGs) ahead of a slow one. Gemini calls are paced
+# by the shared client's per-model rate limits (GEMINI_RATE_LIMITS), so extra
+# workers queue politely instead of triggering 429s.
+#
+# With per_call > 1 a text worker takes up to that many waiting slots and asks
+# for all of them in one call. Each result is validated and deduped on its own;
+# only the slots that were rejected (invalid, missing or duplicate) go back to
+# the text queue, where they are batched with whatever else is waiting.
+
+MAX_DEDUP_ATTEMPTS = 3  # How many times to regenerate a slot whose text was a duplicate
+TEXT_ATTEMPTS = 3  # Text requests per slot for failures the client doesn't retry (bad JSON, invalid or missing result)
+
+DESTINATION_REGIONS = (
+    'Oceania', 'East Asia', 'Middle East', 'South East Asia', 'Europe',
+    'North America', 'South America', 'Central America', 'Africa',
+)
+
+DESTINATION_FIELD_RULES = (
+    "The 'country' field must be the exact country name (e.g., 'Japan', 'Thailand', 'Italy'). "
+    "The 'region' field must be an array containing one or more of these exact values where applicable: "
+    f"{', '.join(repr(r) for r in DESTINATION_REGIONS)}. "
+    "Most destinations belong to one region, but some may belong to multiple."
+)
+
+DESTINATION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "name": {"type": "STRING"},
+        "location": {"type": "STRING"},
+        "description": {"type": "STRING"},
+        "tags": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "imagePrompt": {"type": "STRING"},
+        "isPersonalized": {"type": "BOOLEAN"},
+        "country": {"type": "STRING"},
+        "region": {"type": "ARRAY", "items": {"type": "STRING"}}
+    },
+    "required": ["name", "location", "description", "tags", "imagePrompt", "isPersonalized", "country", "region"]
+}
+
+# Several destinations per call: each item echoes the number of the request it answers
+DESTINATION_BATCH_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": dict({"slot": {"type": "INTEGER"}}, **DESTINATION_SCHEMA["properties"]),
+        "required": ["slot"] + DESTINATION_SCHEMA["required"],
+    }
+}
+
+_STOP = object()
+
+
+def roll_slot() -> dict:
+    """Randomize EVERYTHING for one destination: region, theme and travel style."""
+    c_region = random.choice(list(REGION_THEMES.keys()))
+    return {
+        "region": c_region,
+        "theme": random.choice(REGION_THEMES[c_region]),
+        "style": random.choice(TRAVEL_STYLES),
+        "attempt": 0,
+        "text_failures": 0,
+        "avoid": [],  # Duplicates generated for this slot so far: {"name": ..., "country": ...}
+    }
+
+
+def _avoid_hints(slot: dict, same_country_names: list) -> str:
+    # On retry: avoid same-country names + any previously generated dupes
+    avoid_text = ""
+    if slot['avoid']:
+        all_avoid = list(dict.fromkeys(same_country_names + [n['name'] for n in slot['avoid']]))
+        avoid_text = f" Do NOT generate any of these already-existing destinations: {', '.join(all_avoid)}."
+
+    # Extra hint on retry to push Gemini away from the duplicate
+    retry_hint = ""
+    if slot['attempt'] > 0:
+        retry_hint = " Pick a lesser-known or more unusual destination this time."
+    return f"{avoid_text}{retry_hint}"
+
+
+def build_destination_prompt(slot: dict, same_country_names: list) -> str:
+    return (
+        f"Generate 1 real, specific travel bucket list destination in {slot['region']} "
+        f"that features {slot['theme']}. It must be perfect for {slot['style']}. "
+        "Do not invent places. Return JSON with fields: name, location, description, tags, imagePrompt, isPersonalized, country, region. "
+        f"{DESTINATION_FIELD_RULES}{_avoid_hints(slot, same_country_names)}"
+    )
+
+
+def build_destination_batch_prompt(slots: list, same_country_names: list) -> str:
+    """One prompt for several slots; same_country_names[i] is the avoid list for slots[i]."""
+    requests = "\n".join(
+        f"{number}. A destination in {slot['region']} that features {slot['theme']}. "
+        f"It must be perfect for {slot['style']}.{_avoid_hints(slot, names)}"
+        for number, (slot, names) in enumerate(zip(slots, same_country_names), 1)
+    )
+    return (
+        f"Generate {len(slots)} real, specific travel bucket list destinations, one for each numbered request below. "
+        "Every destination must be a different place. Do not invent places.\n\n"
+        f"{requests}\n\n"
+        f"Return a JSON array with exactly {len(slots)} objects, one per request, each with fields: "
+        "slot (the request number), name, location, description, tags, imagePrompt, isPersonalized, country, region. "
+        f"{DESTINATION_FIELD_RULES}"
+    )
+
+
+def generate_destination_text(slot: dict, same_country_names: list):
+    """Ask Gemini for one destination matching the slot. Returns the parsed JSON dict or None."""
+    try:
+        response = gemini.generate_content(
+            model='gemini-3-flash-preview',
+            contents=build_destination_prompt(slot, same_country_names),
+            config=types.GenerateContentConfig(
+                response_mime_type='application/json',
+                temperature=1.0,
+                response_schema=DESTINATION_SCHEMA
+            ),
+            call_site='seed_destination'
+        )
+        return json.loads(response.text)
+    except Exception as e:
+        # Rate limits and 5xx are already retried with backoff inside the client
+        print(f"   ⚠️ Text Error: {e}")
+        return None
+
+
+def generate_destinations_text(slots: list, same_country_names: list) -> list:
     """
+    Ask Gemini for one destination per slot in a single call.
 
-    # 1. Randomize EVERYTHING for this single slot
-    c_region = random.choice(list(REGION_THEMES.keys()))
-    # c_region = "Japan & East Asia"
-    c_theme = random.choice(REGION_THEMES[c_region])
-    c_style = random.choice(TRAVEL_STYLES)
-
-    print(f"🎲 Rolling: {c_theme} in {c_region} ({c_style})...")
-
-    destination_data = None
-    max_dedup_attempts = 3  # How many times to retry if we get a duplicate
-    avoid_names = []  # Names to explicitly tell Gemini to avoid (built up on retries)
-
-    # 2. Text Generation (with dedup retries)
-    for dedup_attempt in range(max_dedup_attempts):
-        # Extra hint on retry to push Gemini away from the duplicate
-        retry_hint = ""
-        if dedup_attempt > 0:
-            retry_hint = " Pick a lesser-known or more unusual destination this time."
-
-        # Build avoid text from same-country names (only on retries, once we know the country)
-        avoid_text = ""
-        if avoid_names:
-            # On retry: filter existing entries to same country + any previously generated dupes
-            country = avoid_names[0].get('_country', '')
-            same_country_names = [e['name'] for e in existing_entries if e.get('country', '').lower() == country.lower()]
-            all_avoid = same_country_names + [n['name'] for n in avoid_names]
-            # Deduplicate the list
-            all_avoid = list(dict.fromkeys(all_avoid))
-            avoid_text = f" Do NOT generate any of these already-existing destinations: {', '.join(all_avoid)}."
-
-        for _ in range(3):  # API retry logic (for errors)
-            try:
-                prompt_text = (
-                    f"Generate 1 real, specific travel bucket list destination in {c_region} "
-                    f"that features {c_theme}. It must be perfect for {c_style}. "
-                    "Do not invent places. Return JSON with fields: name, location, description, tags, imagePrompt, isPersonalized, country, region. "
-                    "The 'country' field must be the exact country name (e.g., 'Japan', 'Thailand', 'Italy'). "
-                    "The 'region' field must be an array containing one or more of these exact values where applicable: "
-                    "'Oceania', 'East Asia', 'Middle East', 'South East Asia', 'Europe', 'North America', 'South America', 'Central America', 'Africa'. "
-                    f"Most destinations belong to one region, but some may belong to multiple.{avoid_text}{retry_hint}"
-                )
-
-                response = client.models.generate_content(
-                    model='gemini-3-flash-preview',
-                    contents=prompt_text,
-                    config=types.GenerateContentConfig(
-                        response_mime_type='application/json',
-                        temperature=1.0,
-                        response_schema={
-                            "type": "OBJECT",
-                            "properties": {
-                                "name": {"type": "STRING"},
-                                "location": {"type": "STRING"},
-                                "description": {"type": "STRING"},
-                                "tags": {"type": "ARRAY", "items": {"type": "STRING"}},
-                                "imagePrompt": {"type": "STRING"},
-                                "isPersonalized": {"type": "BOOLEAN"},
-                                "country": {"type": "STRING"},
-                                "region": {"type": "ARRAY", "items": {"type": "STRING"}}
-                            },
-                            "required": ["name", "location", "description", "tags", "imagePrompt", "isPersonalized", "country", "region"]
-                        }
-                    )
-                )
-                destination_data = json.loads(response.text)
-                break
-            except Exception as e:
-                print(f"   ⚠️ Text Error: {e}. Retrying...")
-                time.sleep(2)
+    Returns a list aligned with `slots`: the parsed JSON dict for each slot,
+    or None where the response had no usable item for it.
+    """
+    try:
+        response = gemini.generate_content(
+            model='gemini-3-flash-preview',
+            contents=build_destination_batch_prompt(slots, same_country_names),
+            config=types.GenerateContentConfig(
+                response_mime_type='application/json',
+                temperature=1.0,
+                response_schema=DESTINATION_BATCH_SCHEMA
+            ),
+            call_site='seed_destination_batch'
+        )
+        items = json.loads(response.text)
+    except Exception as e:
+        print(f"   ⚠️ Text Error: {e}")
+        return [None] * len(slots)
 
-        if not destination_data:
-            print("   ❌ Text failed. Skipping.")
-            return None
+    results = [None] * len(slots)
+    for item in items if isinstance(items, list) else []:
+        number = item.get('slot') if isinstance(item, dict) else None
+        # Items with a missing, out-of-range or repeated slot number are dropped and re-requested
+        if isinstance(number, int) and 1 <= number <= len(slots) and results[number - 1] is None:
+            results[number - 1] = item
+    return results
 
-        # 3. Fuzzy duplicate check (against ALL existing names, not just same country)
-        matched = is_duplicate(destination_data['name'], existing_entries)
-        if matched:
-            print(f"   🔁 Duplicate detected: '{destination_data['name']}' ≈ '{matched}'. Retrying ({dedup_attempt + 1}/{max_dedup_attempts})...")
-            # Track this name + its country so next retry can build a targeted avoid list
-            avoid_names.append({'name': destination_data['name'], '_country': destination_data.get('country', '')})
-            destination_data = None
-            continue
-        else:
-            # Not a duplicate, proceed
-            break
 
-    if not destination_data:
-        print("   ❌ Could not generate a unique destination after retries. Skipping.")
+def validate_destination(destination_data):
+    """Return the destination with cleaned fields, or None if it is missing something we store."""
+    if not isinstance(destination_data, dict):
         return None
-
-    # 4. Image Generation
+    for field in ('name', 'location', 'description', 'imagePrompt', 'country'):
+        value = destination_data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return None
+    tags = destination_data.get('tags')
+    regions = destination_data.get('region')
+    tags = [t.strip() for t in tags if isinstance(t, str) and t.strip()] if isinstance(tags, list) else []
+    regions = [r for r in regions if r in DESTINATION_REGIONS] if isinstance(regions, list) else []
+    if not tags or not regions:
+        return None
+    return dict(
+        destination_data,
+        name=destination_data['name'].strip(),
+        country=destination_data['country'].strip(),
+        tags=tags,
+        region=regions,
+        isPersonalized=bool(destination_data.get('isPersonalized', False)),
+    )
+
+
+def generate_destination_image(destination_data: dict):
+    """Paint the destination with Imagen. Returns PNG bytes or None."""
     lighting = random.choice(["soft morning light", "golden hour", "moody overcast", "blue hour"])
     vibe = random.choice(["peaceful", "vibrant", "cinematic", "ethereal"])
 
     my_prompt = f"A stunning editorial travel photograph of {destination_data['name']}, {destination_data['location']}. {destination_data['imagePrompt']}. Shot on Fujifilm GFX 100S, medium format, 45mm lens, {lighting}, {vibe}, high resolution, sharp focus, professional color grading, Condé Nast Traveler style. The scene is COMPLETELY DEVOID of people. Any wildlife present must be in the far distance, no close-ups. Avoid large group of wildlife if any, keep it to few animals max."
 
-    try:
-        print(f"   🎨 Painting {destination_data['name']}...")
-        time.sleep(15) # Safety pause for Image API
+    print(f"   🎨 Painting {destination_data['name']}...")
+    img_response = gemini.generate_images(
+        model='imagen-4.0-generate-001',
+        prompt=my_prompt,
+        config=types.GenerateImagesConfig(number_of_images=1, aspect_ratio="16:9"),
+        call_site='seed_image'
+    )
+    if not img_response.generated_images:
+        return None
+    return img_response.generated_images[0].image.image_bytes
 
-        img_response = client.models.generate_images(
-            model='imagen-4.0-generate-001',
-            prompt=my_prompt,
-            config=types.GenerateImagesConfig(number_of_images=1, aspect_ratio="16:9")
-        )
 
-        if img_response.generated_images:
-            img_bytes = img_response.generated_images[0].image.image_bytes
-            print("   ☁️ Uploading...")
-            public_url = upload_image(img_bytes, destination_data['name'])
+class SeedPipeline:
+    """
+    Runs slots through the seeding stages on per-stage worker threads.
+
+    Dedup has a single worker so every accept/reject decision sees all names
+    accepted before it; an accepted name is reserved straight away so slots
+    still in flight can't produce it again, and released if a later stage
+    fails. Duplicates and invalid text go back to the text stage (whose queue
+    is unbounded, so that loop can't deadlock) until MAX_DEDUP_ATTEMPTS or
+    TEXT_ATTEMPTS is reached. `per_call` is the number of slots a text worker
+    asks Gemini for in one call.
+    """
 
-            if public_url:
-                destination_data['imageUrl'] = public_url
-                add_destination(destination_data)
-                print(f"   ✅ SUCCESS: {destination_data['name']}")
-                return {"name": destination_data['name'], "country": destination_data.get('country', '')}
+    def __init__(self, name_index: FuzzyNameIndex, text_workers: int = 8, image_workers: int = 2,
+                 upload_workers: int = 4, insert_workers: int = 2, queue_size: int = 8, per_call: int = 1):
+        self.name_index = name_index
+        self.per_call = max(1, per_call)
+        self._names_lock = threading.Lock()
+        self._text_queue = queue.Queue()
+        self._dedup_queue = queue.Queue(maxsize=queue_size)
+        self._image_queue = queue.Queue(maxsize=queue_size)
+        self._upload_queue = queue.Queue(maxsize=queue_size)
+        self._insert_queue = queue.Queue(maxsize=queue_size)
+        self._stages = [
+            ("text", self._text_queue, self._generate_text, text_workers),
+            ("dedup", self._dedup_queue, self._dedup, 1),
+            ("image", self._image_queue, self._generate_image, image_workers),
+            ("upload", self._upload_queue, self._upload, upload_workers),
+            ("insert", self._insert_queue, self._insert, insert_workers),
+        ]
+        self._lock = threading.Lock()
+        self._handoff = threading.local()
+        self._outstanding = 0
+        self._done = threading.Event()
+        self.created = []
+        self.duplicates = 0
+        self.invalid = 0
+        self.text_calls = 0
+        self.failed = {name: 0 for name, _, _, _ in self._stages}
+        self.busy_seconds = {name: 0.0 for name, _, _, _ in self._stages}
+
+    def run(self, batch_size: int) -> list:
+        """Generate `batch_size` destinations and return the {"name", "country"} entries created."""
+        threads = [
+            threading.Thread(target=self._work, args=(name, inbox, handler), name=f"seed-{name}-{i}", daemon=True)
+            for name, inbox, handler, workers in self._stages
+            for i in range(workers)
+        ]
+        # Queue every slot before the workers start so the first text calls get full batches
+        self._outstanding = batch_size
+        for _ in range(batch_size):
+            self._text_queue.put(roll_slot())
+        for t in threads:
+            t.start()
+        if batch_size > 0:
+            self._done.wait()
+
+        # Every slot has finished, so all queues are empty and workers can be stopped
+        for _, inbox, _, workers in self._stages:
+            for _ in range(workers):
+                inbox.put(_STOP)
+        for t in threads:
+            t.join()
+        return self.created
+
+    def _work(self, stage: str, inbox: queue.Queue, handler):
+        # The text stage handles a list of up to per_call slots, every other stage one slot
+        batched = stage == "text"
+        while True:
+            slot = inbox.get()
+            if slot is _STOP:
+                return
+            slots = [slot] + self._take_waiting(inbox, self.per_call - 1) if batched else [slot]
+            self._handoff.blocked = 0.0
+            started = time.perf_counter()
+            try:
+                handler(slots if batched else slot)
+            except Exception as e:
+                print(f"   ⚠️ {stage.capitalize()} Error: {e}")
+                for slot in slots:
+                    self._fail(slot, stage)
+            # Time spent waiting for room in a full downstream queue is that stage's, not ours
+            busy = time.perf_counter() - started - self._handoff.blocked
+            with self._lock:
+                self.busy_seconds[stage] += busy
+
+    def _forward(self, outbox: queue.Queue, slot: dict):
+        """Hand a slot to another stage, noting how long this worker blocked on a full queue."""
+        started = time.perf_counter()
+        outbox.put(slot)
+        self._handoff.blocked += time.perf_counter() - started
+
+    @staticmethod
+    def _take_waiting(inbox: queue.Queue, limit: int) -> list:
+        """Up to `limit` more slots that are already queued, without waiting for new ones."""
+        slots = []
+        while len(slots) < limit:
+            try:
+                slot = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if slot is _STOP:
+                # Leave it for this worker's next get()
+                inbox.put(_STOP)
+                break
+            slots.append(slot)
+        return slots
+
+    def _same_country_names(self, slot: dict) -> list:
+        if not slot['avoid']:
+            return []
+        country = slot['avoid'][0].get('country', '').lower()
+        with self._names_lock:
+            return [e['name'] for e in self.name_index.entries() if e.get('country', '').lower() == country]
+
+    def _generate_text(self, slots: list):
+        for slot in slots:
+            if not slot['attempt'] and not slot['text_failures']:
+                print(f"🎲 Rolling: {slot['theme']} in {slot['region']} ({slot['style']})...")
+        same_country_names = [self._same_country_names(slot) for slot in slots]
+        with self._lock:
+            self.text_calls += 1
+        if len(slots) == 1:
+            results = [generate_destination_text(slots[0], same_country_names[0])]
         else:
+            results = generate_destinations_text(slots, same_country_names)
+
+        for slot, destination_data in zip(slots, results):
+            destination_data = validate_destination(destination_data)
+            if destination_data:
+                slot['data'] = destination_data
+                self._forward(self._dedup_queue, slot)
+                continue
+            slot['text_failures'] += 1
+            with self._lock:
+                self.invalid += 1
+            if slot['text_failures'] >= TEXT_ATTEMPTS:
+                print(f"   ❌ Text failed for {slot['theme']} in {slot['region']}. Skipping.")
+                self._fail(slot, "text")
+                continue
+            # Only this slot is asked for again, alongside whatever else is waiting
+            self._forward(self._text_queue, slot)
+
+    def _dedup(self, slot: dict):
+        destination_data = slot.pop('data')
+        # Fuzzy duplicate check (against ALL existing names, not just same country)
+        with self._names_lock:
+            matched = self.name_index.find_duplicate(destination_data['name'])
+            if not matched:
+                slot['entry'] = {"name": destination_data['name'], "country": destination_data.get('country', '')}
+                slot['entry_id'] = self.name_index.add(slot['entry'])
+
+        if matched:
+            slot['attempt'] += 1
+            with self._lock:
+                self.duplicates += 1
+            print(f"   🔁 Duplicate detected: '{destination_data['name']}' ≈ '{matched['name']}'. "
+                  f"Retrying ({slot['attempt']}/{MAX_DEDUP_ATTEMPTS})...")
+            if slot['attempt'] >= MAX_DEDUP_ATTEMPTS:
+                print("   ❌ Could not generate a unique destination after retries. Skipping.")
+                self._fail(slot, "dedup")
+                return
+            # Track this name + its country so the retry can build a targeted avoid list
+            slot['avoid'].append({'name': destination_data['name'], 'country': destination_data.get('country', '')})
+            self._forward(self._text_queue, slot)
+            return
+
+        slot['data'] = destination_data
+        self._forward(self._image_queue, slot)
+
+    def _generate_image(self, slot: dict):
+        slot['image'] = generate_destination_image(slot['data'])
+        if not slot['image']:
             print("   ❌ No image.")
+            self._fail(slot, "image")
+            return
+        self._forward(self._upload_queue, slot)
+
+    def _upload(self, slot: dict):
+        print(f"   ☁️ Uploading {slot['data']['name']}...")
+        public_url = upload_image(slot.pop('image'), slot['data']['name'])
+        if not public_url:
+            self._fail(slot, "upload")
+            return
+        slot['data']['imageUrl'] = public_url
+        self._forward(self._insert_queue, slot)
+
+    def _insert(self, slot: dict):
+        if add_destination(slot['data']) is None:
+            self._fail(slot, "insert")
+            return
+        print(f"   ✅ SUCCESS: {slot['data']['name']}")
+        with self._lock:
+            self.created.append(slot['entry'])
+        self._finish_slot()
+
+    def _fail(self, slot: dict, stage: str):
+        # Release the reserved name so another slot may still produce it
+        entry_id = slot.pop('entry_id', None)
+        if entry_id is not None:
+            with self._names_lock:
+                self.name_index.remove(entry_id)
+        slot.pop('image', None)
+        with self._lock:
+            self.failed[stage] += 1
+        self._finish_slot()
+
+    def _finish_slot(self):
+        with self._lock:
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._done.set()
+
+
+def generate_batch(batch_size: int = 10, **pipeline_options) -> list:
+    """
+    Generate `batch_size` new destinations. Keyword arguments are SeedPipeline
+    worker counts and queue size.
+    """
+    # Index all existing destination names + countries once at the start
+    name_index = FuzzyNameIndex(DUPLICATE_THRESHOLD)
+    for entry in get_all_destination_names():
+        name_index.add(entry)
+    print(f"📋 Loaded {len(name_index)} existing destinations for dedup check.")
+    print(f"🚀 Starting Batch (Generating {batch_size} distinct items)...\n")
+
+    started = time.perf_counter()
+    pipeline = SeedPipeline(name_index, **pipeline_options)
+    created = pipeline.run(batch_size)
+    elapsed = time.perf_counter() - started
+
+    failed = ", ".join(f"{stage} {count}" for stage, count in pipeline.failed.items() if count) or "none"
+    print(f"\n📊 Created {len(created)}/{batch_size} in {elapsed:.1f}s with {pipeline.text_calls} text calls "
+          f"({pipeline.duplicates} duplicates and {pipeline.invalid} invalid results rejected; skipped: {failed})")
+    # Busy time per stage shows which one to give more workers next time
+    print("   Stage busy time: " + ", ".join(
+        f"{stage} {seconds:.1f}s" for stage, seconds in pipeline.busy_seconds.items()
+    ))
+    return created
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate new destinations with Gemini and add them to Supabase.")
+    parser.add_argument("--batch-size", type=int, default=10, help="number of destinations to generate")
+    parser.add_argument("--text-workers", type=int, default=8, help="concurrent Gemini text calls")
+    parser.add_argument("--image-workers", type=int, default=2,
+                        help="concurrent Imagen calls (Imagen is limited to 10 rpm by default, see GEMINI_RATE_LIMITS)")
+    parser.add_argument("--upload-workers", type=int, default=4, help="concurrent storage uploads")
+    parser.add_argument("--insert-workers", type=int, default=2, help="concurrent database inserts")
+    parser.add_argument("--queue-size", type=int, default=8, help="slots allowed to wait between two stages")
+    parser.add_argument("--per-call", type=int, default=1,
+                        help="destinations requested per Gemini text call (e.g. 8 for large backfills)")
+    return parser.parse_args()
 
-    except Exception as e:
-        print(f"   ⚠️ Image Error: {e}")
-        if "429" in str(e):
-            print("   ⏳ Rate Limit. Sleeping 30s...")
-            time.sleep(30)
-
-    return None
-
-def generate_batch():
-    # Fetch all existing destination names + countries once at the start
-    existing_entries = get_all_destination_names()
-    print(f"📋 Loaded {len(existing_entries)} existing destinations for dedup check.")
-    print("🚀 Starting Batch (Generating 10 distinct items)...\n")
-
-    for _ in range(10):
-        new_entry = generate_single_destination(existing_entries)
-        # Add the new entry to the in-memory list so we also avoid duplicates within this batch
-        if new_entry:
-            existing_entries.append(new_entry)
-        time.sleep(2) # Pause between items
 
 if __name__ == "__main__":
-    generate_batch()
+    args = parse_args()
+
+    # Optional Prometheus endpoint for watching Gemini latency/tokens during a long seed run
+    metrics_port = os.environ.get("SEED_METRICS_PORT")
+    if metrics_port:
+        from prometheus_client import start_http_server
+
+        start_http_server(int(metrics_port))
+        print(f"📈 Metrics on http://0.0.0.0:{metrics_port}/metrics")
+
+    generate_batch(
+        args.batch_size,
+        text_workers=args.text_workers,
+        image_workers=args.image_workers,
+        upload_workers=args.upload_workers,
+        insert_workers=args.insert_workers,
+        queue_size=args.queue_size,
+        per_call=args.per_call,
+    )
     print("\n🎉 Done.")
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+
+
+DEFAULT_TTL_SECONDS = 300
+
+
+class CatalogCache:
+    """
+    In-process cache for a table that is read far more often than it is written.
+
+    Each gunicorn worker keeps its own copy. The rows are reloaded through
+    `loader` once `ttl` seconds have passed, or straight away after `invalidate()`.
+    If an `indexer` is given, it is called with the fresh rows on every reload and
+    its result is served by `index()`.
+    """
+
+    def __init__(self, loader, ttl: float = DEFAULT_TTL_SECONDS, indexer=None):
+        self._loader = loader
+        self._ttl = ttl
+        self._indexer = indexer
+        self._lock = threading.Lock()
+        self._rows = None
+        self._index = None
+        self._loaded_at = 0.0
+        self._stale = False
+        self._warming = False
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self) -> bool:
+        if self._rows is None or self._stale:
+            return False
+        return (time.monotonic() - self._loaded_at) < self._ttl
+
+    def get(self) -> list:
+        """Return the cached rows, reloading them first if they are missing or stale."""
+        with self._lock:
+            if self._is_fresh():
+                self.hits += 1
+                return self._rows
+
+            self.misses += 1
+            return self._refresh_locked()
+
+    def index(self):
+        """Return the index built from the current rows, reloading them first if needed."""
+        with self._lock:
+            if self._is_fresh():
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._refresh_locked()
+            return self._index
+
+    def peek(self):
+        """Return the cached rows if they are fresh, or None. Never triggers a reload."""
+        with self._lock:
+            if self._is_fresh():
+                self.hits += 1
+                return self._rows
+            return None
+
+    def refresh(self) -> list:
+        """Reload the rows now, regardless of the TTL."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def warm(self):
+        """
+        Load the rows on a background thread if they are missing or stale, so a
+        later get()/index() finds them fresh. At most one such load runs at a time.
+        """
+        with self._lock:
+            if self._is_fresh() or self._warming:
+                return
+            self._warming = True
+
+        def load():
+            # Unlike get(), load without holding the lock so readers aren't blocked meanwhile
+            try:
+                rows = self._loader()
+                index = self._indexer(rows) if self._indexer else None
+            except Exception as e:
+                print(f"Error warming catalog cache: {e}")
+                with self._lock:
+                    self._warming = False
+                return
+            with self._lock:
+                self._install(rows, index)
+                self._warming = False
+
+        threading.Thread(target=load, name="catalog-warm", daemon=True).start()
+
+    def invalidate(self):
+        """Mark the cached rows stale so the next read reloads them."""
+        with self._lock:
+            self._stale = True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._rows) if self._rows is not None else 0,
+                "version": self.version,
+                "ttlSeconds": self._ttl,
+                "ageSeconds": round(time.monotonic() - self._loaded_at, 1) if self._rows is not None else None,
+            }
+
+    def _refresh_locked(self) -> list:
+        try:
+            rows = self._loader()
+        except Exception as e:
+            print(f"Error refreshing catalog cache: {e}")
+            # Keep serving the previous rows rather than failing the request
+            return self._rows if self._rows is not None else []
+
+        index = self._indexer(rows) if self._indexer else None
+        self._install(rows, index)
+        return self._rows
+
+    def _install(self, rows: list, index):
+        self._rows = rows
+        self._index = index
+        self._loaded_at = time.monotonic()
+        self._stale = False
+        self.version += 1
+
+
+def ttl_from_env(name: str, default: float = DEFAULT_TTL_SECONDS) -> float:
+    """Read a TTL in seconds from the environment, falling back to `default`."""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
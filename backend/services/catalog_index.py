@@ -0,0 +1,63 @@
+import hashlib
+import random
+from collections import defaultdict
+
+
+def normalize_tag(tag: str) -> str:
+    """Lowercase and trim a tag so 'Beach ' and 'beach' index together."""
+    return tag.strip().lower()
+
+
+class CatalogIndex:
+    """
+    Lookup structures derived from one snapshot of the destinations catalog.
+
+    Built once per catalog refresh, so requests only do dict/set lookups:
+        by_id:       destination id (as a string) -> DestinationRecord
+        by_tag:      normalized tag -> set of destination ids carrying that tag
+        ids:         every destination id, sorted
+        fingerprint: short hash of `ids`, identical across workers holding the same catalog
+    """
+
+    def __init__(self, records: list):
+        self.by_id = {}
+        self.by_tag = defaultdict(set)
+
+        for record in records:
+            dest_id = str(record.id)
+            self.by_id[dest_id] = record
+            for tag in record.tags or ():
+                if isinstance(tag, str):
+                    self.by_tag[normalize_tag(tag)].add(dest_id)
+
+        self.ids = sorted(self.by_id)
+        self.fingerprint = hashlib.sha1(",".join(self.ids).encode()).hexdigest()[:12]
+
+    def match_counts(self, tags: list) -> dict:
+        """Return {destination id: number of the requested tags it carries}."""
+        counts = defaultdict(int)
+        for tag in {normalize_tag(t) for t in tags if isinstance(t, str)}:
+            for dest_id in self.by_tag.get(tag, ()):
+                counts[dest_id] += 1
+        return counts
+
+    def rank_by_tags(self, tags: list, limit: int) -> list:
+        """
+        Return up to `limit` records matching at least one tag, best overlap first.
+
+        Destinations with the same number of matching tags are shuffled, so
+        repeated calls still vary within each overlap tier.
+        """
+        tiers = defaultdict(list)
+        for dest_id, count in self.match_counts(tags).items():
+            tiers[count].append(dest_id)
+
+        picked = []
+        for count in sorted(tiers, reverse=True):
+            remaining = limit - len(picked)
+            if remaining <= 0:
+                break
+            tier = tiers[count]
+            picked.extend(random.sample(tier, min(remaining, len(tier))))
+
+        return [self.by_id[dest_id] for dest_id in picked]
@@ -1,19 +1,90 @@
-import os
-from supabase import create_client, Client
+import base64
+import json
+import re
+import time
 from dotenv import load_dotenv
 import random
+from services.supabase_client import supabase
+from services.catalog_cache import CatalogCache, ttl_from_env
+from services.catalog_index import CatalogIndex, normalize_tag
+from services.destination_deck import DestinationDeck
+from services.destination_record import DestinationRecord, CARD_COLUMNS, BROWSE_COLUMNS, VERSION_COLUMNS, select_columns
 
 load_dotenv()
 
-# Initialize Supabase Client with service role key (bypasses RLS)
-url: str = os.environ.get("SUPABASE_URL")
-service_role_key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+# Shared, pooled Supabase client (service role key, bypasses RLS)
+supabase_admin = supabase
 
-if not url or not service_role_key:
-    raise ValueError("❌ Supabase credentials missing. Check your .env file.")
 
-supabase: Client = create_client(url, service_role_key)
-supabase_admin: Client = supabase
+# Set (time.monotonic()) when a query finds sql/destinations_updated_at.sql hasn't been
+# applied; the column is asked for again once VERSION_COLUMN_REPROBE seconds have passed
+_version_column_missing_at = None
+VERSION_COLUMN_REPROBE = ttl_from_env("VERSION_COLUMN_REPROBE", 600)
+
+
+def _is_missing_version_column(error: Exception) -> bool:
+    # Postgres reports an unknown column as 42703 ("column destinations.updated_at does
+    # not exist"), PostgREST's schema cache as PGRST204. Anything else that merely
+    # mentions the column (a timeout, a permission error) is a real failure.
+    code = getattr(error, 'code', None)
+    message = str(getattr(error, 'message', None) or error)
+    if code in ('42703', 'PGRST204'):
+        return 'updated_at' in message
+    return code is None and re.search(r"column \S*updated_at\S* does not exist", message) is not None
+
+
+def select_with_version(run, columns: tuple):
+    """
+    Run a destinations query with the row version column added to `columns`.
+
+    Without sql/destinations_updated_at.sql the query is retried (and for the
+    next VERSION_COLUMN_REPROBE seconds sent) without it: records get updated_at
+    None, so their encoded JSON is just not cached, instead of the query failing
+    and the catalog coming back empty. After that the column is tried again, so
+    applying the migration takes effect without restarting the workers.
+
+    Args:
+        run: Callable taking the select string and returning the executed response
+        columns: Column set the view needs
+
+    Returns:
+        Whatever `run` returns
+    """
+    global _version_column_missing_at
+    missing_at = _version_column_missing_at
+    if missing_at is None or time.monotonic() - missing_at >= VERSION_COLUMN_REPROBE:
+        try:
+            response = run(select_columns(columns + VERSION_COLUMNS))
+        except Exception as e:
+            if not _is_missing_version_column(e):
+                raise
+            if missing_at is None:
+                print(f"⚠️ destinations.updated_at is missing, run sql/destinations_updated_at.sql. "
+                      f"Selecting without it, checking again every {VERSION_COLUMN_REPROBE:.0f}s: {e}")
+            _version_column_missing_at = time.monotonic()
+        else:
+            if missing_at is not None:
+                print("✅ destinations.updated_at found, caching encoded destinations again.")
+                _version_column_missing_at = None
+            return response
+    return run(select_columns(columns))
+
+
+def _load_destinations():
+    response = select_with_version(
+        lambda select: supabase.table('destinations').select(select).execute(), CARD_COLUMNS
+    )
+    return [DestinationRecord.from_row(row) for row in response.data or []]
+
+
+# Per-worker copy of the destinations table. The homepage endpoints and the
+# newsletter read from here instead of pulling the whole catalog per request.
+destination_catalog = CatalogCache(
+    _load_destinations,
+    ttl=ttl_from_env("DESTINATION_CACHE_TTL"),
+    indexer=CatalogIndex,
+)
+destination_deck = DestinationDeck()
 
 def init_db():
     # With Supabase, we don't need to "create" the DB file locally.
@@ -40,6 +111,7 @@ def add_destination(dest):
 
     try:
         response = supabase.table("destinations").insert(data).execute()
+        destination_catalog.invalidate()
         return response
     except Exception as e:
         print(f"❌ Error saving to Supabase: {e}")
@@ -58,69 +130,199 @@ def get_all_destination_names():
         print(f"Error fetching destination names: {e}")
         return []
 
-def get_random_batch(limit=4):
+def encode_browse_cursor(created_at, dest_id) -> str:
+    """Encode the (created_at, id) of the last row on a page as an opaque cursor token."""
+    raw = json.dumps([created_at, dest_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_browse_cursor(cursor: str):
+    """Return (created_at, id) from a cursor token, or None if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        return None
+    # A JSON object would unpack into its keys, so only accept the [created_at, id] pair
+    if not isinstance(position, list) or len(position) != 2:
+        return None
+    created_at, dest_id = position
+
+    # Both values are interpolated into a PostgREST filter, so refuse anything
+    # that could break out of the quoted value
+    for value in (created_at, dest_id):
+        if not isinstance(value, (str, int)) or any(c in str(value) for c in '"\\,()'):
+            return None
+    return created_at, dest_id
+
+
+def get_destinations_page(page_size=20, cursor=None, region=None, country=None, tag=None):
     """
-    Fetches all destinations and returns 4 random ones.
+    Fetches one page of the catalog, newest first, using keyset pagination on (created_at, id).
+
+    Args:
+        page_size: Number of destinations per page
+        cursor: Token from the previous page's nextCursor, or None for the first page
+        region: Optional region the destination must belong to (e.g. "Europe")
+        country: Optional exact country name
+        tag: Optional tag the destination must carry (case-insensitive)
+
+    Returns:
+        (list of DestinationRecord, next cursor token or None, None) on success, or
+        ([], None, error) where error is "invalid_cursor" or "query_failed". A failed
+        query must not look like an empty last page, or clients stop paging.
     """
+    position = None
+    if cursor:
+        position = decode_browse_cursor(cursor)
+        if position is None:
+            return [], None, "invalid_cursor"
+
+    def run(select):
+        query = (
+            supabase.table('destinations')
+            .select(select)
+            .order('created_at', desc=True)
+            .order('id', desc=True)
+            # One extra row tells us whether there is a next page
+            .limit(page_size + 1)
+        )
+
+        if position:
+            created_at, dest_id = position
+            # Rows strictly after the cursor in (created_at desc, id desc) order
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{dest_id}")'
+            )
+
+        if region:
+            query = query.contains('region', [region])
+        if country:
+            query = query.eq('country', country)
+        if tag:
+            # Tags are stored with inconsistent casing ("Beach" vs "beach"), so match
+            # against the lowercased copy from sql/destinations_browse_indexes.sql
+            query = query.contains('tags_normalized', [normalize_tag(tag)])
+        return query.execute()
+
     try:
-        # 1. Fetch data (assuming 'supabase' variable exists in this file)
-        response = supabase.table('destinations').select('*').execute()
-        all_data = response.data
+        response = select_with_version(run, BROWSE_COLUMNS)
+        rows = response.data or []
+    except Exception as e:
+        print(f"Error fetching destinations page: {e}")
+        return [], None, "query_failed"
 
-        # 2. Pick random items
-        if not all_data:
-            return []
+    records = [DestinationRecord.from_row(row) for row in rows[:page_size]]
+    next_cursor = None
+    if len(rows) > page_size and records:
+        last = records[-1]
+        next_cursor = encode_browse_cursor(last.created_at, last.id)
+
+    return records, next_cursor, None
 
-        count = min(limit, len(all_data))
-        return random.sample(all_data, count)
+
+def get_random_batch(limit=4, exclude_ids=None, columns=CARD_COLUMNS):
+    """
+    Returns `limit` random destinations.
+
+    If this worker already holds a fresh copy of the catalog, the sample is taken
+    in memory. Otherwise Postgres picks the rows (see sql/random_destinations.sql),
+    so only `limit` rows cross the wire no matter how large the catalog is.
+
+    Args:
+        limit: Number of destinations to return
+        exclude_ids: Optional list of destination ids the caller has already shown
+        columns: Column set to fetch when the database does the sampling
+
+    Returns:
+        List of DestinationRecord
+    """
+    exclude = {str(i) for i in (exclude_ids or [])}
+
+    try:
+        # 1. Sample from the in-process cache when it is already warm
+        all_data = destination_catalog.peek()
+        if all_data is not None:
+            candidates = [d for d in all_data if str(d.id) not in exclude] if exclude else all_data
+            return random.sample(candidates, min(limit, len(candidates)))
+
+        # 2. Otherwise let the database do the sampling
+        response = select_with_version(
+            lambda select: supabase.rpc('random_destinations', {
+                "sample_size": limit,
+                "exclude_ids": list(exclude),
+            }).select(select).execute(),
+            columns,
+        )
+        return [DestinationRecord.from_row(row) for row in response.data or []]
 
+    except Exception as e:
+        print(f"Error fetching random batch: {e}")
+
+    # 3. RPC not deployed or failing: fall back to sampling the full catalog
+    try:
+        all_data = destination_catalog.get()
+        candidates = [d for d in all_data if str(d.id) not in exclude]
+        return random.sample(candidates, min(limit, len(candidates)))
     except Exception as e:
         print(f"Error fetching random batch: {e}")
         return []
 
 
-def get_destinations_by_tags(tags: list, limit=4):
+def get_deck_page(limit=4, cursor=None, seed=None, exclude_ids=None):
     """
-    Fetches destinations that have at least one matching tag.
+    Returns the next `limit` destinations from a shuffled, non-repeating deck.
 
     Args:
-        tags: List of tag strings to match against (e.g., ["beach", "mountain", "temple"])
-        limit: Maximum number of destinations to return
+        limit: Number of destinations to return
+        cursor: Cursor token from the previous page, or None to start a new deck
+        seed: Optional seed for a new deck, so a session can get a reproducible order
+        exclude_ids: Optional list of destination ids to skip
 
     Returns:
-        List of destinations that match any of the provided tags, randomly sampled
+        (list of DestinationRecord, cursor token for the next page, or None)
+
+    The deck needs the whole catalog in memory. A worker that doesn't hold it
+    yet serves a fresh deck's first page from the random_destinations RPC
+    instead (only `limit` rows) and loads the catalog in the background; that
+    page has no cursor, so the client's next request starts a deck. Resuming
+    a cursor always goes through the deck so pages never repeat.
     """
     try:
-        # Fetch all destinations from the database
-        response = supabase.table('destinations').select('*').execute()
-        all_data = response.data
+        if not cursor and destination_catalog.peek() is None:
+            destination_catalog.warm()
+            return get_random_batch(limit, exclude_ids=exclude_ids), None
 
-        if not all_data:
-            return []
+        index = destination_catalog.index()
+        if index is None:
+            return [], None
 
-        # Filter destinations that have at least one matching tag
-        # We normalize both the destination tags and search tags to lowercase for matching
-        normalized_search_tags = [tag.lower() for tag in tags]
+        return destination_deck.next_page(index, limit, cursor=cursor, seed=seed, exclude_ids=exclude_ids)
+
+    except Exception as e:
+        print(f"Error fetching deck page: {e}")
+        return [], None
 
-        matching_destinations = []
-        for dest in all_data:
-            dest_tags = dest.get('tags', [])
-            # Normalize destination tags to lowercase
-            normalized_dest_tags = [t.lower() for t in dest_tags]
 
-            # Check if any of the destination's tags match any of the search tags
-            has_match = any(tag in normalized_search_tags for tag in normalized_dest_tags)
+def get_destinations_by_tags(tags: list, limit=4):
+    """
+    Fetches destinations that have at least one matching tag, best matches first.
 
-            if has_match:
-                matching_destinations.append(dest)
+    Args:
+        tags: List of tag strings to match against (e.g., ["beach", "mountain", "temple"])
+        limit: Maximum number of destinations to return
 
-        # If no matches found, return empty list
-        if not matching_destinations:
+    Returns:
+        List of DestinationRecord ranked by how many of the provided tags they carry,
+        with ties broken randomly
+    """
+    try:
+        # The tag -> destination ids index is rebuilt whenever the catalog cache refreshes
+        index = destination_catalog.index()
+        if index is None:
             return []
 
-        # Return a random sample of the matching destinations
-        count = min(limit, len(matching_destinations))
-        return random.sample(matching_destinations, count)
+        return index.rank_by_tags(tags, limit)
 
     except Exception as e:
         print(f"Error fetching destinations by tags: {e}")
@@ -0,0 +1,107 @@
+import base64
+import random
+import threading
+from collections import OrderedDict
+
+
+MAX_CACHED_DECKS = 64
+
+
+class DestinationDeck:
+    """
+    Serves the catalog as a shuffled "deck" so successive pages never repeat.
+
+    A deck is the sorted list of destination ids shuffled with a seed. Because the
+    shuffle is deterministic, the client only has to carry a small cursor token
+    (seed, catalog fingerprint, offset) and any worker can resume the same deck.
+    Shuffled decks are kept in a small LRU so paging is a list slice, not a reshuffle.
+    """
+
+    def __init__(self, max_decks: int = MAX_CACHED_DECKS):
+        self._max_decks = max_decks
+        self._decks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _deck(self, seed: int, index) -> list:
+        key = (seed, index.fingerprint)
+        with self._lock:
+            deck = self._decks.get(key)
+            if deck is not None:
+                self._decks.move_to_end(key)
+                return deck
+
+        deck = list(index.ids)
+        random.Random(seed).shuffle(deck)
+
+        with self._lock:
+            self._decks[key] = deck
+            while len(self._decks) > self._max_decks:
+                self._decks.popitem(last=False)
+        return deck
+
+    def next_page(self, index, limit: int, cursor: str = None, seed: int = None, exclude_ids=None) -> tuple:
+        """
+        Return the next `limit` records of the deck and the cursor for the page after.
+
+        Args:
+            index: CatalogIndex for the current catalog snapshot
+            limit: Page size
+            cursor: Token returned by a previous call, or None to start a new deck
+            seed: Optional seed for a new deck (ignored when resuming from `cursor`)
+            exclude_ids: Optional ids to skip while dealing
+
+        Returns:
+            (list of DestinationRecord, next cursor token)
+        """
+        if not index.ids:
+            return [], None
+
+        state = decode_cursor(cursor)
+        if state and state[1] == index.fingerprint:
+            seed, _, offset = state
+        else:
+            # No cursor, a bad one, or the catalog changed since it was issued: new shuffle
+            seed = seed if seed is not None else random.getrandbits(48)
+            offset = 0
+
+        exclude = {str(i) for i in (exclude_ids or [])}
+        picked = []
+        picked_ids = set()
+        deck = self._deck(seed, index)
+        reshuffles = 0
+
+        while len(picked) < limit:
+            if offset >= len(deck):
+                # Deck exhausted: start a fresh shuffle (at most once per call)
+                if reshuffles:
+                    break
+                reshuffles += 1
+                seed = random.getrandbits(48)
+                deck = self._deck(seed, index)
+                offset = 0
+
+            dest_id = deck[offset]
+            offset += 1
+            if dest_id in exclude or dest_id in picked_ids:
+                continue
+            picked.append(index.by_id[dest_id])
+            picked_ids.add(dest_id)
+
+        return picked, encode_cursor(seed, index.fingerprint, offset)
+
+
+def encode_cursor(seed: int, fingerprint: str, offset: int) -> str:
+    raw = f"{seed}:{fingerprint}:{offset}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return (seed, fingerprint, offset) from a cursor token, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        seed, fingerprint, offset = base64.urlsafe_b64decode(padded).decode().split(":")
+        return int(seed), fingerprint, max(int(offset), 0)
+    except (ValueError, UnicodeDecodeError):
+        return None
@@ -0,0 +1,83 @@
+# Column sets, one per kind of view. Each call site passes its set both to the
+# Supabase query (so only those columns are fetched) and to `to_json()`.
+
+# Destination cards and the hero carousel (no image_prompt: the UI never shows it)
+CARD_COLUMNS = (
+    "id", "name", "location", "description", "tags",
+    "image_url", "is_personalized", "country", "region",
+)
+
+# Newsletter and welcome email cards
+EMAIL_COLUMNS = ("id", "name", "location", "description", "image_url")
+
+# Everything the frontend Destination type knows about
+FULL_COLUMNS = CARD_COLUMNS + ("image_prompt",)
+
+# Browse listing: cards plus the keyset pagination column
+BROWSE_COLUMNS = CARD_COLUMNS + ("created_at",)
+
+# Row version (sql/destinations_updated_at.sql). Selected alongside a view's
+# columns so cached JSON can be keyed by it, but never serialized.
+VERSION_COLUMNS = ("updated_at",)
+
+
+# DB column -> (camelCase key, default when the column is missing or null)
+_JSON_FIELDS = {
+    "id": ("id", None),
+    "name": ("name", None),
+    "location": ("location", None),
+    "description": ("description", ""),
+    "tags": ("tags", ()),
+    "image_prompt": ("imagePrompt", ""),
+    "image_url": ("imageUrl", None),
+    "is_personalized": ("isPersonalized", False),
+    "country": ("country", ""),
+    "region": ("region", ""),
+    "created_at": ("createdAt", None),
+    "updated_at": ("updatedAt", None),
+}
+
+
+def select_columns(columns: tuple) -> str:
+    """Format a column set for `supabase.table(...).select()`."""
+    return ", ".join(columns)
+
+
+class DestinationRecord:
+    """
+    One row of the destinations table.
+
+    Uses __slots__ because the catalog cache holds one of these per destination
+    in every worker. Columns that were not selected stay at their defaults.
+    """
+
+    __slots__ = tuple(_JSON_FIELDS)
+
+    def __init__(self, **fields):
+        for column, (_, default) in _JSON_FIELDS.items():
+            value = fields.get(column)
+            setattr(self, column, default if value is None else value)
+
+    @classmethod
+    def from_row(cls, row: dict):
+        """Build a record from a Supabase row (extra columns are ignored)."""
+        return cls(**{column: row.get(column) for column in _JSON_FIELDS})
+
+    def to_json(self, columns: tuple = CARD_COLUMNS, is_personalized: bool = None) -> dict:
+        """
+        Serialize the given columns as the camelCase dict the frontend expects.
+
+        Args:
+            columns: Column set to include (should match what was selected)
+            is_personalized: Optional override for the isPersonalized flag
+        """
+        data = {}
+        for column in columns:
+            key, _ = _JSON_FIELDS[column]
+            data[key] = getattr(self, column)
+
+        if "id" in data:
+            data["id"] = str(data["id"])
+        if is_personalized is not None:
+            data["isPersonalized"] = is_personalized
+        return data
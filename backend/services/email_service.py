@@ -1,6 +1,7 @@
 import os
 import resend
 from dotenv import load_dotenv
+from services.tracing import span
 
 load_dotenv()
 
@@ -16,7 +17,7 @@ def send_welcome_email(to_email: str, user_name: str, destinations: list = None)
     Args:
         to_email: Recipient email address
         user_name: Recipient's name
-        destinations: Optional list of personalized destination dictionaries
+        destinations: Optional list of personalized DestinationRecord objects
     """
     try:
         # Build destination cards HTML if destinations are provided
@@ -31,17 +32,17 @@ def send_welcome_email(to_email: str, user_name: str, destinations: list = None)
             for dest in destinations[:4]:  # Limit to 4 destinations
                 destination_cards += f"""
                     <div style="margin-bottom: 20px; border-radius: 16px; overflow: hidden; border: 1px solid #e2e8f0;">
-                        <img src="{dest.get('image_url', '')}" alt="{dest.get('name', '')}"
+                        <img src="{dest.image_url or ''}" alt="{dest.name or ''}"
                              style="width: 100%; height: 180px; object-fit: cover;">
                         <div style="padding: 16px;">
                             <p style="font-size: 11px; color: #10b981; text-transform: uppercase; letter-spacing: 1px; margin: 0 0 6px 0;">
-                                {dest.get('location', '')}
+                                {dest.location or ''}
                             </p>
                             <h3 style="font-size: 18px; color: #0f172a; margin: 0 0 10px 0; font-family: Georgia, serif;">
-                                {dest.get('name', '')}
+                                {dest.name or ''}
                             </h3>
                             <p style="font-size: 13px; color: #64748b; line-height: 1.5; margin: 0;">
-                                {dest.get('description', '')[:120]}...
+                                {dest.description[:120]}...
                             </p>
                         </div>
                     </div>
@@ -88,7 +89,8 @@ def send_welcome_email(to_email: str, user_name: str, destinations: list = None)
             """
         }
 
-        email = resend.Emails.send(params)
+        with span("resend", "send"):
+            email = resend.Emails.send(params)
         print(f"✅ Welcome email sent to {to_email}")
         return email
 
@@ -104,7 +106,7 @@ def send_weekly_newsletter(to_email: str, user_name: str, destinations: list):
     Args:
         to_email: Recipient email address
         user_name: Recipient's name
-        destinations: List of destination dictionaries with name, location, description, imageUrl
+        destinations: List of DestinationRecord objects (EMAIL_COLUMNS are used)
     """
     try:
         # Build destination cards HTML
@@ -112,17 +114,17 @@ def send_weekly_newsletter(to_email: str, user_name: str, destinations: list):
         for dest in destinations[:4]:  # Limit to 4 destinations
             destination_cards += f"""
                 <div style="margin-bottom: 30px; border-radius: 16px; overflow: hidden; border: 1px solid #e2e8f0;">
-                    <img src="{dest.get('image_url', '')}" alt="{dest.get('name', '')}"
+                    <img src="{dest.image_url or ''}" alt="{dest.name or ''}"
                          style="width: 100%; height: 200px; object-fit: cover;">
                     <div style="padding: 20px;">
                         <p style="font-size: 12px; color: #10b981; text-transform: uppercase; letter-spacing: 1px; margin: 0 0 8px 0;">
-                            {dest.get('location', '')}
+                            {dest.location or ''}
                         </p>
                         <h3 style="font-size: 20px; color: #0f172a; margin: 0 0 12px 0; font-family: Georgia, serif;">
-                            {dest.get('name', '')}
+                            {dest.name or ''}
                         </h3>
                         <p style="font-size: 14px; color: #64748b; line-height: 1.5; margin: 0;">
-                            {dest.get('description', '')[:150]}...
+                            {dest.description[:150]}...
                         </p>
                     </div>
                 </div>
@@ -167,7 +169,8 @@ def send_weekly_newsletter(to_email: str, user_name: str, destinations: list):
             """
         }
 
-        email = resend.Emails.send(params)
+        with span("resend", "send"):
+            email = resend.Emails.send(params)
         print(f"✅ Weekly newsletter sent to {to_email}")
         return email
 
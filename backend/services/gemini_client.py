@@ -0,0 +1,374 @@
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dotenv import load_dotenv
+from google import genai
+from google.genai import errors
+from services.metrics import (
+    GEMINI_ERRORS,
+    GEMINI_LATENCY,
+    GEMINI_RETRIES,
+    GEMINI_THROTTLE_WAIT,
+    error_class,
+    record_usage,
+)
+from services.tracing import record_span
+
+load_dotenv()
+
+# Requests/min and tokens/min per model (0 = unlimited) for the whole project.
+# Buckets live in each process, so every process enforces 1/GEMINI_RATE_LIMIT_PROCESSES
+# of these; gunicorn.conf.py sets that to the worker count. Raise it if other
+# replicas share the quota. Override with GEMINI_RATE_LIMITS="model=rpm:tpm,model=rpm",
+# and set the fallback for other models with GEMINI_DEFAULT_RPM / GEMINI_DEFAULT_TPM.
+DEFAULT_RATE_LIMITS = {
+    'gemini-3-flash-preview': (1000, 1_000_000),
+    'imagen-4.0-generate-001': (10, 0),
+}
+
+# Output tokens reserved up front for a text call; corrected from usage_metadata afterwards
+DEFAULT_OUTPUT_TOKEN_ESTIMATE = 2048
+
+RETRYABLE_CODES = (429, 500, 502, 503, 504)
+
+# Longest an interactive request waits for a rate-limit slot or a retry backoff
+# before giving up with RateLimited (see max_throttle_wait)
+REQUEST_MAX_WAIT = float(os.environ.get("GEMINI_REQUEST_MAX_WAIT", 5))
+
+# Wait limit for calls made in the current context; None (the seeder, job workers) waits as long as it takes
+_max_wait = ContextVar('gemini_max_wait', default=None)
+
+# Retry-After suggested when every concurrency slot stayed busy for the whole wait
+SLOT_RETRY_AFTER = 1.0
+
+
+class RateLimited(Exception):
+    """Raised instead of waiting longer than the caller's max wait for a Gemini slot."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Gemini rate limit reached, next slot in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+@contextmanager
+def max_throttle_wait(seconds: float = REQUEST_MAX_WAIT):
+    """
+    Make Gemini calls in this block raise RateLimited rather than spend more than
+    `seconds` in total waiting for the rate limiter, a concurrency slot or retry
+    backoffs. Request handlers use this so a worker thread isn't parked for
+    minutes when a per-worker quota is small.
+    """
+    token = _max_wait.set(seconds)
+    try:
+        yield
+    finally:
+        _max_wait.reset(token)
+
+
+def current_max_wait():
+    """The max_throttle_wait limit in effect here, or None when calls wait as long as it takes."""
+    return _max_wait.get()
+
+
+class _WaitBudget:
+    """
+    What is left of one call's max wait, shared by its rate-limiter waits, slot
+    waits and retry backoffs. Time spent in flight is not counted.
+    """
+
+    def __init__(self, seconds):
+        self.remaining = seconds
+
+    def spend(self, seconds: float):
+        if self.remaining is not None:
+            self.remaining = max(0.0, self.remaining - seconds)
+
+
+class TokenBucket:
+    """
+    Continuous-refill bucket holding up to `per_minute` units.
+
+    acquire() blocks until the requested units are available, so callers are
+    spread out at the configured rate instead of bursting into a 429. With a
+    `max_wait` it raises RateLimited instead of waiting longer than that.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self._tokens = self.capacity
+        self._rate = self.capacity / 60.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1, max_wait: float = None) -> float:
+        """Take `amount` units (capped at capacity), waiting as needed. Returns seconds waited."""
+        if self.capacity <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self._rate
+            if max_wait is not None and waited + delay > max_wait:
+                raise RateLimited(delay)
+            time.sleep(delay)
+            waited += delay
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) units without waiting, e.g. after real usage is known."""
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+def _parse_rate_limits(spec: str) -> dict:
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, values = item.partition("=")
+        rpm, _, tpm = values.partition(":")
+        try:
+            limits[model.strip()] = (float(rpm or 0), float(tpm or 0))
+        except ValueError:
+            print(f"⚠️ Ignoring malformed GEMINI_RATE_LIMITS entry '{item}'")
+    return limits
+
+
+def _estimate_tokens(contents) -> int:
+    # About 4 characters per token is close enough for budgeting
+    return max(1, len(str(contents)) // 4)
+
+
+def _retry_delay_hint(error) -> float:
+    """Server-suggested delay from a 429 (RetryInfo.retryDelay), or 0."""
+    match = re.search(r"retryDelay'?\"?:\s*'?\"?(\d+(?:\.\d+)?)s", str(getattr(error, 'details', '')))
+    return float(match.group(1)) if match else 0.0
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_CODES
+    return "429" in str(error) or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def _observe(call_site: str, model: str, outcome: str, seconds: float):
+    GEMINI_LATENCY.labels(call_site, model, outcome).observe(seconds)
+    record_span("gemini", call_site, seconds)
+
+
+class GeminiClient:
+    """
+    Thin wrapper over google-genai shared by the API services and the seeder.
+
+    Every call waits for its model's request and token buckets, holds one slot
+    of a process-wide concurrency cap while in flight, and retries 429s and
+    transient 5xx errors with exponential backoff and full jitter. Rate limits
+    are divided by `processes`, the number of processes sharing the quota.
+    """
+
+    def __init__(self, client=None, max_concurrency: int = 16, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0, rate_limits: dict = None,
+                 default_limits: tuple = (0, 0), processes: int = 1):
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._limits = dict(DEFAULT_RATE_LIMITS, **(rate_limits or {}))
+        self._default_limits = default_limits
+        self._processes = max(1, processes)
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+        return self._client
+
+    def _buckets_for(self, model: str) -> tuple:
+        with self._buckets_lock:
+            if model not in self._buckets:
+                rpm, tpm = self._limits.get(model, self._default_limits)
+                self._buckets[model] = (TokenBucket(rpm / self._processes), TokenBucket(tpm / self._processes))
+            return self._buckets[model]
+
+    def _throttle(self, model: str, tokens: int, call_site: str, max_wait: float = None) -> float:
+        """Wait for the model's request and token buckets. Returns seconds waited."""
+        requests, token_bucket = self._buckets_for(model)
+        try:
+            waited = requests.acquire(1, max_wait)
+            try:
+                waited += token_bucket.acquire(tokens, None if max_wait is None else max_wait - waited)
+            except RateLimited:
+                # Give back the request slot taken for a call that won't be made
+                requests.adjust(-1)
+                raise
+        except RateLimited as e:
+            GEMINI_ERRORS.labels(call_site, model, error_class(e)).inc()
+            raise
+        if waited:
+            GEMINI_THROTTLE_WAIT.labels(call_site, model).inc(waited)
+            with self._stats_lock:
+                self.throttled_seconds += waited
+        return waited
+
+    def _acquire_slot(self, model: str, tokens: int, call_site: str, max_wait: float = None) -> float:
+        """
+        Take a concurrency slot. If none frees up within `max_wait`, give back the
+        bucket reservation and raise RateLimited. Returns seconds waited.
+        """
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=max_wait):
+            requests, token_bucket = self._buckets_for(model)
+            requests.adjust(-1)
+            token_bucket.adjust(-tokens)
+            GEMINI_ERRORS.labels(call_site, model, "RateLimited").inc()
+            raise RateLimited(SLOT_RETRY_AFTER)
+        return time.monotonic() - started
+
+    def _retry_or_raise(self, model: str, attempt: int, error: Exception, call_site: str,
+                        can_retry: bool = True, max_wait: float = None) -> float:
+        """Back off before the next attempt, or record the failure and re-raise. Returns seconds slept."""
+        if not can_retry or attempt >= self._max_retries or not is_retryable(error):
+            GEMINI_ERRORS.labels(call_site, model, error_class(error)).inc()
+            raise error
+
+        delay = random.uniform(0, min(self._max_delay, self._base_delay * 2 ** attempt))
+        delay = max(delay, _retry_delay_hint(error))
+        if max_wait is not None and delay > max_wait:
+            GEMINI_ERRORS.labels(call_site, model, "RateLimited").inc()
+            raise RateLimited(delay) from error
+        GEMINI_RETRIES.labels(call_site, model, str(getattr(error, 'code', 'unknown'))).inc()
+        with self._stats_lock:
+            self.retries += 1
+        print(f"⏳ Gemini {model} ({call_site}) returned {getattr(error, 'code', error)}; "
+              f"retrying in {delay:.1f}s ({attempt + 1}/{self._max_retries})", flush=True)
+        time.sleep(delay)
+        return delay
+
+    def _wait_for_turn(self, model: str, tokens: int, call_site: str, budget: _WaitBudget):
+        budget.spend(self._throttle(model, tokens, call_site, budget.remaining))
+        budget.spend(self._acquire_slot(model, tokens, call_site, budget.remaining))
+
+    def _call(self, model: str, tokens: int, call_site: str, fn):
+        # One max wait for the whole call, however many attempts it takes
+        budget = _WaitBudget(_max_wait.get())
+        attempt = 0
+        while True:
+            self._wait_for_turn(model, tokens, call_site, budget)
+            started = time.perf_counter()
+            try:
+                try:
+                    response = fn()
+                finally:
+                    self._slots.release()
+                _observe(call_site, model, "success", time.perf_counter() - started)
+                return response
+            except Exception as e:
+                _observe(call_site, model, error_class(e), time.perf_counter() - started)
+                # A rejected call produced no tokens, so hand the reservation back
+                self._buckets_for(model)[1].adjust(-tokens)
+                budget.spend(self._retry_or_raise(model, attempt, e, call_site, max_wait=budget.remaining))
+                attempt += 1
+
+    def _settle_tokens(self, model: str, reserved: int, usage, call_site: str):
+        record_usage(call_site, model, usage)
+        actual = getattr(usage, 'total_token_count', None) if usage is not None else None
+        if actual is not None:
+            self._buckets_for(model)[1].adjust(actual - reserved)
+
+    def generate_content(self, model: str, contents, config=None, call_site: str = "unknown"):
+        """Rate-limited, retrying client.models.generate_content."""
+        reserved = _estimate_tokens(contents) + DEFAULT_OUTPUT_TOKEN_ESTIMATE
+        response = self._call(
+            model, reserved, call_site,
+            lambda: self.client.models.generate_content(model=model, contents=contents, config=config)
+        )
+        self._settle_tokens(model, reserved, getattr(response, 'usage_metadata', None), call_site)
+        return response
+
+    def generate_content_stream(self, model: str, contents, config=None, call_site: str = "unknown"):
+        """
+        Rate-limited client.models.generate_content_stream.
+
+        Failures before the first chunk are retried like generate_content; once
+        chunks have been yielded an error is raised to the caller as-is. Latency
+        covers the whole stream.
+        """
+        reserved = _estimate_tokens(contents) + DEFAULT_OUTPUT_TOKEN_ESTIMATE
+        budget = _WaitBudget(_max_wait.get())
+        attempt = 0
+        while True:
+            self._wait_for_turn(model, reserved, call_site, budget)
+            started = time.perf_counter()
+            chunks = 0
+            usage = None
+            try:
+                try:
+                    for chunk in self.client.models.generate_content_stream(
+                        model=model, contents=contents, config=config
+                    ):
+                        chunks += 1
+                        usage = getattr(chunk, 'usage_metadata', None) or usage
+                        yield chunk
+                finally:
+                    self._slots.release()
+                _observe(call_site, model, "success", time.perf_counter() - started)
+                self._settle_tokens(model, reserved, usage, call_site)
+                return
+            except Exception as e:
+                _observe(call_site, model, error_class(e), time.perf_counter() - started)
+                if not chunks:
+                    self._buckets_for(model)[1].adjust(-reserved)
+                budget.spend(self._retry_or_raise(
+                    model, attempt, e, call_site, can_retry=not chunks, max_wait=budget.remaining
+                ))
+                attempt += 1
+
+    def generate_images(self, model: str, prompt: str, config=None, call_site: str = "unknown"):
+        """Rate-limited, retrying client.models.generate_images."""
+        return self._call(
+            model, 0, call_site,
+            lambda: self.client.models.generate_images(model=model, prompt=prompt, config=config)
+        )
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "retries": self.retries,
+                "throttledSeconds": round(self.throttled_seconds, 3),
+                "rateLimitProcesses": self._processes,
+            }
+
+
+gemini = GeminiClient(
+    max_concurrency=int(os.environ.get("GEMINI_MAX_CONCURRENCY", 16)),
+    max_retries=int(os.environ.get("GEMINI_MAX_RETRIES", 5)),
+    rate_limits=_parse_rate_limits(os.environ.get("GEMINI_RATE_LIMITS", "")),
+    default_limits=(
+        float(os.environ.get("GEMINI_DEFAULT_RPM", 0)),
+        float(os.environ.get("GEMINI_DEFAULT_TPM", 0)),
+    ),
+    processes=int(os.environ.get("GEMINI_RATE_LIMIT_PROCESSES", 1)),
+)
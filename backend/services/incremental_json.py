@@ -0,0 +1,99 @@
+import json
+
+
+class JsonArrayStreamParser:
+    """
+    Incrementally parses a top-level JSON array arriving in arbitrary text chunks.
+
+    `feed()` returns every element whose closing bracket/brace/quote has arrived,
+    so the caller can act on each item while the rest of the array is still being
+    generated. Only the text of the current, unfinished element is kept in memory.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0            # next character of _buffer to scan
+        self._started = False    # seen the opening '['
+        self.finished = False    # seen the closing ']'
+        self._depth = 0          # nesting depth inside the current element
+        self._in_string = False
+        self._escaped = False
+        self._element_start = None
+
+    def feed(self, text: str) -> list:
+        """Consume the next chunk of text and return the elements it completed."""
+        if self.finished or not text:
+            return []
+
+        self._buffer += text
+        completed = []
+        buffer = self._buffer
+        i = self._pos
+
+        while i < len(buffer):
+            ch = buffer[i]
+
+            if not self._started:
+                if ch == "[":
+                    self._started = True
+                elif not ch.isspace():
+                    raise ValueError(f"Expected a JSON array, got {ch!r}")
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 0:
+                        # A bare string element ends with its closing quote
+                        completed.append(self._take(buffer, i + 1))
+                i += 1
+                continue
+
+            if self._element_start is None:
+                # Between elements: skip separators, stop at the end of the array
+                if ch.isspace() or ch == ",":
+                    i += 1
+                    continue
+                if ch == "]":
+                    self.finished = True
+                    i += 1
+                    break
+                self._element_start = i
+
+            if self._depth == 0 and ch in ",]" and i > self._element_start:
+                # End of a bare scalar (number, true, false, null). Checked before the
+                # bracket case: at depth 0 this ']' closes the array, not the element.
+                completed.append(self._take(buffer, i))
+                if ch == "]":
+                    self.finished = True
+                    i += 1
+                    break
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append(self._take(buffer, i + 1))
+            i += 1
+
+        # Drop everything before the current element so memory stays bounded
+        if self._element_start is None:
+            self._buffer = buffer[i:]
+            self._pos = 0
+        else:
+            self._buffer = buffer[self._element_start:]
+            self._pos = i - self._element_start
+            self._element_start = 0
+        return completed
+
+    def _take(self, buffer: str, end: int):
+        value = json.loads(buffer[self._element_start:end])
+        self._element_start = None
+        return value
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import math
+import os
+import threading
+from datetime import date, datetime, timedelta
+from services.catalog_cache import ttl_from_env
+from services.gemini_client import current_max_wait
+from services.result_store import SqliteResultStore, default_cache_path
+from services.single_flight import SingleFlight
+
+# Budgets are bucketed on a log scale so e.g. SGD 4000 and SGD 4200 per person
+# share a plan, while SGD 2000 and SGD 4000 do not
+BUDGET_BUCKET_RATIO = 1.25
+
+# Bump when the prompt or schema changes so old plans stop matching
+CACHE_VERSION = 1
+
+
+def normalize_text(value) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def parse_trip_date(value):
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _budget_bucket(amount):
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        return None
+    if amount <= 0:
+        return 0
+    return int(math.floor(math.log(amount) / math.log(BUDGET_BUCKET_RATIO)))
+
+
+def canonical_trip(trip_data: dict) -> dict:
+    """
+    Reduce a generate request to the parameters that actually shape the plan.
+
+    Concrete dates are replaced by the trip length and starting month (the plan
+    is re-dated on the way out), free text is case/whitespace-normalised, and
+    list inputs are sorted so their order doesn't matter.
+    """
+    start = parse_trip_date(trip_data.get('startDate'))
+    end = parse_trip_date(trip_data.get('endDate'))
+    if start and end:
+        length = (end - start).days + 1
+        month = start.month
+    else:
+        # Unparseable dates go into the key verbatim so they never collide
+        length = f"{trip_data.get('startDate')}/{trip_data.get('endDate')}"
+        month = None
+
+    companions = normalize_text(trip_data.get('companions') or 'solo')
+    # The prompt only mentions group size for families and friends
+    people = trip_data.get('numberOfPeople', 1) if companions in ('family', 'friends') else None
+
+    places = sorted(
+        normalize_text(p.get('name'))
+        for p in trip_data.get('specificDestinations') or []
+        if isinstance(p, dict) and p.get('name')
+    )
+
+    answers = sorted(
+        (normalize_text(qa.get('question')), normalize_text(qa.get('answer')))
+        for qa in trip_data.get('clarifyingAnswers') or []
+        if isinstance(qa, dict) and qa.get('question') and qa.get('answer')
+    )
+
+    return {
+        "v": CACHE_VERSION,
+        "destination": normalize_text(trip_data.get('destination')),
+        "length": length,
+        "month": month,
+        "companions": companions,
+        "people": people,
+        "currency": normalize_text(trip_data.get('currency') or 'USD'),
+        "budget": _budget_bucket(trip_data.get('budgetAmount', 5000)),
+        "places": places,
+        "answers": answers,
+    }
+
+
+def trip_cache_key(trip_data: dict) -> str:
+    """Content address of a trip request: sha256 of its canonical form."""
+    canonical = json.dumps(canonical_trip(trip_data), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def redate_itinerary(itinerary: list, start_date) -> list:
+    """
+    Return a copy of the plan with day N dated start_date + (N - 1) days.
+
+    Plans are cached independently of their dates, so a hit generated for a
+    different start date is shifted onto the requested one.
+    """
+    start = start_date if isinstance(start_date, date) else parse_trip_date(start_date)
+    if start is None:
+        return itinerary
+
+    redated = []
+    for index, day in enumerate(itinerary):
+        day = dict(day)
+        try:
+            number = int(day.get('day', index + 1))
+        except (TypeError, ValueError):
+            number = index + 1
+        day['date'] = (start + timedelta(days=number - 1)).isoformat()
+        redated.append(day)
+    return redated
+
+
+class ItineraryCache:
+    """
+    Persistent cache of generated itineraries keyed by trip_cache_key().
+
+    Plans live in a SQLite file shared by all workers on the host. Concurrent
+    misses for the same key inside one worker share a single Gemini call.
+    """
+
+    def __init__(self, store: SqliteResultStore, enabled: bool = True):
+        self._store = store
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get_or_generate(self, trip_data: dict, generate) -> dict:
+        """
+        Return {itinerary, countries} for trip_data from the cache, or by calling
+        generate(trip_data). Errors from generate are returned but never cached.
+        """
+        if not self.enabled:
+            return generate(trip_data)
+
+        key = trip_cache_key(trip_data)
+        cached = self._store.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return self._present(cached, trip_data)
+
+        with self._lock:
+            self.misses += 1
+
+        def fill():
+            result = generate(trip_data)
+            if result and "error" not in result:
+                self.put(key, result)
+            return result
+
+        # Only callers with the same Gemini wait limit share a call: a job worker
+        # must not inherit a request's RateLimited, nor a request wait behind a
+        # job's unbounded throttling
+        result = self._flight.do((key, current_max_wait()), fill)
+        if not result or "error" in result:
+            return result
+        return self._present(result, trip_data)
+
+    def lookup(self, trip_data: dict):
+        """Return the cached {itinerary, countries} re-dated for trip_data, or None."""
+        if not self.enabled:
+            return None
+        cached = self._store.get(trip_cache_key(trip_data))
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if cached is None else self._present(cached, trip_data)
+
+    def put(self, key: str, result: dict):
+        self._store.put(key, {"itinerary": result["itinerary"], "countries": result["countries"]})
+        with self._lock:
+            self.stores += 1
+
+    def _present(self, result: dict, trip_data: dict) -> dict:
+        return {
+            "itinerary": redate_itinerary(result["itinerary"], trip_data.get('startDate')),
+            "countries": result["countries"],
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": self._store.size() if self.enabled else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self._flight.shared,
+                "stores": self.stores,
+                "hitRate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+itinerary_cache = ItineraryCache(
+    SqliteResultStore(
+        os.environ.get("ITINERARY_CACHE_PATH") or default_cache_path("bucketgem_itinerary_cache.sqlite3"),
+        table="itineraries",
+        max_entries=int(os.environ.get("ITINERARY_CACHE_MAX_ENTRIES", 5000)),
+        ttl=ttl_from_env("ITINERARY_CACHE_TTL", 7 * 24 * 3600),
+    ),
+    enabled=os.environ.get("ITINERARY_CACHE_ENABLED", "1") != "0",
+)
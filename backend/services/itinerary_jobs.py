@@ -0,0 +1,185 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from services.catalog_cache import ttl_from_env
+from services.itinerary_service import generate_itinerary
+from services.result_store import SqliteResultStore, default_cache_path
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    """Raised by submit() when the backend cannot accept more work right now."""
+
+
+class JobBackend(ABC):
+    """
+    Interface for itinerary job queues.
+
+    submit() enqueues a trip request and returns a job id, get() returns the job
+    record ({jobId, status, createdAt, ...}) or None once it is unknown or expired.
+    """
+
+    @abstractmethod
+    def submit(self, payload: dict) -> str:
+        """Enqueue a trip request and return its job id (raises QueueFull when saturated)."""
+
+    @abstractmethod
+    def get(self, job_id: str):
+        """Return the job record, or None if the job is unknown or expired."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Queue and outcome counters for the ops endpoint."""
+
+
+class InProcessJobBackend(JobBackend):
+    """
+    Runs jobs on a bounded pool of threads inside the web process.
+
+    At most `max_pending` jobs wait in the queue; beyond that submit() raises
+    QueueFull so the route can shed load. Finished jobs expire `ttl` seconds
+    after their last update.
+
+    Everything here is per gunicorn worker except the job records: the queue,
+    the threads, the limits and stats() belong to the worker that accepted the
+    job. Records go to a SQLite file (by default in /tmp), which the workers of
+    one host or container share, so a poll may land on any of them. They are
+    not shared beyond that:
+
+    - With several containers or hosts behind a load balancer, a poll that
+      reaches another instance gets 404. Use sticky routing, put
+      ITINERARY_JOB_STORE_PATH on a volume every instance mounts, or register
+      a shared backend (see register_backend).
+    - If the accepting worker is restarted or killed, its jobs are lost and
+      stay "queued"/"running" until they expire.
+    """
+
+    def __init__(self, handler, store: SqliteResultStore, workers: int = 4, max_pending: int = 32):
+        self._handler = handler
+        self._store = store
+        self._workers = workers
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _ensure_workers(self):
+        # Threads do not survive a fork, so each gunicorn worker starts its own pool
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            for i in range(self._workers):
+                threading.Thread(target=self._work, name=f"itinerary-job-{i}", daemon=True).start()
+
+    def submit(self, payload: dict) -> str:
+        self._ensure_workers()
+        job_id = uuid.uuid4().hex
+        record = {"jobId": job_id, "status": QUEUED, "createdAt": time.time()}
+        # Written before enqueueing so a worker's "running" update can't be
+        # overwritten by it; a rejected job's record is removed again
+        self._store.put(job_id, record)
+        try:
+            self._queue.put_nowait((job_id, payload, record))
+        except queue.Full:
+            self._store.delete(job_id)
+            with self._lock:
+                self.rejected += 1
+            raise QueueFull()
+        with self._lock:
+            self.submitted += 1
+        return job_id
+
+    def get(self, job_id: str):
+        return self._store.get(job_id)
+
+    def _work(self):
+        while True:
+            job_id, payload, record = self._queue.get()
+            with self._lock:
+                self._running += 1
+            record = dict(record, status=RUNNING, startedAt=time.time())
+            self._store.put(job_id, record)
+            try:
+                result = self._handler(payload)
+                if not result or "error" in result:
+                    error = (result or {}).get("error", "unknown")
+                    record = dict(record, status=FAILED, error=f"Failed to generate itinerary: {error}")
+                else:
+                    record = dict(record, status=SUCCEEDED, result=result)
+            except Exception as e:
+                print(f"❌ Itinerary job {job_id} failed: {e}", flush=True)
+                record = dict(record, status=FAILED, error=f"Failed to generate itinerary: {e}")
+            record["finishedAt"] = time.time()
+            self._store.put(job_id, record)
+            with self._lock:
+                self._running -= 1
+                if record["status"] == SUCCEEDED:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            self._queue.task_done()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "inprocess",
+                "workers": self._workers,
+                "queued": self._queue.qsize(),
+                "queueLimit": self._queue.maxsize,
+                "running": self._running,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+
+def _in_process_backend(handler):
+    return InProcessJobBackend(
+        handler,
+        SqliteResultStore(
+            os.environ.get("ITINERARY_JOB_STORE_PATH") or default_cache_path("bucketgem_itinerary_jobs.sqlite3"),
+            table="itinerary_jobs",
+            max_entries=int(os.environ.get("ITINERARY_JOB_MAX_RECORDS", 10000)),
+            ttl=ttl_from_env("ITINERARY_JOB_TTL", 3600),
+        ),
+        workers=int(os.environ.get("ITINERARY_JOB_WORKERS", 4)),
+        max_pending=int(os.environ.get("ITINERARY_JOB_QUEUE_SIZE", 32)),
+    )
+
+
+# name -> factory(handler) returning a JobBackend; selected with ITINERARY_JOB_BACKEND
+_BACKENDS = {"inprocess": _in_process_backend}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def register_backend(name: str, factory):
+    """Make a JobBackend factory available under ITINERARY_JOB_BACKEND=<name>."""
+    _BACKENDS[name] = factory
+
+
+def get_job_backend() -> JobBackend:
+    """Return the configured job backend, creating it on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = os.environ.get("ITINERARY_JOB_BACKEND", "inprocess")
+            if name not in _BACKENDS:
+                raise ValueError(f"Unknown ITINERARY_JOB_BACKEND '{name}' (known: {', '.join(sorted(_BACKENDS))})")
+            _backend = _BACKENDS[name](generate_itinerary)
+        return _backend
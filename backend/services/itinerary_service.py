@@ -1,14 +1,20 @@
 import os
 import json
-from google import genai
+import math
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import timedelta
 from google.genai import types
 from dotenv import load_dotenv
+from services.gemini_client import RateLimited, gemini
+from services.incremental_json import JsonArrayStreamParser
+from services.itinerary_cache import itinerary_cache, parse_trip_date, trip_cache_key
+from services.questions_cache import questions_cache
+from services.tracing import bind_spans
 
 load_dotenv()
 
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-
-
 def generate_clarifying_questions(trip_data: dict) -> list:
     """
     Generate 0-3 yes/no clarifying questions using Gemini to better tailor the itinerary.
@@ -18,7 +24,18 @@ def generate_clarifying_questions(trip_data: dict) -> list:
 
     Returns:
         list of dicts with 'id' and 'text' keys
+
+    Results are memoized per destination, trip-length bucket, companions and
+    chosen places, so common trips skip the Gemini round trip.
     """
+    try:
+        return questions_cache.get_or_generate(trip_data, _generate_clarifying_questions_uncached)
+    except Exception as e:
+        print(f"Failed to generate clarifying questions: {e}", flush=True)
+        return []
+
+
+def _generate_clarifying_questions_uncached(trip_data: dict) -> list:
     destination = trip_data.get('destination', '')
     start_date = trip_data.get('startDate', '')
     end_date = trip_data.get('endDate', '')
@@ -61,46 +78,82 @@ def generate_clarifying_questions(trip_data: dict) -> list:
         "Return a JSON array of question strings. Return [] if no questions are needed."
     )
 
-    try:
-        response = client.models.generate_content(
-            model='gemini-3-flash-preview',
-            contents=prompt_text,
-            config=types.GenerateContentConfig(
-                response_mime_type='application/json',
-                temperature=0.3,
-                response_schema={
-                    "type": "ARRAY",
-                    "items": {
-                        "type": "STRING"
-                    }
+    response = gemini.generate_content(
+        model='gemini-3-flash-preview',
+        contents=prompt_text,
+        config=types.GenerateContentConfig(
+            response_mime_type='application/json',
+            temperature=0.3,
+            response_schema={
+                "type": "ARRAY",
+                "items": {
+                    "type": "STRING"
                 }
-            )
-        )
+            }
+        ),
+        call_site='clarifying_questions'
+    )
 
-        questions_raw = json.loads(response.text)
-        # Limit to 3 questions max and format with IDs
-        questions = [
-            {"id": f"q{i}", "text": q}
-            for i, q in enumerate(questions_raw[:3])
-        ]
-        return questions
+    questions_raw = json.loads(response.text)
+    # Limit to 3 questions max and format with IDs
+    questions = [
+        {"id": f"q{i}", "text": q}
+        for i, q in enumerate(questions_raw[:3])
+    ]
+    return questions
 
-    except Exception as e:
-        print(f"Failed to generate clarifying questions: {e}", flush=True)
-        return []
 
+ITINERARY_MODEL = 'gemini-3-flash-preview'
 
-def generate_itinerary(trip_data: dict) -> dict:
-    """
-    Generate a day-by-day itinerary using Gemini based on trip parameters.
+ITINERARY_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "day": {"type": "INTEGER"},
+            "date": {"type": "STRING"},
+            "activities": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "time": {"type": "STRING"},
+                        "title": {"type": "STRING"},
+                        "description": {"type": "STRING"},
+                        "location": {"type": "STRING"},
+                        "country": {"type": "STRING"}
+                    },
+                    "required": ["time", "title", "description", "location", "country"]
+                }
+            }
+        },
+        "required": ["day", "date", "activities"]
+    }
+}
 
-    Args:
-        trip_data: dict with keys: destination, startDate, endDate, currency,
-                   budgetAmount, companions, numberOfPeople, specificDestinations
 
-    Returns:
-        dict with 'itinerary' (list of days) and 'countries' (list of country names)
-    """
+def _itinerary_config() -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        response_mime_type='application/json',
+        temperature=0.8,
+        response_schema=ITINERARY_SCHEMA
+    )
+
+
+def extract_countries(itinerary: list) -> list:
+    """Return the sorted unique country names mentioned by any activity."""
+    countries = list(set(
+        activity.get('country', '')
+        for day in itinerary
+        for activity in day.get('activities', [])
+        if activity.get('country')
+    ))
+    countries.sort()
+    return countries
+
+
+def _trip_context(trip_data: dict) -> dict:
+    """Prompt fragments describing the traveler, shared by the itinerary and outline prompts."""
     destination = trip_data.get('destination', '')
     start_date = trip_data.get('startDate', '')
     end_date = trip_data.get('endDate', '')
@@ -152,12 +205,35 @@ def generate_itinerary(trip_data: dict) -> dict:
                 + "\nAdjust the itinerary to reflect these preferences."
             )
 
+    return {
+        "destination": destination,
+        "start_date": start_date,
+        "end_date": end_date,
+        "currency": currency,
+        "budget_amount": budget_amount,
+        "companion_text": companion_text,
+        "places_hint": places_hint,
+        "clarifying_context": clarifying_context,
+    }
+
+
+def build_itinerary_prompt(trip_data: dict, scope: str = "") -> str:
+    """
+    Build the Gemini prompt for a day-by-day itinerary.
+
+    Args:
+        trip_data: dict with keys: destination, startDate, endDate, currency,
+                   budgetAmount, companions, numberOfPeople, specificDestinations
+        scope: optional extra instructions (e.g. which segment of a long trip to
+               plan), inserted just before the output format line
+    """
+    ctx = _trip_context(trip_data)
     prompt_text = (
         "You are an expert travel planner who creates realistic, well-paced itineraries. "
-        f"Create a detailed day-by-day travel itinerary for {companion_text} "
-        f"traveling to {destination} from {start_date} to {end_date}. "
-        f"The budget is {currency} {budget_amount} per person. "
-        f"Plan 3-5 activities per day with realistic timings.{places_hint}{clarifying_context}\n\n"
+        f"Create a detailed day-by-day travel itinerary for {ctx['companion_text']} "
+        f"traveling to {ctx['destination']} from {ctx['start_date']} to {ctx['end_date']}. "
+        f"The budget is {ctx['currency']} {ctx['budget_amount']} per person. "
+        f"Plan 3-5 activities per day with realistic timings.{ctx['places_hint']}{ctx['clarifying_context']}\n\n"
         "Take the country's culture into consideration"
         "Include a mix of sightseeing, food, culture, and leisure. "
         "Take the proximity of locations from one another into consideration, planning an efficient route"
@@ -166,60 +242,378 @@ def generate_itinerary(trip_data: dict) -> dict:
         "1. The traveler's chosen destinations get adequate time (full days, not brief visits).\n"
         "2. The pacing is realistic with no rushed transitions.\n"
         "3. Activities match what each destination is actually known for.\n\n"
+        f"{scope}"
         "Return a JSON array of days, each containing a day number, date, and list of activities."
     )
 
+    return prompt_text
+
+
+def generate_itinerary(trip_data: dict) -> dict:
+    """
+    Generate a day-by-day itinerary using Gemini based on trip parameters.
+
+    Args:
+        trip_data: dict with keys: destination, startDate, endDate, currency,
+                   budgetAmount, companions, numberOfPeople, specificDestinations
+
+    Returns:
+        dict with 'itinerary' (list of days) and 'countries' (list of country names)
+
+    Plans are served from the itinerary cache when an equivalent trip was planned
+    before, re-dated to this trip's startDate.
+
+    Raises:
+        RateLimited: inside max_throttle_wait, when Gemini has no free slot in time
+    """
+    return itinerary_cache.get_or_generate(trip_data, _generate_itinerary_uncached)
+
+
+def _generate_itinerary_uncached(trip_data: dict) -> dict:
+    if _segment_plan(trip_data):
+        return _generate_itinerary_segmented(trip_data)
+
+    prompt_text = build_itinerary_prompt(trip_data)
+
     try:
-        response = client.models.generate_content(
-            model='gemini-3-flash-preview',
+        response = gemini.generate_content(
+            model=ITINERARY_MODEL,
             contents=prompt_text,
-            config=types.GenerateContentConfig(
-                response_mime_type='application/json',
-                temperature=0.8,
-                response_schema={
-                    "type": "ARRAY",
-                    "items": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "day": {"type": "INTEGER"},
-                            "date": {"type": "STRING"},
-                            "activities": {
-                                "type": "ARRAY",
-                                "items": {
-                                    "type": "OBJECT",
-                                    "properties": {
-                                        "time": {"type": "STRING"},
-                                        "title": {"type": "STRING"},
-                                        "description": {"type": "STRING"},
-                                        "location": {"type": "STRING"},
-                                        "country": {"type": "STRING"}
-                                    },
-                                    "required": ["time", "title", "description", "location", "country"]
-                                }
-                            }
-                        },
-                        "required": ["day", "date", "activities"]
-                    }
-                }
-            )
+            config=_itinerary_config(),
+            call_site='itinerary'
         )
 
         itinerary = json.loads(response.text)
 
-        # Extract unique countries from all activities
-        countries = list(set(
-            activity.get('country', '')
-            for day in itinerary
-            for activity in day.get('activities', [])
-            if activity.get('country')
-        ))
-        countries.sort()
-
         return {
             "itinerary": itinerary,
-            "countries": countries
+            "countries": extract_countries(itinerary)
         }
 
+    except RateLimited:
+        raise
     except Exception as e:
         print(f"❌ Itinerary generation failed: {e}", flush=True)
         return {"error": str(e)}
+
+
+# Trips longer than SEGMENT_THRESHOLD_DAYS are planned as segments of about
+# SEGMENT_DAYS days, generated in parallel from a shared route outline. Output
+# tokens dominate generation time, so wall-clock time tracks one segment rather
+# than the whole trip.
+SEGMENT_THRESHOLD_DAYS = int(os.environ.get("ITINERARY_SEGMENT_THRESHOLD", 8))
+SEGMENT_DAYS = int(os.environ.get("ITINERARY_SEGMENT_DAYS", 5))
+SEGMENT_ATTEMPTS = 2
+
+_segment_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ITINERARY_SEGMENT_WORKERS", 8)),
+    thread_name_prefix="itinerary-segment",
+)
+
+OUTLINE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "day": {"type": "INTEGER"},
+            "base": {"type": "STRING"},
+            "focus": {"type": "STRING"}
+        },
+        "required": ["day", "base", "focus"]
+    }
+}
+
+
+def _segment_plan(trip_data: dict) -> list:
+    """
+    Split a long trip into (first_day, last_day) ranges of near-equal length.
+
+    Returns [] when the trip is short enough (or its dates unparseable) to plan
+    in a single call.
+    """
+    start = parse_trip_date(trip_data.get('startDate'))
+    end = parse_trip_date(trip_data.get('endDate'))
+    if not start or not end:
+        return []
+    total_days = (end - start).days + 1
+    if total_days <= SEGMENT_THRESHOLD_DAYS or SEGMENT_DAYS < 1:
+        return []
+
+    count = math.ceil(total_days / SEGMENT_DAYS)
+    size, extra = divmod(total_days, count)
+    segments = []
+    first = 1
+    for i in range(count):
+        last = first + size - 1 + (1 if i < extra else 0)
+        segments.append((first, last))
+        first = last + 1
+    return segments
+
+
+def _day_date(start, day_number: int) -> str:
+    return (start + timedelta(days=day_number - 1)).isoformat()
+
+
+def generate_outline(trip_data: dict, total_days: int) -> list:
+    """
+    Ask Gemini for a one-line-per-day route (base city/area and focus) for the
+    whole trip, so segments planned in parallel agree on where the traveler is.
+    """
+    ctx = _trip_context(trip_data)
+    prompt_text = (
+        "You are an expert travel planner. Sketch the route for a "
+        f"{total_days}-day trip for {ctx['companion_text']} "
+        f"traveling to {ctx['destination']} from {ctx['start_date']} to {ctx['end_date']}. "
+        f"The budget is {ctx['currency']} {ctx['budget_amount']} per person."
+        f"{ctx['places_hint']}{ctx['clarifying_context']}\n\n"
+        "For each day give the city or area the traveler is based in and a short focus for the day. "
+        "Plan an efficient route that avoids back-tracking and leaves realistic time for travel between bases.\n\n"
+        f"Return a JSON array with exactly {total_days} entries, days numbered 1 to {total_days}."
+    )
+
+    response = gemini.generate_content(
+        model=ITINERARY_MODEL,
+        contents=prompt_text,
+        config=types.GenerateContentConfig(
+            response_mime_type='application/json',
+            temperature=0.7,
+            response_schema=OUTLINE_SCHEMA
+        ),
+        call_site='itinerary_outline'
+    )
+
+    by_day = {}
+    for entry in json.loads(response.text):
+        try:
+            by_day[int(entry.get('day'))] = entry
+        except (TypeError, ValueError):
+            continue
+    missing = [n for n in range(1, total_days + 1) if n not in by_day]
+    if missing:
+        raise ValueError(f"Outline is missing days {missing}")
+    return [by_day[n] for n in range(1, total_days + 1)]
+
+
+def _segment_scope(outline: list, first: int, last: int, start) -> str:
+    route = "\n".join(
+        f"- Day {n} ({_day_date(start, n)}): {entry.get('base', '')} - {entry.get('focus', '')}"
+        for n, entry in enumerate(outline, 1)
+    )
+    return (
+        "This trip is being planned in parts. The agreed route for the whole trip is:\n"
+        f"{route}\n\n"
+        f"Plan ONLY days {first} to {last} ({_day_date(start, first)} to {_day_date(start, last)}), "
+        "following the route above for those days. The other days are planned separately, "
+        "so do not repeat activities that belong to them. "
+        f"Number the days {first} to {last} and use their dates.\n\n"
+    )
+
+
+def _validate_segment(days, first: int, last: int, start) -> list:
+    """Check a segment has one entry per day and pin its day numbers and dates."""
+    expected = last - first + 1
+    if not isinstance(days, list) or len(days) != expected:
+        count = len(days) if isinstance(days, list) else 'no'
+        raise ValueError(f"Segment {first}-{last} returned {count} days, expected {expected}")
+
+    def position(item):
+        index, day = item
+        try:
+            return int(day.get('day')), index
+        except (TypeError, ValueError):
+            return first + index, index
+
+    ordered = [day for _, day in sorted(enumerate(days), key=position)]
+    pinned = []
+    for offset, day in enumerate(ordered):
+        if not isinstance(day.get('activities'), list):
+            raise ValueError(f"Segment {first}-{last} day {offset + first} has no activities")
+        number = first + offset
+        pinned.append(dict(day, day=number, date=_day_date(start, number)))
+    return pinned
+
+
+def _generate_segment(trip_data: dict, outline: list, first: int, last: int, start, cancelled) -> list:
+    prompt_text = build_itinerary_prompt(trip_data, scope=_segment_scope(outline, first, last, start))
+    error = None
+    for _ in range(SEGMENT_ATTEMPTS):
+        # Another segment failed or the client went away; don't spend more Gemini calls
+        if cancelled.is_set():
+            raise CancelledError()
+        try:
+            response = gemini.generate_content(
+                model=ITINERARY_MODEL,
+                contents=prompt_text,
+                config=_itinerary_config(),
+                call_site='itinerary_segment'
+            )
+            return _validate_segment(json.loads(response.text), first, last, start)
+        except RateLimited:
+            raise
+        except Exception as e:
+            print(f"⚠️ Itinerary segment {first}-{last} failed: {e}", flush=True)
+            error = e
+    raise error
+
+
+def _start_segments(trip_data: dict, cancelled: threading.Event) -> list:
+    """
+    Generate the outline, then submit every segment to the pool. Returns the
+    futures in day order. Setting `cancelled` stops segments before their next
+    Gemini call; see _cancel_segments.
+    """
+    segments = _segment_plan(trip_data)
+    start = parse_trip_date(trip_data.get('startDate'))
+    outline = generate_outline(trip_data, segments[-1][1])
+    print(f"🧩 Planning {segments[-1][1]}-day trip as {len(segments)} parallel segments", flush=True)
+    # Each segment runs in a copy of this thread's context, so a request's
+    # Gemini wait limit (max_throttle_wait) applies on the pool threads too
+    return [
+        _segment_pool.submit(
+            copy_context().run, bind_spans(_generate_segment), trip_data, outline, first, last, start, cancelled
+        )
+        for first, last in segments
+    ]
+
+
+def _cancel_segments(futures: list, cancelled: threading.Event):
+    """Drop segments still queued and stop running ones from retrying. A no-op once all are done."""
+    cancelled.set()
+    for future in futures:
+        future.cancel()
+
+
+def validate_itinerary(itinerary: list, start, total_days: int):
+    """Raise ValueError unless days run 1..total_days with consecutive dates from start."""
+    if len(itinerary) != total_days:
+        raise ValueError(f"Itinerary has {len(itinerary)} days, expected {total_days}")
+    for number, day in enumerate(itinerary, 1):
+        if not isinstance(day, dict) or day.get('day') != number or day.get('date') != _day_date(start, number):
+            raise ValueError(f"Itinerary day {number} is out of sequence")
+
+
+def _generate_itinerary_segmented(trip_data: dict) -> dict:
+    futures, cancelled = [], threading.Event()
+    try:
+        futures = _start_segments(trip_data, cancelled)
+        itinerary = [day for future in futures for day in future.result()]
+        total_days = _segment_plan(trip_data)[-1][1]
+        validate_itinerary(itinerary, parse_trip_date(trip_data.get('startDate')), total_days)
+        return {
+            "itinerary": itinerary,
+            "countries": extract_countries(itinerary)
+        }
+
+    except RateLimited:
+        raise
+    except Exception as e:
+        print(f"❌ Segmented itinerary generation failed: {e}", flush=True)
+        return {"error": str(e)}
+    finally:
+        _cancel_segments(futures, cancelled)
+
+
+def generate_itinerary_stream(trip_data: dict):
+    """
+    Stream a day-by-day itinerary as Gemini writes it.
+
+    Uses generate_content_stream and an incremental JSON parser, so each day is
+    yielded as soon as its closing brace arrives rather than after the whole plan.
+
+    Args:
+        trip_data: same as generate_itinerary
+
+    Yields:
+        ("day", day dict) for each completed day, then ("countries", list of country
+        names) once the plan is complete, or ("error", message) if generation fails
+
+    Raises:
+        RateLimited: inside max_throttle_wait, when Gemini has no free slot in time
+    """
+    cached = itinerary_cache.lookup(trip_data)
+    if cached is not None:
+        for day in cached["itinerary"]:
+            yield ("day", day)
+        yield ("countries", cached["countries"])
+        return
+
+    if _segment_plan(trip_data):
+        yield from _stream_itinerary_segmented(trip_data)
+        return
+
+    prompt_text = build_itinerary_prompt(trip_data)
+    parser = JsonArrayStreamParser()
+    days = []
+
+    try:
+        stream = gemini.generate_content_stream(
+            model=ITINERARY_MODEL,
+            contents=prompt_text,
+            config=_itinerary_config(),
+            call_site='itinerary_stream'
+        )
+
+        for chunk in stream:
+            for day in parser.feed(chunk.text or ""):
+                days.append(day)
+                yield ("day", day)
+
+        if not parser.finished:
+            raise ValueError("Itinerary response ended before the JSON array was closed")
+
+        countries = extract_countries(days)
+        _cache_streamed_itinerary(trip_data, days, countries)
+        yield ("countries", countries)
+
+    except RateLimited:
+        raise
+    except Exception as e:
+        print(f"❌ Streaming itinerary generation failed: {e}", flush=True)
+        yield ("error", str(e))
+
+
+def _cache_streamed_itinerary(trip_data: dict, days: list, countries: list):
+    """
+    Store a streamed single-call plan. The days have already been sent, so a
+    plan that fails validate_itinerary is only kept out of the cache.
+    """
+    if not itinerary_cache.enabled:
+        return
+    start = parse_trip_date(trip_data.get('startDate'))
+    end = parse_trip_date(trip_data.get('endDate'))
+    if not start or not end:
+        return
+    try:
+        validate_itinerary(days, start, (end - start).days + 1)
+    except ValueError as e:
+        print(f"⚠️ Not caching streamed itinerary: {e}", flush=True)
+        return
+    itinerary_cache.put(trip_cache_key(trip_data), {"itinerary": days, "countries": countries})
+
+
+def _stream_itinerary_segmented(trip_data: dict):
+    # Segments run in parallel; each is yielded as soon as it and every earlier one are done.
+    # The finally block also runs when the client disconnects and the generator is closed.
+    days = []
+    futures, cancelled = [], threading.Event()
+    try:
+        futures = _start_segments(trip_data, cancelled)
+        for future in futures:
+            for day in future.result():
+                days.append(day)
+                yield ("day", day)
+
+        total_days = _segment_plan(trip_data)[-1][1]
+        validate_itinerary(days, parse_trip_date(trip_data.get('startDate')), total_days)
+        countries = extract_countries(days)
+        if itinerary_cache.enabled:
+            itinerary_cache.put(trip_cache_key(trip_data), {"itinerary": days, "countries": countries})
+        yield ("countries", countries)
+
+    except RateLimited:
+        raise
+    except Exception as e:
+        print(f"❌ Streaming segmented itinerary generation failed: {e}", flush=True)
+        yield ("error", str(e))
+    finally:
+        _cancel_segments(futures, cancelled)
@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+from flask import current_app
+
+
+MAX_FRAGMENTS = 20000
+
+
+class FragmentCache:
+    """
+    Caches each destination's encoded JSON as bytes.
+
+    Entries are keyed by (id, updated_at, columns, personalized flag), so an edited
+    row gets a new key and the stale bytes simply age out of the LRU. Records
+    without an updated_at are encoded every time rather than risk serving stale JSON.
+    """
+
+    def __init__(self, max_entries: int = MAX_FRAGMENTS):
+        self._max_entries = max_entries
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, record, columns: tuple, is_personalized: bool = None) -> bytes:
+        """Return the JSON bytes for `record.to_json(columns, is_personalized)`."""
+        if record.updated_at is None:
+            return _dumps(record.to_json(columns, is_personalized=is_personalized))
+
+        key = (str(record.id), record.updated_at, columns, is_personalized)
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+
+        fragment = _dumps(record.to_json(columns, is_personalized=is_personalized))
+
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > self._max_entries:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._fragments)}
+
+
+def _dumps(data: dict) -> bytes:
+    # Same encoder settings as a non-debug jsonify(), so cached and uncached bodies match
+    return current_app.json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def json_array_response(fragments: list, status: int = 200):
+    """Build a JSON array response by joining pre-encoded fragments."""
+    body = b"[" + b",".join(fragments) + b"]\n"
+    return current_app.response_class(body, status=status, mimetype=current_app.json.mimetype)
+
+
+destination_fragments = FragmentCache()
@@ -0,0 +1,118 @@
+import os
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# LLM calls take seconds to minutes, so the default sub-second buckets are useless
+LLM_LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120, 240)
+
+GEMINI_LATENCY = Histogram(
+    "gemini_request_duration_seconds",
+    "Duration of each Gemini API attempt, by call site and outcome",
+    ["call_site", "model", "outcome"],
+    buckets=LLM_LATENCY_BUCKETS,
+)
+
+GEMINI_TOKENS = Counter(
+    "gemini_tokens",
+    "Tokens reported in usage_metadata, by kind (prompt, output, total)",
+    ["call_site", "model", "kind"],
+)
+
+GEMINI_RETRIES = Counter(
+    "gemini_retries",
+    "Gemini attempts that were retried after a rate limit or transient error",
+    ["call_site", "model", "code"],
+)
+
+GEMINI_ERRORS = Counter(
+    "gemini_errors",
+    "Gemini calls that failed after all retries, by error class",
+    ["call_site", "model", "error"],
+)
+
+GEMINI_THROTTLE_WAIT = Counter(
+    "gemini_throttle_wait_seconds",
+    "Time spent waiting for the client-side rate limiter before a Gemini call",
+    ["call_site", "model"],
+)
+
+
+def error_class(error: Exception) -> str:
+    """Label for an exception: its class name plus the HTTP code for API errors (e.g. ClientError_429)."""
+    code = getattr(error, "code", None)
+    name = type(error).__name__
+    return f"{name}_{code}" if isinstance(code, int) else name
+
+
+def record_usage(call_site: str, model: str, usage):
+    """Count prompt/output/total tokens from a response's usage_metadata (if any)."""
+    if usage is None:
+        return
+    for kind, field in (("prompt", "prompt_token_count"), ("output", "candidates_token_count"),
+                        ("total", "total_token_count")):
+        count = getattr(usage, field, None)
+        if count:
+            GEMINI_TOKENS.labels(call_site, model, kind).inc(count)
+
+
+def render_metrics() -> tuple:
+    """
+    Return (body, content type) in the Prometheus text format.
+
+    Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py) and
+    every worker writes its samples there, so the scrape aggregates all of them
+    whichever worker serves it.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# --- HTTP request and upstream call metrics (middleware/request_metrics.py) ---
+
+HTTP_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from the request reaching Flask to the response headers being ready",
+    ["blueprint", "endpoint", "method", "status"],
+    buckets=HTTP_LATENCY_BUCKETS,
+)
+
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    ["blueprint", "endpoint"],
+    multiprocess_mode="livesum",
+)
+
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size as sent (after compression); streamed responses are not counted",
+    ["blueprint", "endpoint"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+HTTP_QUEUE_TIME = Histogram(
+    "http_request_queue_seconds",
+    "Time between the proxy's X-Request-Start stamp and Flask picking the request up",
+    buckets=HTTP_LATENCY_BUCKETS,
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "upstream_call_duration_seconds",
+    "Duration of calls to Supabase, Gemini and Resend",
+    ["service", "operation"],
+    buckets=HTTP_LATENCY_BUCKETS,
+)
@@ -0,0 +1,124 @@
+import math
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a destination name for comparison: lowercase, strip punctuation, sort words."""
+    name = re.sub(r'[^\w\s]', '', name.lower())
+    return ' '.join(sorted(name.split()))
+
+
+def _bigrams(text: str) -> Counter:
+    # Padded so every character, including the first and last, is in two bigrams
+    padded = f" {text} "
+    return Counter(padded[i:i + 2] for i in range(len(padded) - 1))
+
+
+class FuzzyNameIndex:
+    """
+    Finds fuzzy duplicate names without comparing against every entry.
+
+    find_duplicate(name) returns the first entry, in insertion order, whose
+    normalized name has SequenceMatcher(None, new, existing).ratio() >=
+    threshold -- the same answer as scanning the whole list -- but only runs
+    SequenceMatcher on a few candidates:
+
+    - Length filter: ratio <= 2 * min(a, b) / (a + b), so only lengths within
+      threshold / (2 - threshold) of each other can match.
+    - Bigram count filter: the matched characters form a common subsequence of
+      length >= threshold * (a + b) / 2, and each character dropped on the way
+      to it breaks at most two padded bigrams, so two matching names share at
+      least (1.5 * threshold - 1) * (a + b) + 1 bigrams. Entries are bucketed
+      by (length, bigram) and only those sharing enough bigrams are verified.
+      Only the rarest buckets are probed (prefix filtering); the count is of
+      distinct bigrams, so the bound is lowered by the number of repeated
+      bigrams in the new name.
+
+    Entries are added and removed incrementally. Not thread-safe; callers
+    sharing an index must hold their own lock.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._entries = {}  # entry id -> (entry, normalized name), in insertion order
+        self._postings = defaultdict(set)  # (length, bigram) -> entry ids
+        self._by_length = defaultdict(set)  # length -> entry ids
+        self._grams = {}  # entry id -> its distinct bigrams
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entry: dict) -> int:
+        """Index entry['name'] and return an id for remove()."""
+        entry_id = self._next_id
+        self._next_id += 1
+        normalized = normalize_name(entry['name'])
+        self._entries[entry_id] = (entry, normalized)
+        self._grams[entry_id] = frozenset(_bigrams(normalized))
+        self._by_length[len(normalized)].add(entry_id)
+        for gram in _bigrams(normalized):
+            self._postings[(len(normalized), gram)].add(entry_id)
+        return entry_id
+
+    def remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        length = len(entry[1])
+        self._by_length[length].discard(entry_id)
+        for gram in self._grams.pop(entry_id):
+            posting = self._postings[(length, gram)]
+            posting.discard(entry_id)
+            if not posting:
+                del self._postings[(length, gram)]
+
+    def entries(self):
+        """Every entry, in insertion order."""
+        return (entry for entry, _ in self._entries.values())
+
+    def find_duplicate(self, name: str):
+        """Return the first entry whose name is a fuzzy duplicate of `name`, or None."""
+        normalized = normalize_name(name)
+        for entry_id in sorted(self._candidates(normalized)):
+            entry, existing = self._entries[entry_id]
+            if SequenceMatcher(None, normalized, existing).ratio() >= self.threshold:
+                return entry
+        return None
+
+    def _length_range(self, length: int) -> range:
+        if self.threshold <= 0:
+            return range(0, max(self._by_length, default=0) + 1)
+        low = math.ceil(length * self.threshold / (2 - self.threshold) - 1e-9)
+        high = math.floor(length * (2 - self.threshold) / self.threshold + 1e-9)
+        return range(low, high + 1)
+
+    def _candidates(self, normalized: str) -> set:
+        grams = _bigrams(normalized)
+        length = len(normalized)
+        # Sum(min(count)) over shared bigrams exceeds the distinct count by at most this
+        repeated = sum(grams.values()) - len(grams)
+        distinct = frozenset(grams)
+        candidates = set()
+        for other in self._length_range(length):
+            if not self._by_length.get(other):
+                continue
+            needed = self._needed(length, other) - repeated
+            if needed <= 0:
+                # The bound says nothing for this length (low thresholds, short names)
+                candidates.update(self._by_length[other])
+                continue
+            # Prefix filter: a name sharing `needed` of the distinct bigrams shares at
+            # least one of any len(grams) - needed + 1 of them, so probe the rarest
+            buckets = sorted((self._postings.get((other, gram), ()) for gram in grams), key=len)
+            probed = set().union(*buckets[:len(grams) - needed + 1])
+            candidates.update(
+                entry_id for entry_id in probed if len(distinct & self._grams[entry_id]) >= needed
+            )
+        return candidates
+
+    def _needed(self, length: int, other: int) -> int:
+        """Fewest padded bigrams two names of these lengths share if their ratio reaches the threshold."""
+        return math.ceil((1.5 * self.threshold - 1) * (length + other) + 1 - 1e-9)
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from services.catalog_cache import ttl_from_env
+from services.gemini_client import current_max_wait
+from services.itinerary_cache import normalize_text, parse_trip_date
+from services.result_store import SqliteResultStore
+from services.single_flight import SingleFlight
+
+MAX_QUESTION_SETS = 2000
+
+# Bump when the questions prompt changes so old answers stop matching
+CACHE_VERSION = 1
+
+# (upper bound in days, label). Question sets rarely differ between a 5 and a 6
+# day trip, but do between a weekend and a month
+LENGTH_BUCKETS = ((3, "short"), (7, "week"), (14, "fortnight"))
+
+
+def _length_bucket(trip_data: dict) -> str:
+    start = parse_trip_date(trip_data.get('startDate'))
+    end = parse_trip_date(trip_data.get('endDate'))
+    if not start or not end:
+        return "unknown"
+    days = (end - start).days + 1
+    for limit, label in LENGTH_BUCKETS:
+        if days <= limit:
+            return label
+    return "long"
+
+
+def questions_cache_key(trip_data: dict) -> str:
+    """Key on destination, trip-length bucket, companions and sorted place names."""
+    canonical = {
+        "v": CACHE_VERSION,
+        "destination": normalize_text(trip_data.get('destination')),
+        "length": _length_bucket(trip_data),
+        "companions": normalize_text(trip_data.get('companions') or 'solo'),
+        "places": sorted(
+            normalize_text(p.get('name'))
+            for p in trip_data.get('specificDestinations') or []
+            if isinstance(p, dict) and p.get('name')
+        ),
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class QuestionsCache:
+    """
+    Memoizes clarifying questions in a bounded in-memory LRU.
+
+    When a persistent store is given, misses fall through to it and results are
+    written back, so a restarted or sibling worker starts warm. Entries expire
+    after `ttl` seconds in both tiers.
+    """
+
+    def __init__(self, max_entries: int = MAX_QUESTION_SETS, ttl: float = 24 * 3600,
+                 store: SqliteResultStore = None):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._store = store
+        self._entries = OrderedDict()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def get_or_generate(self, trip_data: dict, generate) -> list:
+        """
+        Return the questions for trip_data, calling generate(trip_data) on a miss.
+        generate should raise on failure so errors are not memoized.
+        """
+        key = questions_cache_key(trip_data)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self._ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        if self._store is not None:
+            questions = self._store.get(key)
+            if questions is not None:
+                with self._lock:
+                    self.store_hits += 1
+                self._remember(key, questions)
+                return questions
+
+        with self._lock:
+            self.misses += 1
+
+        def fill():
+            questions = generate(trip_data)
+            self._remember(key, questions)
+            if self._store is not None:
+                self._store.put(key, questions)
+            return questions
+
+        # Callers share a call only under the same Gemini wait limit (see ItineraryCache)
+        return self._flight.do((key, current_max_wait()), fill)
+
+    def _remember(self, key: str, questions: list):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), questions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "storeHits": self.store_hits,
+                "misses": self.misses,
+                "coalesced": self._flight.shared,
+                "size": len(self._entries),
+                "persistent": self._store is not None,
+            }
+
+
+_QUESTIONS_TTL = ttl_from_env("QUESTIONS_CACHE_TTL", 24 * 3600)
+
+# Persistence is opt-in: set QUESTIONS_CACHE_PATH to share question sets across
+# workers and restarts
+questions_cache = QuestionsCache(
+    max_entries=int(os.environ.get("QUESTIONS_CACHE_MAX_ENTRIES", MAX_QUESTION_SETS)),
+    ttl=_QUESTIONS_TTL,
+    store=SqliteResultStore(
+        os.environ["QUESTIONS_CACHE_PATH"],
+        table="clarifying_questions",
+        max_entries=int(os.environ.get("QUESTIONS_CACHE_MAX_ENTRIES", MAX_QUESTION_SETS)) * 10,
+        ttl=_QUESTIONS_TTL,
+    ) if os.environ.get("QUESTIONS_CACHE_PATH") else None,
+)
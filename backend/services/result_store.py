@@ -0,0 +1,107 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+def default_cache_path(filename: str) -> str:
+    """Location for on-disk caches when no path is configured (shared by all workers on the host)."""
+    return os.path.join(tempfile.gettempdir(), filename)
+
+
+class SqliteResultStore:
+    """
+    Small persistent key -> JSON value store with TTL and LRU eviction.
+
+    Backed by one SQLite file, so every gunicorn worker on the host shares the
+    same entries. Entries older than `ttl` seconds are treated as missing, and
+    once the table holds more than `max_entries` rows the least recently read
+    ones are deleted.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int = 5000, ttl: float = 7 * 24 * 3600):
+        self._path = path
+        self._table = table
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not cross a fork, so each worker opens its own
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self._table}_lru ON {self._table} (last_access)")
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str):
+        """Return the stored value, or None if it is missing or expired."""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    f"SELECT value, created_at FROM {self._table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                value, created_at = row
+                if now - created_at > self._ttl:
+                    conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                    conn.commit()
+                    return None
+                conn.execute(f"UPDATE {self._table} SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+            return json.loads(value)
+        except sqlite3.Error as e:
+            print(f"Result store read failed ({self._table}): {e}")
+            return None
+
+    def put(self, key: str, value):
+        """Store a JSON-serializable value, evicting expired and least recently used entries."""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self._table} (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now),
+                )
+                conn.execute(f"DELETE FROM {self._table} WHERE created_at < ?", (now - self._ttl,))
+                conn.execute(
+                    f"DELETE FROM {self._table} WHERE key IN ("
+                    f"SELECT key FROM {self._table} ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self._max_entries,),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Result store write failed ({self._table}): {e}")
+
+    def delete(self, key: str):
+        """Remove an entry if it exists."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Result store delete failed ({self._table}): {e}")
+
+    def size(self) -> int:
+        try:
+            with self._lock:
+                return self._connection().execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+        except sqlite3.Error:
+            return 0
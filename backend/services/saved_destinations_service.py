@@ -1,24 +1,23 @@
-import os
-from supabase import create_client, Client
 from dotenv import load_dotenv
+from services.supabase_client import supabase
+from services.database import select_with_version
+from services.destination_record import CARD_COLUMNS
 
 load_dotenv()
 
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-
-supabase: Client = create_client(url, key)
-
 
 def get_saved_destinations(user_id: str) -> list:
-    """Fetch all saved destinations for a user, joined with full destination data."""
+    """Fetch all saved destinations for a user, joined with the destination card columns."""
     try:
-        response = (
-            supabase.table("saved_destinations")
-            .select("destination_id, created_at, destinations(*)")
-            .eq("user_id", user_id)
-            .order("created_at", desc=True)
-            .execute()
+        response = select_with_version(
+            lambda select: (
+                supabase.table("saved_destinations")
+                .select(f"destination_id, created_at, destinations({select})")
+                .eq("user_id", user_id)
+                .order("created_at", desc=True)
+                .execute()
+            ),
+            CARD_COLUMNS,
         )
         return response.data if response.data else []
     except Exception as e:
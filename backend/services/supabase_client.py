@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+import httpx
+from supabase import create_client, Client, ClientOptions
+from dotenv import load_dotenv
+from services.tracing import record_span
+
+load_dotenv()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Connection pool and timeouts for every Supabase call (PostgREST, Storage, Auth)
+POOL_SIZE = int(_env_float("SUPABASE_POOL_SIZE", 20))
+POOL_KEEPALIVE = int(_env_float("SUPABASE_POOL_KEEPALIVE", 10))
+KEEPALIVE_EXPIRY = _env_float("SUPABASE_KEEPALIVE_EXPIRY", 60)
+CONNECT_TIMEOUT = _env_float("SUPABASE_CONNECT_TIMEOUT", 5)
+READ_TIMEOUT = _env_float("SUPABASE_READ_TIMEOUT", 15)
+# Image uploads from seed.py send a few MB, so writes get more headroom
+WRITE_TIMEOUT = _env_float("SUPABASE_WRITE_TIMEOUT", 30)
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+
+def _operation(request: httpx.Request) -> str:
+    # "GET destinations", "POST rpc/random_destinations", "POST storage/v1/object", ...
+    parts = request.url.path.strip("/").split("/")
+    if parts[:2] == ["rest", "v1"]:
+        target = "/".join(parts[2:4]) if parts[2:3] == ["rpc"] else "/".join(parts[2:3])
+    else:
+        target = "/".join(parts[:3])
+    return f"{request.method} {target}"
+
+
+def _start_span(request: httpx.Request):
+    request.extensions["span_started"] = time.perf_counter()
+
+
+def _end_span(response: httpx.Response):
+    # Read the body here so the span covers the whole round trip, not just the headers
+    response.read()
+    started = response.request.extensions.get("span_started")
+    if started is not None:
+        record_span("supabase", _operation(response.request), time.perf_counter() - started)
+
+
+def _build_client() -> Client:
+    url = os.environ.get("SUPABASE_URL")
+    service_role_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not service_role_key:
+        raise ValueError("❌ Supabase credentials missing. Check your .env file.")
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=POOL_SIZE,
+            max_keepalive_connections=POOL_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=CONNECT_TIMEOUT,
+            read=READ_TIMEOUT,
+            write=WRITE_TIMEOUT,
+            pool=CONNECT_TIMEOUT,
+        ),
+        follow_redirects=True,
+        event_hooks={"request": [_start_span], "response": [_end_span]},
+    )
+    return create_client(url, service_role_key, options=ClientOptions(httpx_client=http_client))
+
+
+def get_supabase() -> Client:
+    """
+    Return this process's shared Supabase client (service role key, bypasses RLS).
+
+    The client, and the pooled keep-alive HTTP connections behind it, is created
+    on first use in each process. Gunicorn workers forked from a master that
+    already built one get their own, because open sockets must not be shared
+    across a fork.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client = _build_client()
+            _client_pid = pid
+        return _client
+
+
+class _SupabaseProxy:
+    """Module-level stand-in that forwards to `get_supabase()`, so `supabase.table(...)` keeps working."""
+
+    def __getattr__(self, name):
+        return getattr(get_supabase(), name)
+
+
+supabase = _SupabaseProxy()
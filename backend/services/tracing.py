@@ -0,0 +1,65 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, has_request_context
+from services.metrics import UPSTREAM_LATENCY
+
+# Span list of the request a worker-thread task was submitted for (see bind_spans)
+_bound_spans = ContextVar('bound_spans', default=None)
+
+
+def _current_spans():
+    spans = _bound_spans.get()
+    if spans is None and has_request_context():
+        spans = g.setdefault('_spans', [])
+    return spans
+
+
+def record_span(service: str, operation: str, seconds: float):
+    """
+    Record one upstream call: always into the upstream latency histogram and,
+    when made while handling a request (or in a task bound with bind_spans),
+    into that request's span list (used for the Server-Timing header and
+    slow-request logs).
+    """
+    UPSTREAM_LATENCY.labels(service, operation).observe(seconds)
+    spans = _current_spans()
+    if spans is not None:
+        spans.append((service, operation, seconds, time.perf_counter()))
+
+
+def bind_spans(fn):
+    """
+    Wrap `fn` so spans it records on another thread (e.g. a ThreadPoolExecutor
+    task) go to the current request's span list. Call it on the request thread,
+    before submitting; outside a request `fn` is returned unchanged.
+    """
+    spans = _current_spans()
+    if spans is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _bound_spans.set(spans)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _bound_spans.reset(token)
+    return run
+
+
+@contextmanager
+def span(service: str, operation: str):
+    """Time the enclosed block as a call to `service`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(service, operation, time.perf_counter() - started)
+
+
+def request_spans() -> list:
+    """
+    (service, operation, seconds, ended) for each upstream call made by the
+    current request, where `ended` is the time.perf_counter() at which it finished.
+    """
+    return g.get('_spans', []) if has_request_context() else []
@@ -1,14 +1,9 @@
-import os
-from supabase import create_client, Client
+import jsonpatch
 from dotenv import load_dotenv
+from services.supabase_client import supabase
 
 load_dotenv()
 
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-
-supabase: Client = create_client(url, key)
-
 
 def save_trip(trip_data: dict) -> dict:
     """Save a trip to the Supabase trips table."""
@@ -53,25 +48,93 @@ def get_user_trips(user_id: str) -> list:
         return []
 
 
+# Columns needed to render the trips list (everything except the itinerary blobs)
+SUMMARY_COLUMNS = (
+    "id, user_id, trip_name, destination, start_date, end_date, currency, "
+    "budget_range, budget_amount, companions, number_of_people, countries, created_at"
+)
+
+
+def _count_itinerary(itinerary) -> tuple:
+    """Return (day count, activity count) for an itinerary array."""
+    if not isinstance(itinerary, list):
+        return 0, 0
+    activities = sum(len(day.get('activities') or []) for day in itinerary if isinstance(day, dict))
+    return len(itinerary), activities
+
+
+def get_user_trip_summaries(user_id: str) -> list:
+    """
+    Fetch the trips list for a user without the itinerary blobs.
+
+    Each row has the summary columns plus day_count and activity_count, computed
+    in Postgres by the trip_summaries RPC (sql/trip_summaries.sql).
+    """
+    try:
+        response = supabase.rpc("trip_summaries", {"p_user_id": user_id}).execute()
+        return response.data if response.data else []
+    except Exception as e:
+        print(f"❌ Error fetching trip summaries via RPC, falling back: {e}")
+
+    # RPC not deployed: compute the counts here (this path still downloads the itineraries)
+    try:
+        response = (
+            supabase.table("trips")
+            .select(f"{SUMMARY_COLUMNS}, itinerary")
+            .eq("user_id", user_id)
+            .order("created_at", desc=True)
+            .execute()
+        )
+        summaries = []
+        for trip in response.data or []:
+            itinerary = trip.pop("itinerary", None)
+            trip["day_count"], trip["activity_count"] = _count_itinerary(itinerary)
+            summaries.append(trip)
+        return summaries
+    except Exception as e:
+        print(f"❌ Error fetching trips: {e}")
+        return []
+
+
+def get_trip(trip_id: str, user_id: str) -> dict:
+    """Fetch one trip, including its full itinerary."""
+    try:
+        response = (
+            supabase.table("trips")
+            .select("*")
+            .eq("id", trip_id)
+            .eq("user_id", user_id)
+            .limit(1)
+            .execute()
+        )
+        return response.data[0] if response.data else None
+    except Exception as e:
+        print(f"❌ Error fetching trip {trip_id}: {e}")
+        return None
+
+
+# Editable trip fields: camelCase (API) -> snake_case (DB)
+FIELD_MAP = {
+    'tripName': 'trip_name',
+    'destination': 'destination',
+    'startDate': 'start_date',
+    'endDate': 'end_date',
+    'currency': 'currency',
+    'budgetRange': 'budget_range',
+    'budgetAmount': 'budget_amount',
+    'companions': 'companions',
+    'numberOfPeople': 'number_of_people',
+    'specificDestinations': 'specific_destinations',
+    'itinerary': 'itinerary',
+    'countries': 'countries',
+}
+
+
 def update_trip(trip_id: str, trip_data: dict) -> dict:
     """Update an existing trip."""
     data = {}
-    field_map = {
-        'tripName': 'trip_name',
-        'destination': 'destination',
-        'startDate': 'start_date',
-        'endDate': 'end_date',
-        'currency': 'currency',
-        'budgetRange': 'budget_range',
-        'budgetAmount': 'budget_amount',
-        'companions': 'companions',
-        'numberOfPeople': 'number_of_people',
-        'specificDestinations': 'specific_destinations',
-        'itinerary': 'itinerary',
-        'countries': 'countries',
-    }
 
-    for camel, snake in field_map.items():
+    for camel, snake in FIELD_MAP.items():
         if camel in trip_data:
             data[snake] = trip_data[camel]
 
@@ -83,6 +146,86 @@ def update_trip(trip_id: str, trip_data: dict) -> dict:
         return None
 
 
+def patch_trip(trip_id: str, operations: list, expected_version: int = None) -> tuple:
+    """
+    Apply RFC 6902 JSON Patch operations to a trip, with optimistic concurrency.
+
+    Paths use the camelCase field names, e.g. "/itinerary/2/activities/0/title".
+    Only the columns the patch actually changed are written, and the write only
+    succeeds if the row still has the version that was read (sql/trips_version.sql).
+
+    Args:
+        trip_id: The trip to patch
+        operations: List of JSON Patch operation dicts
+        expected_version: Version the client based its edit on (None = the version read here)
+
+    Returns:
+        (updated trip row, None) on success, or (current trip row or None, error) where
+        error is "not_found", "invalid_patch: ...", "conflict" or a database error message
+    """
+    try:
+        response = (
+            supabase.table("trips")
+            .select(", ".join(FIELD_MAP.values()) + ", version")
+            .eq("id", trip_id)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        print(f"❌ Error fetching trip {trip_id} for patch: {e}")
+        return (None, str(e))
+
+    if not response.data:
+        return (None, "not_found")
+
+    current = response.data[0]
+    version = current.get("version")
+    if expected_version is not None and expected_version != version:
+        return (current, "conflict")
+
+    document = {camel: current.get(snake) for camel, snake in FIELD_MAP.items()}
+    try:
+        patched = jsonpatch.apply_patch(document, operations)
+    except jsonpatch.JsonPointerException:
+        # The pointer error message embeds the whole document, so keep it short
+        return (current, "invalid_patch: path does not exist")
+    except (jsonpatch.JsonPatchException, TypeError, ValueError) as e:
+        return (current, f"invalid_patch: {e}")
+
+    unknown = set(patched) - set(FIELD_MAP)
+    if unknown:
+        return (current, f"invalid_patch: unknown fields {sorted(unknown)}")
+    # Every field is a column, so a top-level field can be replaced but not removed
+    removed = set(document) - set(patched)
+    if removed:
+        return (current, f"invalid_patch: cannot remove fields {sorted(removed)}")
+
+    changes = {
+        FIELD_MAP[camel]: value
+        for camel, value in patched.items()
+        if value != document.get(camel)
+    }
+    if not changes:
+        return (current, None)
+
+    try:
+        response = (
+            supabase.table("trips")
+            .update(changes)
+            .eq("id", trip_id)
+            .eq("version", version)
+            .execute()
+        )
+    except Exception as e:
+        print(f"❌ Error patching trip {trip_id}: {e}")
+        return (current, str(e))
+
+    if not response.data:
+        # Someone else updated the trip between our read and write
+        return (current, "conflict")
+    return (response.data[0], None)
+
+
 def delete_trip(trip_id: str) -> bool:
     """Delete a trip by ID."""
     try:
@@ -0,0 +1,35 @@
+-- Indexes behind GET /api/destinations (keyset pagination + filters).
+-- Run once in the Supabase SQL editor.
+
+-- Keyset order: (created_at desc, id desc)
+create index if not exists destinations_created_at_id_idx
+    on destinations (created_at desc, id desc);
+
+create index if not exists destinations_country_idx
+    on destinations (country);
+
+-- Array containment/overlap filters on tags and region
+create index if not exists destinations_tags_gin_idx
+    on destinations using gin (tags);
+
+create index if not exists destinations_region_gin_idx
+    on destinations using gin (region);
+
+-- Case-insensitive tag filter: tags are stored as "Beach", "beach", "UNESCO Site",
+-- so the browse endpoint matches against a trimmed, lowercased copy.
+-- (array_to_string/unnest aren't immutable, hence the wrapper function.)
+create or replace function normalize_tags(tags text[])
+returns text[]
+language sql
+immutable
+parallel safe
+as $$
+    select coalesce(array_agg(lower(btrim(tag))), '{}') from unnest(tags) as tag;
+$$;
+
+alter table destinations
+    add column if not exists tags_normalized text[]
+    generated always as (normalize_tags(tags)) stored;
+
+create index if not exists destinations_tags_normalized_gin_idx
+    on destinations using gin (tags_normalized);
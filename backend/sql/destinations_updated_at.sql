@@ -0,0 +1,21 @@
+-- Row version for destinations. The API caches each destination's encoded JSON
+-- keyed by (id, updated_at), so any edit must bump this column.
+-- Run once in the Supabase SQL editor.
+
+alter table destinations
+    add column if not exists updated_at timestamptz not null default now();
+
+create or replace function set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+drop trigger if exists destinations_set_updated_at on destinations;
+create trigger destinations_set_updated_at
+    before update on destinations
+    for each row execute function set_updated_at();
@@ -0,0 +1,58 @@
+-- Server-side random sampling for get_random_batch().
+-- Run once in the Supabase SQL editor. Only `sample_size` rows are returned
+-- to the API.
+
+create or replace function random_destinations(
+    sample_size integer default 4,
+    exclude_ids text[] default '{}'
+)
+returns setof destinations
+language plpgsql
+volatile
+as $$
+declare
+    total real;
+    pct real;
+    picked destinations[] := '{}';
+    picked_ids text[] := '{}';
+begin
+    select reltuples into total from pg_class where oid = 'destinations'::regclass;
+
+    -- Small (or never analyzed) catalogs: a full shuffle is cheap and gives a
+    -- perfectly uniform sample.
+    if total < 5000 then
+        return query
+            select d.*
+            from destinations d
+            where not (d.id::text = any(exclude_ids))
+            order by random()
+            limit sample_size;
+        return;
+    end if;
+
+    -- Large catalogs: BERNOULLI keeps each row independently with probability
+    -- pct, so the sample is uniform (SYSTEM/system_rows take whole pages, i.e.
+    -- runs of adjacent rows). Aim for ~4x the rows needed after exclusions; if
+    -- exclusions or bad luck still leave the sample short, widen pct and top up
+    -- with rows not picked yet. At 100% every remaining row is a candidate.
+    pct := least(100, 400.0 * (sample_size + coalesce(array_length(exclude_ids, 1), 0)) / total);
+    loop
+        with sampled as (
+            select d
+            from destinations d tablesample bernoulli (pct)
+            where not (d.id::text = any(exclude_ids || picked_ids))
+            order by random()
+            limit sample_size - coalesce(array_length(picked, 1), 0)
+        )
+        select picked || coalesce(array_agg(sampled.d), '{}'),
+               picked_ids || coalesce(array_agg((sampled.d).id::text), '{}')
+        into picked, picked_ids
+        from sampled;
+
+        exit when coalesce(array_length(picked, 1), 0) >= sample_size or pct >= 100;
+        pct := least(100, pct * 4);
+    end loop;
+
+    return query select * from unnest(picked) order by random();
+end;
+$$;
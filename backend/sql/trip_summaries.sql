@@ -0,0 +1,38 @@
+-- List view for GET /api/trips?view=summary.
+-- Returns the list columns plus counts derived from the itinerary, so the
+-- itinerary JSONB itself never leaves the database.
+-- Run once in the Supabase SQL editor.
+
+create or replace function trip_summaries(p_user_id uuid)
+returns setof jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'id', t.id,
+        'user_id', t.user_id,
+        'trip_name', t.trip_name,
+        'destination', t.destination,
+        'start_date', t.start_date,
+        'end_date', t.end_date,
+        'currency', t.currency,
+        'budget_range', t.budget_range,
+        'budget_amount', t.budget_amount,
+        'companions', t.companions,
+        'number_of_people', t.number_of_people,
+        'countries', t.countries,
+        'created_at', t.created_at,
+        'day_count', case when jsonb_typeof(t.itinerary) = 'array'
+                          then jsonb_array_length(t.itinerary) else 0 end,
+        'activity_count', (
+            select count(*)
+            from jsonb_array_elements(case when jsonb_typeof(t.itinerary) = 'array'
+                                           then t.itinerary else '[]'::jsonb end) as day,
+                 jsonb_array_elements(case when jsonb_typeof(day -> 'activities') = 'array'
+                                           then day -> 'activities' else '[]'::jsonb end) as activity
+        )
+    )
+    from trips t
+    where t.user_id = p_user_id
+    order by t.created_at desc;
+$$;
@@ -0,0 +1,22 @@
+-- Row version for optimistic concurrency on trips (PATCH /api/trips/<id>).
+-- The trigger bumps the version on every update, including full PUTs, so a
+-- PATCH based on an older read is always detected.
+-- Run once in the Supabase SQL editor.
+
+alter table trips
+    add column if not exists version integer not null default 1;
+
+create or replace function bump_trip_version()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.version := old.version + 1;
+    return new;
+end;
+$$;
+
+drop trigger if exists trips_bump_version on trips;
+create trigger trips_bump_version
+    before update on trips
+    for each row execute function bump_trip_version();
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+# Import the app's packages (services, middleware, ...) the way app.py does
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from types import SimpleNamespace
+
+import pytest
+
+
+class StubQuery:
+    """Chainable stand-in for a supabase-py query: records each builder call until execute()."""
+
+    def __init__(self, stub, table: str):
+        self.stub = stub
+        self.table = table
+        self.calls = []
+
+    def __getattr__(self, method):
+        def call(*args, **kwargs):
+            self.calls.append((method, *args, *kwargs.items()))
+            return self
+        return call
+
+    def execute(self):
+        self.stub.executed.append(self)
+        result = self.stub.responses[self.table].pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return SimpleNamespace(data=result)
+
+
+class StubSupabase:
+    """
+    Replaces a module's `supabase` client. Queue rows (or an exception) per
+    table in `responses`; each execute() takes the next one, and the executed
+    queries are kept in `executed` for assertions.
+    """
+
+    def __init__(self):
+        self.responses = {}
+        self.executed = []
+
+    def table(self, name: str) -> StubQuery:
+        return StubQuery(self, name)
+
+    def rpc(self, name: str, params: dict) -> StubQuery:
+        """Responses for an RPC are queued under its name."""
+        query = StubQuery(self, name)
+        query.calls.append(("rpc", params))
+        return query
+
+
+@pytest.fixture
+def stub_supabase(monkeypatch):
+    """stub_supabase(module) swaps `module.supabase` for a fresh StubSupabase and returns it."""
+    def install(module) -> StubSupabase:
+        stub = StubSupabase()
+        monkeypatch.setattr(module, "supabase", stub)
+        return stub
+    return install
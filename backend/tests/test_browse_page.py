@@ -0,0 +1,106 @@
+import base64
+import json
+
+import pytest
+from flask import Flask
+
+import services.database as database
+from routes.destinations import destinations_bp
+from services.database import decode_browse_cursor, encode_browse_cursor, get_destinations_page
+
+CREATED_AT = "2026-01-02T03:04:05.123456+00:00"
+
+
+def row(dest_id: int, created_at: str = CREATED_AT) -> dict:
+    return {"id": dest_id, "name": f"Place {dest_id}", "created_at": created_at, "updated_at": created_at}
+
+
+def token(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.fixture
+def destinations(stub_supabase, monkeypatch):
+    monkeypatch.setattr(database, "_version_column_missing_at", None)
+    return stub_supabase(database)
+
+
+def test_cursor_round_trip():
+    cursor = encode_browse_cursor(CREATED_AT, 42)
+    assert "=" not in cursor
+    assert decode_browse_cursor(cursor) == (CREATED_AT, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    token([CREATED_AT]),
+    token({"created_at": CREATED_AT, "id": 1}),
+    token([CREATED_AT, None]),
+    token([CREATED_AT, [1]]),
+    # Values are interpolated into a PostgREST or=(...) filter
+    token(['2026-01-01",id.gt."0', 1]),
+    token([CREATED_AT, "1),or(id.gt.0"]),
+    token(["a\\", 1]),
+])
+def test_malformed_or_unsafe_cursor_decodes_to_none(cursor):
+    assert decode_browse_cursor(cursor) is None
+
+
+def test_invalid_cursor_returns_none_without_querying(destinations):
+    assert get_destinations_page(cursor="not base64!") == ([], None, "invalid_cursor")
+    assert destinations.executed == []
+
+
+def test_next_cursor_points_at_last_row_of_a_full_page(destinations):
+    destinations.responses["destinations"] = [[row(3), row(2), row(1)]]
+    records, next_cursor, error = get_destinations_page(page_size=2)
+
+    assert error is None
+    assert [record.id for record in records] == [3, 2]
+    assert decode_browse_cursor(next_cursor) == (CREATED_AT, 2)
+    assert ("limit", 3) in destinations.executed[0].calls
+
+
+def test_last_page_has_no_cursor(destinations):
+    destinations.responses["destinations"] = [[row(1)]]
+    records, next_cursor, error = get_destinations_page(page_size=2)
+    assert error is None
+    assert [record.id for record in records] == [1]
+    assert next_cursor is None
+
+
+def test_cursor_resumes_after_the_last_row(destinations):
+    destinations.responses["destinations"] = [[]]
+    get_destinations_page(cursor=encode_browse_cursor(CREATED_AT, 7))
+
+    assert (
+        "or_", f'created_at.lt."{CREATED_AT}",and(created_at.eq."{CREATED_AT}",id.lt."7")'
+    ) in destinations.executed[0].calls
+
+
+def test_tag_filter_is_case_insensitive(destinations):
+    destinations.responses["destinations"] = [[]]
+    get_destinations_page(tag=" UNESCO Site ")
+    assert ("contains", "tags_normalized", ["unesco site"]) in destinations.executed[0].calls
+
+
+def test_failed_query_is_an_error_not_an_empty_last_page(destinations):
+    # e.g. tags_normalized not deployed yet
+    destinations.responses["destinations"] = [Exception("column destinations.tags_normalized does not exist")]
+    assert get_destinations_page(tag="beach") == ([], None, "query_failed")
+
+
+def test_browse_route_status_codes(destinations):
+    app = Flask(__name__)
+    app.register_blueprint(destinations_bp)
+    client = app.test_client()
+
+    assert client.get("/api/destinations?cursor=not-a-cursor!").status_code == 400
+
+    destinations.responses["destinations"] = [Exception("statement timeout")]
+    assert client.get("/api/destinations?tag=beach").status_code == 500
+
+    destinations.responses["destinations"] = [[row(1)]]
+    response = client.get("/api/destinations")
+    assert response.status_code == 200
+    assert response.get_json()["nextCursor"] is None
@@ -0,0 +1,128 @@
+import gzip
+
+import pytest
+from flask import Flask, Response, jsonify
+from werkzeug.http import parse_accept_header
+
+from middleware import compression, http_caching
+from middleware.compression import choose_encoding, strip_encoding_suffix
+
+# Large enough to be worth compressing (compression.MIN_SIZE)
+ITEMS = [{"id": i, "name": f"Destination {i}", "description": "quiet coastal village " * 5} for i in range(40)]
+
+
+def accept(header: str):
+    return parse_accept_header(header)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(http_caching.CACHE_POLICIES, "public_page", "public, max-age=60")
+
+    app = Flask(__name__)
+    app.add_url_rule("/public_page", "public_page", lambda: jsonify(ITEMS))
+    app.add_url_rule("/small", "small", lambda: jsonify({"ok": True}))
+    app.add_url_rule("/text", "text", lambda: Response("x" * 5000, mimetype="image/svg+xml"))
+
+    def versioned():
+        response = jsonify(ITEMS)
+        response.set_etag("v3")
+        return response
+    app.add_url_rule("/versioned", "versioned", versioned)
+
+    http_caching.init_app(app)
+    compression.init_app(app)
+    return app.test_client()
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip;q=0.8", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("*;q=0.5, gzip;q=0", "br"),
+    ("identity", None),
+    ("deflate", None),
+    ("", None),
+])
+def test_choose_encoding_follows_q_values(monkeypatch, header, expected):
+    # Pin the supported set so the test doesn't depend on zstandard being installed
+    monkeypatch.setattr(compression, "ENCODERS", {"br": None, "gzip": None})
+    assert choose_encoding(accept(header)) == expected
+
+
+def test_gzip_body_round_trips_and_varies_on_accept_encoding(client):
+    response = client.get("/public_page", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    assert gzip.decompress(response.data) == client.get("/public_page").data
+
+
+def test_identity_response_still_varies(client):
+    response = client.get("/public_page", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.vary
+
+
+def test_small_and_non_text_bodies_are_left_alone(client):
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/text", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_each_encoding_has_its_own_etag_and_revalidates(client):
+    plain = client.get("/public_page", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/public_page", headers={"Accept-Encoding": "gzip"})
+    assert plain.headers["ETag"] != gzipped.headers["ETag"]
+
+    revalidated = client.get("/public_page", headers={
+        "Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["ETag"],
+    })
+    assert revalidated.status_code == 304
+
+    # The identity ETag doesn't describe the gzip bytes
+    mismatched = client.get("/public_page", headers={
+        "Accept-Encoding": "gzip", "If-None-Match": plain.headers["ETag"],
+    })
+    assert mismatched.status_code == 200
+
+
+def test_route_etag_gets_an_encoding_suffix(client):
+    assert client.get("/versioned", headers={"Accept-Encoding": "identity"}).headers["ETag"] == '"v3"'
+    assert client.get("/versioned", headers={"Accept-Encoding": "gzip"}).headers["ETag"] == '"v3-gzip"'
+
+
+@pytest.mark.parametrize("etag, base", [
+    ("v3-gzip", "v3"),
+    ("v3-br", "v3"),
+    ("v3-zstd", "v3"),
+    ("v3", "v3"),
+    ("v3-deflate", "v3-deflate"),
+    ("-gzip", "-gzip"),
+])
+def test_strip_encoding_suffix(etag, base):
+    assert strip_encoding_suffix(etag) == base
+
+
+def test_public_variants_are_cached(client, monkeypatch):
+    cache = compression.VariantCache()
+    monkeypatch.setattr(compression, "variant_cache", cache)
+
+    client.get("/public_page", headers={"Accept-Encoding": "gzip"})
+    client.get("/public_page", headers={"Accept-Encoding": "gzip"})
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    # Private responses are compressed every time, never cached
+    client.get("/versioned", headers={"Accept-Encoding": "gzip"})
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_variant_cache_evicts_least_recently_used():
+    cache = compression.VariantCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get("c") == b"1234"
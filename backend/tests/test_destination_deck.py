@@ -0,0 +1,120 @@
+import base64
+import threading
+import time
+
+import pytest
+
+from services.catalog_index import CatalogIndex
+from services.destination_deck import DestinationDeck, decode_cursor, encode_cursor
+from services.destination_record import DestinationRecord
+
+
+def catalog(count: int) -> CatalogIndex:
+    return CatalogIndex([DestinationRecord(id=i, name=f"Place {i}") for i in range(1, count + 1)])
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(123456789, "abc123def456", 8)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (123456789, "abc123def456", 8)
+
+
+def test_negative_offset_is_clamped():
+    assert decode_cursor(encode_cursor(1, "f", -5)) == (1, "f", 0)
+
+
+@pytest.mark.parametrize("cursor", [
+    None,
+    "",
+    "not base64!",
+    base64.urlsafe_b64encode(b"1:fingerprint").decode(),
+    base64.urlsafe_b64encode(b"seed:fingerprint:0").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe:x:1").decode(),
+])
+def test_malformed_cursor_decodes_to_none(cursor):
+    assert decode_cursor(cursor) is None
+
+
+def test_pages_resume_across_workers_without_repeats():
+    index = catalog(10)
+    first, cursor = DestinationDeck().next_page(index, 4, seed=7)
+    # A different worker (its own deck LRU) continues the same shuffle from the cursor
+    second, cursor = DestinationDeck().next_page(index, 4, cursor=cursor)
+    third, _ = DestinationDeck().next_page(index, 2, cursor=cursor)
+
+    ids = [record.id for record in first + second + third]
+    assert sorted(ids) == list(range(1, 11))
+
+
+def test_changed_catalog_starts_a_new_deck():
+    deck = DestinationDeck()
+    _, cursor = deck.next_page(catalog(10), 4, seed=7)
+    _, fingerprint, offset = decode_cursor(cursor)
+    assert offset == 4
+
+    _, cursor = deck.next_page(catalog(11), 4, cursor=cursor)
+    _, new_fingerprint, offset = decode_cursor(cursor)
+    assert new_fingerprint != fingerprint
+    assert offset == 4
+
+
+def test_exhausted_deck_reshuffles_and_skips_excluded():
+    index = catalog(3)
+    deck = DestinationDeck()
+    _, cursor = deck.next_page(index, 3, seed=1)
+    page, _ = deck.next_page(index, 3, cursor=cursor, exclude_ids=[2])
+    assert sorted(record.id for record in page) == [1, 3]
+
+
+@pytest.fixture
+def cold_catalog(stub_supabase, monkeypatch):
+    import services.database as database
+    from services.catalog_cache import CatalogCache
+
+    stub = stub_supabase(database)
+    loadable = threading.Event()
+    loadable.set()
+
+    def load():
+        loadable.wait(5)
+        return [DestinationRecord(id=i) for i in range(1, 11)]
+
+    catalog = CatalogCache(load, indexer=CatalogIndex)
+    catalog.loadable = loadable
+    monkeypatch.setattr(database, "destination_catalog", catalog)
+    monkeypatch.setattr(database, "_version_column_missing_at", None)
+    return database, stub, catalog
+
+
+def test_cold_worker_samples_in_postgres_and_warms_the_catalog(cold_catalog):
+    database, stub, catalog = cold_catalog
+    stub.responses["random_destinations"] = [[{"id": 3}, {"id": 7}]]
+    catalog.loadable.clear()
+
+    page, cursor = database.get_deck_page(limit=2, exclude_ids=[5])
+    catalog.loadable.set()
+
+    assert [record.id for record in page] == [3, 7]
+    assert cursor is None
+    assert stub.executed[0].calls[0] == ("rpc", {"sample_size": 2, "exclude_ids": ["5"]})
+
+    # The background load fills the catalog, so the next page comes from the deck
+    for _ in range(100):
+        if catalog.peek() is not None:
+            break
+        time.sleep(0.01)
+    page, cursor = database.get_deck_page(limit=2)
+    assert len(page) == 2 and cursor is not None
+    assert len(stub.executed) == 1
+
+
+def test_cursor_on_a_cold_worker_loads_the_deck(cold_catalog):
+    database, stub, catalog = cold_catalog
+    fingerprint = catalog.index().fingerprint
+    cursor = encode_cursor(7, fingerprint, 2)
+    catalog.invalidate()
+
+    page, next_cursor = database.get_deck_page(limit=2, cursor=cursor)
+    assert len(page) == 2
+    assert decode_cursor(next_cursor) == (7, fingerprint, 4)
+    assert stub.executed == []
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+import routes.itinerary as itinerary_routes
+from services.gemini_client import GeminiClient, RateLimited, TokenBucket, max_throttle_wait
+
+MODEL = "test-model"
+
+
+def test_bucket_raises_instead_of_waiting_past_max_wait():
+    bucket = TokenBucket(per_minute=1)
+    assert bucket.acquire(1, max_wait=0) == 0.0
+
+    with pytest.raises(RateLimited) as raised:
+        bucket.acquire(1, max_wait=5)
+    assert 55 < raised.value.retry_after <= 60
+
+
+def test_bucket_without_max_wait_sleeps(monkeypatch):
+    bucket = TokenBucket(per_minute=60)
+    bucket.acquire(60)
+
+    def sleep(seconds):
+        # Let the bucket see `seconds` pass
+        bucket._updated -= seconds
+    monkeypatch.setattr("services.gemini_client.time.sleep", sleep)
+
+    assert bucket.acquire(1) == pytest.approx(1, abs=0.05)
+
+
+def fake_models(calls: list):
+    def generate_content(model, contents, config):
+        calls.append(model)
+        return SimpleNamespace(text="[]", usage_metadata=None)
+    return SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+
+
+def test_only_calls_inside_max_throttle_wait_fail_fast():
+    calls = []
+    client = GeminiClient(client=fake_models(calls), rate_limits={MODEL: (1, 0)})
+    client.generate_content(MODEL, "hello")
+
+    with max_throttle_wait(1), pytest.raises(RateLimited):
+        client.generate_content(MODEL, "hello")
+    assert calls == [MODEL]
+
+
+def test_token_shortage_hands_back_the_request_slot():
+    client = GeminiClient(client=fake_models([]), rate_limits={MODEL: (10, 100)})
+    requests, tokens = client._buckets_for(MODEL)
+    tokens.adjust(100)
+
+    with max_throttle_wait(1), pytest.raises(RateLimited):
+        client.generate_content(MODEL, "hello")
+    assert requests._tokens == pytest.approx(10, abs=0.01)
+
+
+def test_busy_slots_raise_instead_of_waiting_and_refund_the_buckets():
+    client = GeminiClient(client=fake_models([]), rate_limits={MODEL: (10, 0)}, max_concurrency=1)
+    requests, _ = client._buckets_for(MODEL)
+    client._slots.acquire()
+
+    with max_throttle_wait(0.05), pytest.raises(RateLimited):
+        client.generate_content(MODEL, "hello")
+    assert requests._tokens == pytest.approx(10, abs=0.01)
+
+    client._slots.release()
+    client.generate_content(MODEL, "hello")
+
+
+class Overloaded(Exception):
+    details = "{'retryDelay': '2s'}"
+
+    def __init__(self):
+        super().__init__("429 RESOURCE_EXHAUSTED")
+
+
+def test_max_wait_covers_all_backoffs_of_a_call(monkeypatch):
+    monkeypatch.setattr("services.gemini_client.time.sleep", lambda seconds: None)
+    calls = []
+
+    def generate_content(model, contents, config):
+        calls.append(model)
+        raise Overloaded()
+    client = GeminiClient(client=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)),
+                          base_delay=0.001)
+
+    # Each backoff (2s) fits in 5s, but the third would take the call past it
+    with max_throttle_wait(5), pytest.raises(RateLimited):
+        client.generate_content(MODEL, "hello")
+    assert len(calls) == 3
+
+
+def test_generate_route_turns_rate_limit_into_503(monkeypatch):
+    def generate_itinerary(data):
+        raise RateLimited(12.3)
+    monkeypatch.setattr(itinerary_routes, "generate_itinerary", generate_itinerary)
+
+    app = Flask(__name__)
+    app.register_blueprint(itinerary_routes.itinerary_bp)
+    response = app.test_client().post("/api/itinerary/generate", json={
+        "destination": "Japan", "startDate": "2026-04-01", "endDate": "2026-04-03",
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "13"
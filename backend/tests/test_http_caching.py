@@ -0,0 +1,58 @@
+import pytest
+from flask import Flask, jsonify
+
+from middleware import compression, http_caching
+
+BODY = {"destinations": [{"id": 1, "name": "Kyoto"}]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(http_caching.CACHE_POLICIES, "public_page", "public, max-age=60")
+    monkeypatch.setitem(http_caching.CACHE_POLICIES, "random_page", "no-store")
+
+    app = Flask(__name__)
+    for endpoint in ("public_page", "random_page", "user_page"):
+        app.add_url_rule(f"/{endpoint}", endpoint, lambda: jsonify(BODY), methods=["GET", "POST"])
+    http_caching.init_app(app)
+    compression.init_app(app)
+    return app.test_client()
+
+
+def test_get_gets_a_strong_etag_and_the_endpoint_policy(client):
+    response = client.get("/public_page")
+    etag, weak = response.get_etag()
+    assert etag and not weak
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+
+
+def test_unknown_endpoints_are_private_and_revalidated(client):
+    assert client.get("/user_page").headers["Cache-Control"] == http_caching.DEFAULT_CACHE_CONTROL
+
+
+def test_matching_if_none_match_is_a_bodiless_304(client):
+    etag = client.get("/public_page").headers["ETag"]
+
+    response = client.get("/public_page", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+    assert client.get("/public_page", headers={"If-None-Match": '"stale"'}).status_code == 200
+    assert client.get("/public_page", headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_etag_is_stable_for_the_same_body(client):
+    assert client.get("/user_page").headers["ETag"] == client.get("/user_page").headers["ETag"]
+
+
+def test_no_store_endpoints_get_no_etag(client):
+    response = client.get("/random_page")
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+
+
+def test_only_successful_gets_are_cached(client):
+    response = client.post("/public_page")
+    assert "ETag" not in response.headers
+    assert "Cache-Control" not in response.headers
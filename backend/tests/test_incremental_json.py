@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from services.incremental_json import JsonArrayStreamParser
+
+
+def parse_in_chunks(text: str, size: int) -> tuple:
+    """Feed `text` in `size`-character chunks. Returns (elements, finished)."""
+    parser = JsonArrayStreamParser()
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    return elements, parser.finished
+
+
+ARRAYS = [
+    "[]",
+    "[1,2]",
+    "[1, 2, 3]",
+    "[true ,null]",
+    "[false , -1.5e3 ]",
+    '[1, "a", {"b": [2, 3]}, [4], null]',
+    '[{"day": 1, "activities": [{"title": "a ] b"}]}, {"day": 2}]',
+    '["quote \\" and ] inside", 7]',
+    ' [ "x" , 0 ] ',
+]
+
+
+@pytest.mark.parametrize("text", ARRAYS)
+@pytest.mark.parametrize("size", [1, 2, 3, 1000])
+def test_yields_every_element_in_any_chunking(text, size):
+    elements, finished = parse_in_chunks(text, size)
+    assert elements == json.loads(text)
+    assert finished
+
+
+def test_scalar_before_closing_bracket_finishes_the_array():
+    parser = JsonArrayStreamParser()
+    assert parser.feed("[1,") == [1]
+    assert parser.feed("2") == []
+    assert parser.feed("]") == [2]
+    assert parser.finished
+
+
+def test_elements_are_returned_as_soon_as_they_close():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('[{"day": 1}, {"day": ') == [{"day": 1}]
+    assert parser.feed('2}') == [{"day": 2}]
+    assert not parser.finished
+
+
+def test_text_after_the_array_is_ignored():
+    parser = JsonArrayStreamParser()
+    assert parser.feed("[1]") == [1]
+    assert parser.feed(", 2]") == []
+
+
+def test_rejects_non_array():
+    with pytest.raises(ValueError):
+        JsonArrayStreamParser().feed('{"day": 1}')
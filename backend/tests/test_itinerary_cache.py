@@ -0,0 +1,134 @@
+import json
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+import services.itinerary_service as itinerary_service
+from services.itinerary_cache import ItineraryCache, canonical_trip, redate_itinerary, trip_cache_key
+from services.result_store import SqliteResultStore
+
+TRIP = {
+    "destination": "Japan",
+    "startDate": "2026-04-01",
+    "endDate": "2026-04-03",
+    "currency": "SGD",
+    "budgetAmount": 4000,
+    "companions": "couple",
+    "specificDestinations": [{"name": "Kyoto"}, {"name": "Osaka"}],
+    "clarifyingAnswers": [{"question": "Pace?", "answer": "Relaxed"}],
+}
+
+
+def trip(**changes) -> dict:
+    return dict(TRIP, **changes)
+
+
+# --- canonical_trip ----------------------------------------------------------
+
+def test_canonical_trip_keeps_length_and_month_instead_of_dates():
+    canonical = canonical_trip(TRIP)
+    assert (canonical["length"], canonical["month"]) == (3, 4)
+    assert canonical_trip(trip(startDate="2026-04-20", endDate="2026-04-22")) == canonical
+
+
+@pytest.mark.parametrize("changes", [
+    {"destination": "  JAPAN "},
+    {"specificDestinations": [{"name": "osaka"}, {"name": "Kyoto"}, {"notAName": "x"}]},
+    {"budgetAmount": 4200},
+    {"numberOfPeople": 5},  # only families and friends mention group size
+    {"clarifyingAnswers": [{"question": "pace?", "answer": " relaxed"}, {"question": "Unanswered"}]},
+])
+def test_equivalent_requests_share_a_key(changes):
+    assert trip_cache_key(trip(**changes)) == trip_cache_key(TRIP)
+
+
+@pytest.mark.parametrize("changes", [
+    {"destination": "Korea"},
+    {"endDate": "2026-04-04"},
+    {"startDate": "2026-05-01", "endDate": "2026-05-03"},
+    {"budgetAmount": 8000},
+    {"currency": "USD"},
+    {"companions": "solo"},
+    {"specificDestinations": [{"name": "Kyoto"}]},
+    {"clarifyingAnswers": []},
+])
+def test_different_plans_get_different_keys(changes):
+    assert trip_cache_key(trip(**changes)) != trip_cache_key(TRIP)
+
+
+def test_group_size_matters_for_families():
+    family = trip(companions="family", numberOfPeople=4)
+    assert trip_cache_key(family) != trip_cache_key(dict(family, numberOfPeople=5))
+
+
+def test_unparseable_dates_never_collide():
+    assert canonical_trip(trip(startDate="soon", endDate="later"))["month"] is None
+    assert trip_cache_key(trip(startDate="soon")) != trip_cache_key(trip(startDate="eventually"))
+
+
+# --- redate_itinerary --------------------------------------------------------
+
+PLAN = [
+    {"day": 1, "date": "2026-01-10", "activities": []},
+    {"day": 2, "date": "2026-01-11", "activities": []},
+]
+
+
+def test_redate_shifts_each_day_onto_the_new_start():
+    redated = redate_itinerary(PLAN, "2026-04-01")
+    assert [day["date"] for day in redated] == ["2026-04-01", "2026-04-02"]
+    assert PLAN[0]["date"] == "2026-01-10"
+
+
+def test_redate_follows_day_numbers_and_falls_back_to_position():
+    plan = [{"day": 3}, {"day": "two"}, {}]
+    assert [day["date"] for day in redate_itinerary(plan, date(2026, 4, 1))] == [
+        "2026-04-03", "2026-04-02", "2026-04-03",
+    ]
+
+
+def test_redate_leaves_the_plan_alone_without_a_start_date():
+    assert redate_itinerary(PLAN, "not a date") is PLAN
+
+
+# --- streamed plans are validated before caching ------------------------------
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ItineraryCache(SqliteResultStore(str(tmp_path / "itineraries.sqlite3"), table="itineraries"))
+    monkeypatch.setattr(itinerary_service, "itinerary_cache", cache)
+    return cache
+
+
+def stream_days(monkeypatch, days):
+    text = json.dumps(days)
+
+    def generate_content_stream(**kwargs):
+        return iter([SimpleNamespace(text=text[:20]), SimpleNamespace(text=text[20:])])
+    monkeypatch.setattr(itinerary_service, "gemini", SimpleNamespace(generate_content_stream=generate_content_stream))
+
+
+def day(number, date_text):
+    return {"day": number, "date": date_text, "activities": [{"location": "Kyoto", "country": "Japan"}]}
+
+
+def test_valid_streamed_plan_is_cached(cache, monkeypatch):
+    stream_days(monkeypatch, [day(1, "2026-04-01"), day(2, "2026-04-02"), day(3, "2026-04-03")])
+    events = list(itinerary_service.generate_itinerary_stream(TRIP))
+    assert events[-1] == ("countries", ["Japan"])
+    assert cache.stores == 1
+    assert cache.lookup(TRIP) is not None
+
+
+@pytest.mark.parametrize("days", [
+    [day(1, "2026-04-01"), day(2, "2026-04-02")],
+    [day(1, "2026-04-01"), day(3, "2026-04-03"), day(2, "2026-04-02")],
+    [day(1, "2026-04-01"), day(2, "2026-04-05"), day(3, "2026-04-03")],
+])
+def test_invalid_streamed_plan_is_sent_but_not_cached(cache, monkeypatch, days):
+    stream_days(monkeypatch, days)
+    events = list(itinerary_service.generate_itinerary_stream(TRIP))
+    assert [event for event in events if event[0] == "day"] == [("day", d) for d in days]
+    assert events[-1][0] == "countries"
+    assert cache.stores == 0
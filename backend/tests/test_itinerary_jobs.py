@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from services.itinerary_jobs import FAILED, QUEUED, SUCCEEDED, InProcessJobBackend, QueueFull
+from services.result_store import SqliteResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SqliteResultStore(str(tmp_path / "jobs.sqlite3"), table="itinerary_jobs")
+
+
+def test_rejected_submit_leaves_no_record(store):
+    # No workers, so the single queue slot stays taken
+    backend = InProcessJobBackend(lambda payload: {}, store, workers=0, max_pending=1)
+    job_id = backend.submit({"destination": "Japan"})
+
+    with pytest.raises(QueueFull):
+        backend.submit({"destination": "Korea"})
+    assert store.size() == 1
+    assert backend.get(job_id)["status"] == QUEUED
+    assert (backend.submitted, backend.rejected) == (1, 1)
+
+
+def run_job(store, handler) -> dict:
+    finished = threading.Event()
+
+    def handle(payload):
+        try:
+            return handler(payload)
+        finally:
+            finished.set()
+
+    backend = InProcessJobBackend(handle, store, workers=1)
+    job_id = backend.submit({"destination": "Japan"})
+    assert finished.wait(5)
+    backend._queue.join()
+    return backend.get(job_id)
+
+
+def test_job_records_its_result(store):
+    record = run_job(store, lambda payload: {"itinerary": [], "countries": ["Japan"]})
+    assert record["status"] == SUCCEEDED
+    assert record["result"]["countries"] == ["Japan"]
+
+
+def test_job_records_errors(store):
+    def fail(payload):
+        raise RuntimeError("Gemini unavailable")
+
+    assert run_job(store, fail)["status"] == FAILED
+    assert "unavailable" in run_job(store, lambda payload: {"error": "unavailable"})["error"]
@@ -0,0 +1,200 @@
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+import services.itinerary_service as itinerary_service
+from services.itinerary_service import _segment_plan, _validate_segment, generate_outline, validate_itinerary
+
+START = date(2026, 4, 1)
+
+
+def trip(days: int) -> dict:
+    return {"destination": "Japan", "startDate": "2026-04-01", "endDate": f"2026-04-{days:02d}"}
+
+
+def day(number, **fields) -> dict:
+    return dict({"day": number, "activities": [{"location": "Kyoto", "country": "Japan"}]}, **fields)
+
+
+# --- _segment_plan -----------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def segment_sizes(monkeypatch):
+    monkeypatch.setattr(itinerary_service, "SEGMENT_THRESHOLD_DAYS", 8)
+    monkeypatch.setattr(itinerary_service, "SEGMENT_DAYS", 5)
+
+
+@pytest.mark.parametrize("days, segments", [
+    (1, []),
+    (8, []),
+    (9, [(1, 5), (6, 9)]),
+    (10, [(1, 5), (6, 10)]),
+    (11, [(1, 4), (5, 8), (9, 11)]),
+    (14, [(1, 5), (6, 10), (11, 14)]),
+    (16, [(1, 4), (5, 8), (9, 12), (13, 16)]),
+])
+def test_segment_plan_splits_evenly_above_the_threshold(days, segments):
+    assert _segment_plan(trip(days)) == segments
+
+
+def test_segment_plan_covers_every_day_once():
+    for days in range(9, 31):
+        plan = _segment_plan(trip(days))
+        assert [n for first, last in plan for n in range(first, last + 1)] == list(range(1, days + 1))
+        sizes = [last - first + 1 for first, last in plan]
+        assert max(sizes) - min(sizes) <= 1
+
+
+@pytest.mark.parametrize("trip_data", [
+    {"startDate": "2026-04-01"},
+    {"startDate": "soon", "endDate": "2026-04-30"},
+    {"startDate": "2026-04-30", "endDate": "2026-04-01"},
+])
+def test_segment_plan_is_empty_without_a_usable_date_range(trip_data):
+    assert _segment_plan(trip_data) == []
+
+
+# --- _validate_segment / validate_itinerary -----------------------------------
+
+def test_validate_segment_orders_by_day_and_pins_numbers_and_dates():
+    pinned = _validate_segment([day(7), day(6, date="wrong")], 6, 7, START)
+    assert [(d["day"], d["date"]) for d in pinned] == [(6, "2026-04-06"), (7, "2026-04-07")]
+
+
+def test_validate_segment_renumbers_days_numbered_from_one():
+    pinned = _validate_segment([day(1), day(2)], 6, 7, START)
+    assert [d["day"] for d in pinned] == [6, 7]
+
+
+def test_validate_segment_keeps_position_for_missing_or_bad_day_numbers():
+    days = [day(None, name="a"), day("x", name="b"), day(8, name="c")]
+    days[0].pop("day")
+    pinned = _validate_segment(days, 6, 8, START)
+    assert [d["name"] for d in pinned] == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("days", [
+    [day(6)],
+    [day(6), day(7), day(8)],
+    {"days": [day(6), day(7)]},
+    [day(6), {"day": 7}],
+])
+def test_validate_segment_rejects_wrong_shapes(days):
+    with pytest.raises(ValueError):
+        _validate_segment(days, 6, 7, START)
+
+
+def dated(numbers) -> list:
+    return [{"day": n, "date": f"2026-04-{n:02d}"} for n in numbers]
+
+
+def test_validate_itinerary_accepts_a_consecutive_plan():
+    validate_itinerary(dated([1, 2, 3]), START, 3)
+
+
+@pytest.mark.parametrize("itinerary", [
+    dated([1, 2]),
+    dated([1, 3, 2]),
+    dated([1, 2, 2]),
+    dated([1, 2]) + [{"day": 3, "date": "2026-04-04"}],
+    dated([1, 2]) + [{"date": "2026-04-03"}],
+    dated([1, 2]) + ["day 3"],
+])
+def test_validate_itinerary_rejects_gaps_and_disorder(itinerary):
+    with pytest.raises(ValueError):
+        validate_itinerary(itinerary, START, 3)
+
+
+# --- generate_outline ---------------------------------------------------------
+
+def fake_outline(monkeypatch, entries):
+    def generate_content(**kwargs):
+        return SimpleNamespace(text=json.dumps(entries))
+    monkeypatch.setattr(itinerary_service, "gemini", SimpleNamespace(generate_content=generate_content))
+
+
+def test_outline_is_ordered_by_day(monkeypatch):
+    fake_outline(monkeypatch, [
+        {"day": 2, "base": "Osaka", "focus": "food"},
+        {"day": "1", "base": "Kyoto", "focus": "temples"},
+        {"base": "Nowhere", "focus": "no day"},
+    ])
+    assert [entry["base"] for entry in generate_outline(trip(2), 2)] == ["Kyoto", "Osaka"]
+
+
+def test_outline_missing_days_is_an_error(monkeypatch):
+    fake_outline(monkeypatch, [{"day": 1, "base": "Kyoto", "focus": "temples"}, {"day": 3, "base": "Osaka", "focus": "food"}])
+    with pytest.raises(ValueError, match=r"missing days \[2\]"):
+        generate_outline(trip(3), 3)
+
+
+# --- cancellation -------------------------------------------------------------
+
+class SegmentGemini:
+    """
+    Fake Gemini for an 11-day trip: segments (1-4), (5-8) and (9-11).
+
+    Segments whose first day is in `fail` raise; segment 5-8 first waits for
+    `release`. Segment calls are recorded by first day.
+    """
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def generate_content(self, model, contents, config, call_site):
+        if call_site == "itinerary_outline":
+            return SimpleNamespace(text=json.dumps([{"day": n, "base": "Kyoto", "focus": "x"} for n in range(1, 12)]))
+        first, last = map(int, re.search(r"Plan ONLY days (\d+) to (\d+)", contents).groups())
+        self.calls.append(first)
+        if first == 5:
+            self.started.set()
+            self.release.wait(5)
+        if first in self.fail:
+            raise ValueError(f"bad segment {first}")
+        return SimpleNamespace(text=json.dumps([day(n) for n in range(first, last + 1)]))
+
+
+def use_segment_pool(monkeypatch, fake, workers):
+    pool = ThreadPoolExecutor(max_workers=workers)
+    monkeypatch.setattr(itinerary_service, "gemini", fake)
+    monkeypatch.setattr(itinerary_service, "_segment_pool", pool)
+    return pool
+
+
+def test_closing_the_stream_cancels_queued_and_retrying_segments(monkeypatch):
+    fake = SegmentGemini(fail={5})
+    pool = use_segment_pool(monkeypatch, fake, workers=1)
+
+    stream = itinerary_service._stream_itinerary_segmented(trip(11))
+    kind, first_day = next(stream)
+    assert (kind, first_day["day"]) == ("day", 1)
+    assert fake.started.wait(5)
+
+    # The client disconnects while segment 5-8 is running and 9-11 is queued
+    stream.close()
+    fake.release.set()
+    pool.shutdown(wait=True)
+
+    # 5-8 failed once but was not retried, and 9-11 never ran
+    assert fake.calls == [1, 5]
+
+
+def test_failed_segment_stops_the_others_retrying(monkeypatch):
+    fake = SegmentGemini(fail={1, 5})
+    pool = use_segment_pool(monkeypatch, fake, workers=2)
+
+    result = itinerary_service._generate_itinerary_segmented(trip(11))
+    assert "bad segment 1" in result["error"]
+    fake.release.set()
+    pool.shutdown(wait=True)
+
+    assert fake.calls.count(1) == itinerary_service.SEGMENT_ATTEMPTS
+    assert fake.calls.count(5) <= 1
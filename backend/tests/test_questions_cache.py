@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from services.gemini_client import max_throttle_wait
+from services.questions_cache import QuestionsCache, questions_cache_key
+from services.result_store import SqliteResultStore
+
+TRIP = {
+    "destination": "Japan",
+    "startDate": "2026-04-01",
+    "endDate": "2026-04-05",
+    "companions": "couple",
+    "specificDestinations": [{"name": "Kyoto"}, {"name": "Osaka"}],
+}
+
+
+def trip(**changes) -> dict:
+    return dict(TRIP, **changes)
+
+
+class Generator:
+    """Stand-in for the Gemini call: counts calls and returns one question per call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, trip_data):
+        self.calls += 1
+        return [{"id": "q0", "text": f"Question {self.calls} for {trip_data['destination']}?"}]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SqliteResultStore(str(tmp_path / "questions.sqlite3"), table="clarifying_questions")
+
+
+def test_key_ignores_casing_place_order_and_small_length_changes():
+    same = trip(
+        destination=" japan ",
+        endDate="2026-04-06",
+        specificDestinations=[{"name": "osaka"}, {"name": "KYOTO"}],
+    )
+    assert questions_cache_key(same) == questions_cache_key(TRIP)
+
+
+@pytest.mark.parametrize("changes", [
+    {"destination": "Korea"},
+    {"companions": "family"},
+    {"endDate": "2026-04-20"},
+    {"specificDestinations": [{"name": "Kyoto"}]},
+])
+def test_key_changes_with_what_shapes_the_questions(changes):
+    assert questions_cache_key(trip(**changes)) != questions_cache_key(TRIP)
+
+
+def test_memory_tier_serves_repeats():
+    generate = Generator()
+    cache = QuestionsCache()
+
+    first = cache.get_or_generate(TRIP, generate)
+    assert cache.get_or_generate(trip(destination="JAPAN"), generate) == first
+    assert generate.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    generate = Generator()
+    cache = QuestionsCache(max_entries=2)
+    japan, korea, peru = trip(), trip(destination="Korea"), trip(destination="Peru")
+
+    cache.get_or_generate(japan, generate)
+    cache.get_or_generate(korea, generate)
+    cache.get_or_generate(japan, generate)
+    cache.get_or_generate(peru, generate)
+    assert generate.calls == 3
+
+    cache.get_or_generate(japan, generate)
+    assert generate.calls == 3
+    cache.get_or_generate(korea, generate)
+    assert generate.calls == 4
+
+
+def test_expired_memory_entries_are_regenerated():
+    generate = Generator()
+    cache = QuestionsCache(ttl=-1)
+    cache.get_or_generate(TRIP, generate)
+    cache.get_or_generate(TRIP, generate)
+    assert generate.calls == 2
+
+
+def test_sqlite_tier_warms_a_new_worker(store):
+    generate = Generator()
+    first = QuestionsCache(store=store).get_or_generate(TRIP, generate)
+
+    # A restarted or sibling worker has an empty memory tier but shares the file
+    sibling = QuestionsCache(store=store)
+    assert sibling.get_or_generate(TRIP, generate) == first
+    assert generate.calls == 1
+    assert (sibling.store_hits, sibling.misses) == (1, 0)
+
+    # ...and remembers the answer in memory from then on
+    sibling.get_or_generate(TRIP, generate)
+    assert sibling.hits == 1
+
+
+def test_failures_are_not_cached(store):
+    cache = QuestionsCache(store=store)
+
+    def fail(trip_data):
+        raise RuntimeError("Gemini unavailable")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_generate(TRIP, fail)
+    assert store.get(questions_cache_key(TRIP)) is None
+
+    generate = Generator()
+    cache.get_or_generate(TRIP, generate)
+    assert generate.calls == 1
+
+
+def test_expired_store_entries_are_missing(tmp_path):
+    store = SqliteResultStore(str(tmp_path / "questions.sqlite3"), table="clarifying_questions", ttl=-1)
+    store.put("key", [{"id": "q0", "text": "Old?"}])
+    assert store.get("key") is None
+
+
+def test_calls_are_shared_only_under_the_same_wait_limit():
+    cache = QuestionsCache()
+    started, release = threading.Event(), threading.Event()
+
+    def throttled(trip_data):
+        started.set()
+        release.wait(5)
+        return [{"id": "q0", "text": "Late?"}]
+
+    # An unbounded caller (e.g. a background worker) is stuck behind the rate limiter...
+    worker = threading.Thread(target=cache.get_or_generate, args=(TRIP, throttled))
+    worker.start()
+    assert started.wait(5)
+
+    # ...so a request with a wait limit makes its own call instead of joining it
+    generate = Generator()
+    with max_throttle_wait(1):
+        assert cache.get_or_generate(TRIP, generate)[0]["text"].startswith("Question 1")
+    assert generate.calls == 1
+
+    release.set()
+    worker.join(5)
+    assert cache._flight.shared == 0
@@ -0,0 +1,226 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import seed
+from seed import MAX_DEDUP_ATTEMPTS, TEXT_ATTEMPTS, SeedPipeline, generate_destinations_text, validate_destination
+from services.name_index import FuzzyNameIndex
+
+
+def destination(name: str, country: str = "Japan", **fields) -> dict:
+    return dict({
+        "name": name,
+        "location": f"{name}, {country}",
+        "description": "A quiet place.",
+        "tags": ["Nature"],
+        "imagePrompt": "wide shot",
+        "isPersonalized": False,
+        "country": country,
+        "region": ["East Asia"],
+    }, **fields)
+
+
+# --- validate_destination ----------------------------------------------------
+
+def test_validate_destination_cleans_fields():
+    cleaned = validate_destination(destination(
+        "  Kyoto Gardens ", country=" Japan ", tags=[" Nature ", "", 3], region=["East Asia", "Atlantis"],
+        isPersonalized=None,
+    ))
+    assert cleaned["name"] == "Kyoto Gardens"
+    assert cleaned["country"] == "Japan"
+    assert cleaned["tags"] == ["Nature"]
+    assert cleaned["region"] == ["East Asia"]
+    assert cleaned["isPersonalized"] is False
+
+
+@pytest.mark.parametrize("data", [
+    None,
+    "Kyoto",
+    destination(" "),
+    destination("Kyoto", imagePrompt=None),
+    destination("Kyoto", tags=[]),
+    destination("Kyoto", tags="Nature"),
+    destination("Kyoto", region=["Atlantis"]),
+])
+def test_validate_destination_rejects_incomplete_results(data):
+    assert validate_destination(data) is None
+
+
+# --- generate_destinations_text ----------------------------------------------
+
+def gemini_returning(monkeypatch, text: str):
+    def generate_content(**kwargs):
+        return SimpleNamespace(text=text)
+    monkeypatch.setattr(seed, "gemini", SimpleNamespace(generate_content=generate_content))
+
+
+SLOTS = [{"region": "Asia", "theme": "temples", "style": "slow travel", "attempt": 0, "avoid": []}] * 4
+
+
+def test_batch_items_are_mapped_by_slot_number(monkeypatch):
+    gemini_returning(monkeypatch, json.dumps([
+        dict(destination("Third"), slot=3),
+        dict(destination("First"), slot=1),
+        dict(destination("First again"), slot=1),
+        dict(destination("Out of range"), slot=5),
+        dict(destination("No number")),
+        dict(destination("Text number"), slot="2"),
+        "not an item",
+    ]))
+    results = generate_destinations_text(SLOTS, [[]] * 4)
+    assert [r and r["name"] for r in results] == ["First", None, "Third", None]
+
+
+@pytest.mark.parametrize("text", ["not json", json.dumps({"slot": 1})])
+def test_unusable_batch_response_fails_every_slot(monkeypatch, text):
+    gemini_returning(monkeypatch, text)
+    assert generate_destinations_text(SLOTS, [[]] * 4) == [None] * 4
+
+
+# --- SeedPipeline ------------------------------------------------------------
+
+class Stages:
+    """Stubs for the Gemini, storage and database calls the pipeline makes."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.text_requests = []
+        self.inserted = []
+        self.image = lambda data: b"png"
+        self.upload = lambda image, name: f"https://img/{name}"
+        self.insert = lambda data: self.inserted.append(data["name"]) or 1
+
+    def _next(self):
+        name = self.names.pop(0) if self.names else None
+        return name and destination(name)
+
+    def one(self, slot, same_country_names):
+        self.text_requests.append((1, list(slot["avoid"]), same_country_names))
+        return self._next()
+
+    def batch(self, slots, same_country_names):
+        self.text_requests.append((len(slots), None, same_country_names))
+        return [self._next() for _ in slots]
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    stages = Stages([])
+    monkeypatch.setattr(seed, "generate_destination_text", stages.one)
+    monkeypatch.setattr(seed, "generate_destinations_text", stages.batch)
+    monkeypatch.setattr(seed, "generate_destination_image", lambda data: stages.image(data))
+    monkeypatch.setattr(seed, "upload_image", lambda image, name: stages.upload(image, name))
+    monkeypatch.setattr(seed, "add_destination", lambda data: stages.insert(data))
+    return stages
+
+
+def index(*names) -> FuzzyNameIndex:
+    name_index = FuzzyNameIndex(seed.DUPLICATE_THRESHOLD)
+    for name in names:
+        name_index.add({"name": name, "country": "Japan"})
+    return name_index
+
+
+def run(name_index, batch_size, **options) -> SeedPipeline:
+    pipeline = SeedPipeline(name_index, **options)
+    pipeline.run(batch_size)
+    return pipeline
+
+
+def test_every_slot_is_created_once(stages):
+    stages.names = ["Kyoto Gardens", "Hakone Onsen", "Nara Park"]
+    pipeline = run(index(), 3)
+
+    assert sorted(e["name"] for e in pipeline.created) == sorted(stages.inserted)
+    assert sorted(stages.inserted) == ["Hakone Onsen", "Kyoto Gardens", "Nara Park"]
+    assert not any(pipeline.failed.values())
+
+
+def test_empty_batch_returns_immediately(stages):
+    assert run(index(), 0).created == []
+
+
+def test_duplicates_go_back_to_text_with_an_avoid_list(stages):
+    stages.names = ["Mount Fuji", "Kyoto Gardens"]
+    pipeline = run(index("Mount Fuji"), 1)
+
+    assert [e["name"] for e in pipeline.created] == ["Kyoto Gardens"]
+    assert pipeline.duplicates == 1
+    _, avoid, same_country_names = stages.text_requests[1]
+    assert avoid == [{"name": "Mount Fuji", "country": "Japan"}]
+    assert same_country_names == ["Mount Fuji"]
+
+
+def test_slot_is_dropped_after_max_dedup_attempts(stages):
+    stages.names = ["Mount Fuji"] * MAX_DEDUP_ATTEMPTS
+    pipeline = run(index("Mount Fuji"), 1)
+    assert pipeline.created == []
+    assert pipeline.failed["dedup"] == 1
+
+
+def test_slot_is_dropped_after_text_attempts(stages):
+    pipeline = run(index(), 1)
+    assert pipeline.failed["text"] == 1
+    assert pipeline.invalid == TEXT_ATTEMPTS
+
+
+def fail_image(stages):
+    stages.image = lambda data: None
+
+
+def fail_upload(stages):
+    stages.upload = lambda image, name: None
+
+
+def fail_insert(stages):
+    stages.insert = lambda data: None
+
+
+def crash_image(stages):
+    def image(data):
+        raise RuntimeError("Imagen down")
+    stages.image = image
+
+
+@pytest.mark.parametrize("break_stage, stage", [
+    (fail_image, "image"),
+    (crash_image, "image"),
+    (fail_upload, "upload"),
+    (fail_insert, "insert"),
+])
+def test_failure_after_dedup_releases_the_reserved_name(stages, break_stage, stage):
+    stages.names = ["Kyoto Gardens"]
+    break_stage(stages)
+    name_index = index("Mount Fuji")
+    pipeline = run(name_index, 1)
+
+    assert pipeline.failed[stage] == 1
+    assert len(name_index) == 1
+    assert name_index.find_duplicate("Kyoto Gardens") is None
+
+
+def test_batched_text_re_requests_only_rejected_slots(stages):
+    stages.names = ["Kyoto Gardens", None, "Nara Park", "Hakone Onsen"]
+    pipeline = run(index(), 3, text_workers=1, per_call=3)
+
+    assert [size for size, _, _ in stages.text_requests] == [3, 1]
+    assert pipeline.text_calls == 2
+    assert pipeline.invalid == 1
+    assert len(pipeline.created) == 3
+
+
+def test_busy_time_excludes_waiting_on_a_full_downstream_queue(stages):
+    stages.names = ["Kyoto Gardens", "Hakone Onsen", "Nara Park"]
+
+    def slow_image(data):
+        time.sleep(0.2)
+        return b"png"
+    stages.image = slow_image
+    pipeline = run(index(), 3, image_workers=1, queue_size=1)
+
+    # Dedup waited ~0.2s for room in the image queue but did almost no work
+    assert pipeline.busy_seconds["dedup"] < 0.1
+    assert pipeline.busy_seconds["image"] >= 0.5
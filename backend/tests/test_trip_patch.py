@@ -0,0 +1,228 @@
+import pytest
+from flask import Flask
+from werkzeug.http import parse_etags
+
+import services.trips_service as trips_service
+from middleware import compression, http_caching
+from routes.trips import parse_version_etag, trips_bp
+from services.trips_service import patch_trip
+
+TRIP_ID = "trip-1"
+
+
+def trip_row(version: int = 3, **fields) -> dict:
+    row = {snake: None for snake in trips_service.FIELD_MAP.values()}
+    row.update({
+        "trip_name": "Kyoto",
+        "destination": "Japan",
+        "countries": ["Japan"],
+        "specific_destinations": [],
+        "itinerary": [
+            {"day": 1, "activities": [{"time": "09:00", "title": "Fushimi Inari"}]},
+            {"day": 2, "activities": []},
+        ],
+        "version": version,
+    })
+    row.update(fields)
+    return row
+
+
+@pytest.fixture
+def trips(stub_supabase):
+    return stub_supabase(trips_service)
+
+
+@pytest.fixture
+def client(trips):
+    app = Flask(__name__)
+    app.register_blueprint(trips_bp)
+    http_caching.init_app(app)
+    compression.init_app(app)
+    return app.test_client()
+
+
+def updated(stub) -> tuple:
+    """(changes, filters) of the update query the stub executed."""
+    query = stub.executed[-1]
+    changes = next(call[1] for call in query.calls if call[0] == "update")
+    filters = [call[1:] for call in query.calls if call[0] == "eq"]
+    return changes, filters
+
+
+# --- patch_trip --------------------------------------------------------------
+
+def test_patch_writes_only_changed_columns_guarded_by_version(trips):
+    trips.responses["trips"] = [[trip_row()], [trip_row(version=4, trip_name="Kyoto & Nara")]]
+    result, error = patch_trip(TRIP_ID, [
+        {"op": "replace", "path": "/tripName", "value": "Kyoto & Nara"},
+        {"op": "replace", "path": "/destination", "value": "Japan"},
+    ])
+
+    assert error is None
+    assert result["version"] == 4
+    changes, filters = updated(trips)
+    assert changes == {"trip_name": "Kyoto & Nara"}
+    assert filters == [("id", TRIP_ID), ("version", 3)]
+
+
+def test_patch_inside_itinerary_rewrites_the_itinerary_column(trips):
+    trips.responses["trips"] = [[trip_row()], [trip_row(version=4)]]
+    _, error = patch_trip(TRIP_ID, [
+        {"op": "add", "path": "/itinerary/1/activities/-", "value": {"time": "10:00", "title": "Nishiki"}},
+    ])
+
+    assert error is None
+    changes, _ = updated(trips)
+    assert list(changes) == ["itinerary"]
+    assert changes["itinerary"][1]["activities"] == [{"time": "10:00", "title": "Nishiki"}]
+
+
+def test_noop_patch_does_not_write(trips):
+    trips.responses["trips"] = [[trip_row()]]
+    result, error = patch_trip(TRIP_ID, [{"op": "test", "path": "/tripName", "value": "Kyoto"}])
+    assert error is None
+    assert result["version"] == 3
+    assert len(trips.executed) == 1
+
+
+def test_missing_trip(trips):
+    trips.responses["trips"] = [[]]
+    assert patch_trip(TRIP_ID, [{"op": "remove", "path": "/itinerary/0"}]) == (None, "not_found")
+
+
+def test_stale_expected_version_conflicts_without_writing(trips):
+    trips.responses["trips"] = [[trip_row(version=5)]]
+    result, error = patch_trip(TRIP_ID, [{"op": "remove", "path": "/itinerary/0"}], expected_version=3)
+    assert error == "conflict"
+    assert result["version"] == 5
+    assert len(trips.executed) == 1
+
+
+def test_concurrent_write_between_read_and_update_conflicts(trips):
+    # The version guard matched no row: someone else bumped the version first
+    trips.responses["trips"] = [[trip_row()], []]
+    _, error = patch_trip(TRIP_ID, [{"op": "remove", "path": "/itinerary/0"}])
+    assert error == "conflict"
+
+
+@pytest.mark.parametrize("operations, message", [
+    ([{"op": "remove", "path": "/itinerary"}], "cannot remove fields ['itinerary']"),
+    ([{"op": "add", "path": "/owner", "value": "x"}], "unknown fields ['owner']"),
+    ([{"op": "replace", "path": "/itinerary/9/day", "value": 1}], "path does not exist"),
+    ([{"op": "test", "path": "/tripName", "value": "Osaka"}], "invalid_patch"),
+    ([{"op": "explode", "path": "/tripName"}], "invalid_patch"),
+])
+def test_invalid_patches_are_rejected_without_writing(trips, operations, message):
+    trips.responses["trips"] = [[trip_row()]]
+    _, error = patch_trip(TRIP_ID, operations)
+    assert error.startswith("invalid_patch")
+    assert message in error
+    assert len(trips.executed) == 1
+
+
+# --- parse_version_etag ------------------------------------------------------
+
+@pytest.mark.parametrize("header, version", [
+    ('"v3"', 3),
+    ('"3"', 3),
+    ('"v3-gzip"', 3),
+    ('"v12-br"', 12),
+    ('W/"v3"', None),
+    ('"v3", "v4"', None),
+    ('"abc"', None),
+    ('"v3-deflate"', None),
+])
+def test_parse_version_etag(header, version):
+    assert parse_version_etag(parse_etags(header)) == version
+
+
+# --- PATCH /api/trips/<id> ---------------------------------------------------
+
+def patch(client, operations, **headers):
+    return client.patch(f"/api/trips/{TRIP_ID}", json=operations, headers=headers)
+
+
+REMOVE_FIRST_DAY = [{"op": "remove", "path": "/itinerary/0"}]
+
+
+def test_if_match_success_returns_the_new_version_etag(client, trips):
+    trips.responses["trips"] = [[trip_row()], [trip_row(version=4)]]
+    response = patch(client, REMOVE_FIRST_DAY, **{"If-Match": '"v3"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"v4"'
+
+
+@pytest.mark.parametrize("if_match", ['W/"v3"', '"v3", "v2"', '"not-a-version"'])
+def test_unusable_if_match_is_412_without_touching_the_db(client, trips, if_match):
+    response = patch(client, REMOVE_FIRST_DAY, **{"If-Match": if_match})
+    assert response.status_code == 412
+    assert trips.executed == []
+
+
+def test_stale_if_match_is_412(client, trips):
+    trips.responses["trips"] = [[trip_row(version=5)]]
+    response = patch(client, REMOVE_FIRST_DAY, **{"If-Match": '"v3"'})
+    assert response.status_code == 412
+    assert response.get_json()["version"] == 5
+
+
+def test_stale_body_version_is_409(client, trips):
+    trips.responses["trips"] = [[trip_row(version=5)]]
+    response = patch(client, {"operations": REMOVE_FIRST_DAY, "version": 3})
+    assert response.status_code == 409
+    assert response.get_json()["version"] == 5
+
+
+def test_string_body_version_is_coerced(client, trips):
+    trips.responses["trips"] = [[trip_row(version=5)]]
+    response = patch(client, {"operations": REMOVE_FIRST_DAY, "version": "3"})
+    assert response.status_code == 409
+
+
+@pytest.mark.parametrize("version", ["v3", "three", 3.5, True, [3], {"v": 3}])
+def test_non_integer_body_version_is_400_without_touching_the_db(client, trips, version):
+    response = patch(client, {"operations": REMOVE_FIRST_DAY, "version": version})
+    assert response.status_code == 400
+    assert trips.executed == []
+
+
+def test_invalid_patch_is_422(client, trips):
+    trips.responses["trips"] = [[trip_row()]]
+    response = patch(client, [{"op": "remove", "path": "/tripName"}])
+    assert response.status_code == 422
+    assert "cannot remove fields" in response.get_json()["error"]
+
+
+def test_empty_patch_is_400(client, trips):
+    assert patch(client, []).status_code == 400
+
+
+# --- GET /api/trips/<id> -----------------------------------------------------
+
+def long_trip() -> dict:
+    # Large enough to be compressed (compression.MIN_SIZE)
+    day = {"day": 1, "activities": [{"time": "09:00", "title": "Temple walk " * 20}] * 10}
+    return trip_row(id=TRIP_ID, user_id="user-1", itinerary=[day] * 5)
+
+
+def test_each_encoding_gets_its_own_version_etag(client, trips):
+    trips.responses["trips"] = [[long_trip()], [long_trip()]]
+    url = f"/api/trips/{TRIP_ID}?userId=user-1"
+
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+
+    assert identity.headers["ETag"] == '"v3"'
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] == '"v3-gzip"'
+
+
+def test_encoded_etag_revalidates_and_works_as_if_match(client, trips):
+    trips.responses["trips"] = [[long_trip()], [trip_row()], [trip_row(version=4)]]
+    url = f"/api/trips/{TRIP_ID}?userId=user-1"
+
+    revalidated = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": '"v3-gzip"'})
+    assert revalidated.status_code == 304
+
+    response = patch(client, REMOVE_FIRST_DAY, **{"If-Match": '"v3-gzip"'})
+    assert response.status_code == 200
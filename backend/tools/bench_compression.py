@@ -0,0 +1,100 @@
+"""
+Measure bytes saved and CPU cost of response compression on realistic itineraries.
+
+Builds /api/trips-style JSON for 7-day and 21-day trips and times every encoder
+the compression middleware can negotiate (gzip always; br/zstd when installed).
+
+Run from the backend folder:
+    python tools/bench_compression.py
+"""
+import json
+import random
+import sys
+import timeit
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from middleware.compression import ENCODERS
+
+PLACES = [
+    ("Fushimi Inari Taisha", "Kyoto", "Japan"),
+    ("Nishiki Market", "Kyoto", "Japan"),
+    ("Arashiyama Bamboo Grove", "Kyoto", "Japan"),
+    ("Dotonbori", "Osaka", "Japan"),
+    ("Nara Park", "Nara", "Japan"),
+    ("Senso-ji", "Tokyo", "Japan"),
+    ("Shibuya Sky", "Tokyo", "Japan"),
+    ("Gyeongbokgung Palace", "Seoul", "South Korea"),
+    ("Gwangjang Market", "Seoul", "South Korea"),
+    ("Bukchon Hanok Village", "Seoul", "South Korea"),
+]
+
+TIMES = ["08:00", "10:30", "13:00", "15:30", "19:00"]
+
+DESCRIPTIONS = [
+    "Start early to beat the crowds and walk the trail while the light is soft.",
+    "Graze through the stalls for a late breakfast of grilled skewers and fresh mochi.",
+    "Take the local train and spend the afternoon wandering side streets and tea houses.",
+    "Dinner at a small family-run izakaya; book ahead and try the seasonal set menu.",
+    "Evening stroll along the river with views of the illuminated shrine gates.",
+]
+
+
+def make_trip(days: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    start = date(2026, 4, 1)
+    itinerary = []
+    for day in range(days):
+        activities = []
+        for time in rng.sample(TIMES, rng.randint(3, 5)):
+            name, city, country = rng.choice(PLACES)
+            activities.append({
+                "time": time,
+                "title": f"Visit {name}",
+                "description": rng.choice(DESCRIPTIONS),
+                "location": f"{name}, {city}",
+                "country": country,
+            })
+        itinerary.append({
+            "day": day + 1,
+            "date": (start + timedelta(days=day)).isoformat(),
+            "activities": sorted(activities, key=lambda a: a["time"]),
+        })
+
+    return {
+        "id": f"trip-{seed}",
+        "tripName": f"{days} days in East Asia",
+        "destination": "Japan and South Korea",
+        "startDate": start.isoformat(),
+        "endDate": (start + timedelta(days=days - 1)).isoformat(),
+        "currency": "SGD",
+        "budgetAmount": 5000,
+        "companions": "couple",
+        "itinerary": itinerary,
+        "countries": ["Japan", "South Korea"],
+    }
+
+
+def main():
+    payloads = {
+        "1 trip, 7 days": [make_trip(7, 1)],
+        "1 trip, 21 days": [make_trip(21, 2)],
+        "trips list (12 x 7-21 days)": [make_trip(7 + (i % 3) * 7, 10 + i) for i in range(12)],
+    }
+
+    print(f"{'payload':<30} {'encoding':<9} {'bytes':>9} {'saved':>7} {'cpu (ms)':>9}")
+    for label, trips in payloads.items():
+        body = json.dumps(trips, separators=(",", ":")).encode()
+        print(f"{label:<30} {'identity':<9} {len(body):>9} {'':>7} {'':>9}")
+        for encoding, encode in ENCODERS.items():
+            compressed = encode(body)
+            number = 50
+            seconds = min(timeit.repeat(lambda: encode(body), number=number, repeat=5)) / number
+            saved = 1 - len(compressed) / len(body)
+            print(f"{'':<30} {encoding:<9} {len(compressed):>9} {saved:>6.0%} {seconds * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark: jsonify() over freshly built dicts vs. joining cached JSON fragments.
+
+Run from the backend folder:
+    python tools/bench_json_fragments.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import Flask, jsonify
+from services.destination_record import DestinationRecord, CARD_COLUMNS
+from services.json_fragments import FragmentCache, json_array_response
+
+SIZES = [4, 50, 500]
+
+
+def make_records(count: int) -> list:
+    return [
+        DestinationRecord.from_row({
+            "id": 10_000 + i,
+            "name": f"Destination {i}",
+            "location": "Kyoto, Japan",
+            "description": "A quiet temple district with moss gardens and lantern-lit lanes. " * 3,
+            "tags": ["temple", "garden", "culture", "photography"],
+            "image_url": f"https://example.supabase.co/storage/v1/object/public/travel-photos/dest-{i}.png",
+            "is_personalized": False,
+            "country": "Japan",
+            "region": ["East Asia"],
+            "updated_at": "2026-01-01T00:00:00+00:00",
+        })
+        for i in range(count)
+    ]
+
+
+def main():
+    app = Flask(__name__)
+
+    with app.app_context():
+        print(f"{'items':>6} {'jsonify (us)':>14} {'fragments (us)':>16} {'speedup':>8}")
+        for size in SIZES:
+            records = make_records(size)
+            cache = FragmentCache()
+
+            def current_path():
+                return jsonify([r.to_json(CARD_COLUMNS) for r in records]).get_data()
+
+            def cached_path():
+                return json_array_response([cache.encode(r, CARD_COLUMNS) for r in records]).get_data()
+
+            # Same bytes either way; also warms the cache
+            assert current_path() == cached_path()
+
+            number = max(20, 20000 // size)
+            current = min(timeit.repeat(current_path, number=number, repeat=5)) / number * 1e6
+            cached = min(timeit.repeat(cached_path, number=number, repeat=5)) / number * 1e6
+            print(f"{size:>6} {current:>14.1f} {cached:>16.1f} {current / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
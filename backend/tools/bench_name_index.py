@@ -0,0 +1,107 @@
+"""
+Micro-benchmark: seed.py duplicate check as a linear SequenceMatcher scan vs. FuzzyNameIndex.
+
+Builds catalogs of synthetic destination names, then looks up fresh names and
+near-duplicates (typos, reordered or dropped words) both ways. Every lookup must
+return the same entry, so the index is checked for exactness as well as speed.
+
+Run from the backend folder:
+    python tools/bench_name_index.py
+"""
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.name_index import FuzzyNameIndex, normalize_name
+
+DUPLICATE_THRESHOLD = 0.75  # Same as seed.py
+SIZES = [500, 2000, 10000]
+QUERIES = 400
+
+KINDS = ["Lake", "Mount", "National Park", "Old Town", "Temple", "Falls", "Island", "Valley",
+         "Glacier", "Canyon", "Bay", "Castle", "Market", "Hot Springs", "Rice Terraces", "Fjord"]
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"] + ["ran", "bor", "vik", "hel", "zan", "quo"]
+
+
+def place_name(rng: random.Random) -> str:
+    proper = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    kind = rng.choice(KINDS)
+    return f"{kind} {proper}" if rng.random() < 0.4 else f"{proper} {kind}"
+
+
+def near_duplicate(rng: random.Random, name: str) -> str:
+    words = name.split()
+    choice = rng.random()
+    if choice < 0.4:
+        i = rng.randrange(len(name))
+        return name[:i] + rng.choice("aeiou") + name[i + 1:]
+    if choice < 0.7:
+        rng.shuffle(words)
+        return " ".join(words)
+    if choice < 0.85 and len(words) > 2:
+        return " ".join(words[:-1])
+    return f"The {name}"
+
+
+def linear_duplicate(name: str, entries: list):
+    """The original seed.py check: normalize and compare against every entry."""
+    norm_new = normalize_name(name)
+    for entry in entries:
+        if SequenceMatcher(None, norm_new, normalize_name(entry['name'])).ratio() >= DUPLICATE_THRESHOLD:
+            return entry
+    return None
+
+
+def timed(fn, queries: list) -> tuple:
+    """Return (results, seconds per query)."""
+    results = []
+    durations = []
+    for q in queries:
+        started = time.perf_counter()
+        results.append(fn(q))
+        durations.append(time.perf_counter() - started)
+    return results, durations
+
+
+def mean_ms(durations: list) -> float:
+    return sum(durations) / len(durations) * 1000 if durations else 0.0
+
+
+def main():
+    rng = random.Random(7)
+    # A new name usually matches nothing, which is when the linear scan has to read the whole catalog
+    print(f"{'catalog':>8} {'build ms':>9} {'kind':>9} {'lookups':>8} {'linear ms':>10} {'index ms':>9} {'speedup':>8}")
+    for size in SIZES:
+        entries = [{"name": place_name(rng), "country": "X"} for _ in range(size)]
+        queries = [
+            near_duplicate(rng, rng.choice(entries)['name']) if rng.random() < 0.5 else place_name(rng)
+            for _ in range(QUERIES)
+        ]
+
+        started = time.perf_counter()
+        index = FuzzyNameIndex(DUPLICATE_THRESHOLD)
+        for entry in entries:
+            index.add(entry)
+        build = time.perf_counter() - started
+
+        expected, linear = timed(lambda q: linear_duplicate(q, entries), queries)
+        actual, indexed = timed(index.find_duplicate, queries)
+
+        mismatches = [q for q, e, a in zip(queries, expected, actual) if e is not a]
+        if mismatches:
+            sys.exit(f"❌ Index disagrees with the linear scan for {len(mismatches)} names, e.g. {mismatches[:3]}")
+
+        for kind, matched in (("match", True), ("no match", False)):
+            picked = [i for i, e in enumerate(expected) if (e is not None) == matched]
+            linear_ms = mean_ms([linear[i] for i in picked])
+            index_ms = mean_ms([indexed[i] for i in picked])
+            speedup = f"{linear_ms / index_ms:.0f}x" if index_ms else "-"
+            print(f"{size:>8} {build * 1000:>9.1f} {kind:>9} {len(picked):>8} {linear_ms:>10.3f} {index_ms:>9.3f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Local stand-ins for Supabase, Gemini and Resend used by tools/load_test_offline.py.
+
+Each module has a Fake* class holding the state and settings (latency, seeded
+rows, counters) and a serve() that runs it on a background HTTP server thread.
+"""
+import threading
+from http.server import ThreadingHTTPServer
+
+
+def start_server(handler, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve `handler` on a daemon thread; port 0 picks a free port (see .server_address)."""
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,211 @@
+"""
+Stand-in for the Gemini Developer API (generateContent and streamGenerateContent).
+
+Point the app at it with GOOGLE_GEMINI_BASE_URL. Responses are synthesised from
+the request's responseSchema, sized by the hints in the prompt ("exactly N
+entries", "Plan ONLY days X to Y", "from <date> to <date>", "exactly N objects"),
+and delayed like a real model: time to first token plus output tokens / tokens per second.
+"""
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fakes import start_server
+from urllib.parse import urlsplit
+
+WORDS = ("morning", "walk", "through", "the", "old", "town", "local", "market", "lunch", "at",
+         "a", "family-run", "restaurant", "sunset", "viewpoint", "museum", "harbour", "garden",
+         "temple", "trail", "cafe", "river", "cruise", "evening", "street", "food", "tour")
+
+QUESTIONS = ("Do you want a relaxed, slow-paced trip?", "Would you like to prioritize food experiences?",
+             "Are you comfortable with long hikes?")
+
+ACTIVITIES_PER_DAY = 4
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _day_span(prompt: str) -> tuple:
+    """(first day number, number of days, date of the first day or None) implied by the prompt."""
+    segment = re.search(r"Plan ONLY days (\d+) to (\d+) \((\d{4}-\d{2}-\d{2})", prompt)
+    if segment:
+        first, last = int(segment.group(1)), int(segment.group(2))
+        return first, last - first + 1, date.fromisoformat(segment.group(3))
+
+    dates = re.search(r"from (\d{4}-\d{2}-\d{2}) to (\d{4}-\d{2}-\d{2})", prompt)
+    start = date.fromisoformat(dates.group(1)) if dates else None
+    exact = re.search(r"exactly (\d+) entries", prompt)
+    if exact:
+        return 1, int(exact.group(1)), start
+    if dates:
+        return 1, max(1, (date.fromisoformat(dates.group(2)) - start).days + 1), start
+    return 1, 3, None
+
+
+class FakeGemini:
+    """
+    Settings are plain attributes so a benchmark can change them between runs:
+    ttft (seconds before the first token), tokens_per_second, description_words
+    (length of free-text fields, i.e. output size) and error_rate (fraction of
+    calls answered with a 429 to exercise client retries).
+    """
+
+    def __init__(self, ttft: float = 0.5, tokens_per_second: float = 200.0,
+                 description_words: int = 20, error_rate: float = 0.0, seed: int = None):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.description_words = description_words
+        self.error_rate = error_rate
+        self.calls = 0
+        self.output_tokens = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _text(self, words: int) -> str:
+        return " ".join(self._rng.choice(WORDS) for _ in range(words)).capitalize()
+
+    def _value(self, schema: dict, name: str, prompt: str, context: dict):
+        kind = (schema.get("type") or "STRING").upper()
+        if kind == "OBJECT":
+            return {key: self._value(sub, key, prompt, context) for key, sub in (schema.get("properties") or {}).items()}
+        if kind == "ARRAY":
+            return self._array(schema.get("items") or {}, name, prompt, context)
+        if kind == "INTEGER":
+            return context.get(name, self._rng.randint(1, 10))
+        if kind == "NUMBER":
+            return round(self._rng.uniform(0, 100), 2)
+        if kind == "BOOLEAN":
+            return False
+        if name in context:
+            return context[name]
+        if name == "time":
+            return f"{self._rng.randint(8, 20):02d}:00"
+        if name in ("description", "imagePrompt", "focus"):
+            return self._text(self.description_words)
+        if name == "country":
+            return "Japan"
+        if name == "region":
+            return "East Asia"
+        return self._text(3).title()
+
+    def _array(self, items: dict, name: str, prompt: str, context: dict) -> list:
+        properties = items.get("properties") or {}
+        if "day" in properties:
+            first, count, start = _day_span(prompt)
+            days = []
+            for number in range(first, first + count):
+                day_context = {"day": number}
+                if start is not None:
+                    day_context["date"] = (start + timedelta(days=number - first)).isoformat()
+                days.append(self._value(items, "", prompt, day_context))
+            return days
+        if "slot" in properties and not name:
+            # The seeder's batched destinations: one item per numbered request
+            exact = re.search(r"exactly (\d+) objects", prompt)
+            count = int(exact.group(1)) if exact else 3
+            return [self._value(items, "", prompt, {"slot": number}) for number in range(1, count + 1)]
+        if (items.get("type") or "").upper() == "STRING" and not name:
+            # Top-level string arrays are the clarifying questions
+            return list(QUESTIONS[:self._rng.randint(0, len(QUESTIONS))])
+        count = ACTIVITIES_PER_DAY if name == "activities" else 3
+        return [self._value(items, name, prompt, context) for _ in range(count)]
+
+    def respond(self, body: dict) -> tuple:
+        """Return (status, text, usage) for a generateContent request body."""
+        with self._lock:
+            self.calls += 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return 429, None, None
+        prompt = "".join(
+            part.get("text", "")
+            for content in body.get("contents") or []
+            for part in content.get("parts") or []
+        )
+        schema = (body.get("generationConfig") or {}).get("responseSchema")
+        text = json.dumps(self._value(schema, "", prompt, {})) if schema else self._text(self.description_words)
+
+        prompt_tokens, output_tokens = _estimate_tokens(prompt), _estimate_tokens(text)
+        with self._lock:
+            self.output_tokens += output_tokens
+        usage = {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens,
+        }
+        return 200, text, usage
+
+    def generation_seconds(self, text: str) -> float:
+        return _estimate_tokens(text) / self.tokens_per_second if self.tokens_per_second else 0.0
+
+
+def _candidate(text: str, finished: bool) -> dict:
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    return candidate
+
+
+RATE_LIMITED = {"error": {"code": 429, "message": "Resource has been exhausted (fake).", "status": "RESOURCE_EXHAUSTED"}}
+
+
+def serve(fake: FakeGemini, host: str = "127.0.0.1", port: int = 0, stream_chunks: int = 8) -> ThreadingHTTPServer:
+    """Start serving `fake` on a background thread and return the server (see .server_address)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _json(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            path = urlsplit(self.path).path
+            if not path.endswith((":generateContent", ":streamGenerateContent")):
+                self._json(404, {"error": {"code": 404, "message": f"{path} is not faked", "status": "NOT_FOUND"}})
+                return
+
+            status, text, usage = fake.respond(body)
+            time.sleep(fake.ttft)
+            if status != 200:
+                self._json(status, RATE_LIMITED)
+                return
+
+            if path.endswith(":generateContent"):
+                time.sleep(fake.generation_seconds(text))
+                self._json(200, {"candidates": [_candidate(text, True)], "usageMetadata": usage,
+                                 "modelVersion": path.rsplit("/", 1)[-1].split(":")[0]})
+                return
+
+            # Server-sent events, one JSON response per chunk; the connection closes at the end
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            size = max(1, -(-len(text) // stream_chunks))
+            pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+            for i, piece in enumerate(pieces):
+                time.sleep(fake.generation_seconds(piece))
+                last = i == len(pieces) - 1
+                event = {"candidates": [_candidate(piece, last)]}
+                if last:
+                    event["usageMetadata"] = usage
+                self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+                self.wfile.flush()
+
+        def log_message(self, *args):
+            pass
+
+    return start_server(Handler, host, port)
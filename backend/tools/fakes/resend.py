@@ -0,0 +1,49 @@
+"""
+Stand-in for the Resend API: POST /emails accepts anything and returns an id.
+
+Point the app at it with RESEND_API_URL. Sent messages are only counted.
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fakes import start_server
+
+
+class FakeResend:
+    def __init__(self, latency: float = 0.1):
+        self.latency = latency
+        self.sent = 0
+        self._lock = threading.Lock()
+
+
+def serve(fake: FakeResend, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start serving `fake` on a background thread and return the server (see .server_address)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+            if fake.latency:
+                time.sleep(fake.latency)
+            if self.path.rstrip("/") == "/emails":
+                with fake._lock:
+                    fake.sent += 1
+                status, payload = 200, {"id": str(uuid.uuid4())}
+            else:
+                status, payload = 404, {"statusCode": 404, "name": "not_found", "message": "not faked"}
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return start_server(Handler, host, port)
@@ -0,0 +1,445 @@
+"""
+In-memory stand-in for the parts of Supabase the backend uses.
+
+Implements just enough of PostgREST (select/embed, eq/neq/lt/lte/gt/gte/cs/ov/in
+filters, or=(...), order, limit, insert/upsert/update/delete, and the
+random_destinations / trip_summaries RPCs) plus the GoTrue admin user list, so
+the app can run against it unmodified with SUPABASE_URL pointed here.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fakes import start_server
+from urllib.parse import parse_qsl, urlsplit
+
+REGIONS = [
+    "Oceania", "East Asia", "Middle East", "South East Asia", "Europe",
+    "North America", "South America", "Central America", "Africa",
+]
+COUNTRIES = [
+    "Japan", "Thailand", "Italy", "Greece", "Spain", "Peru", "Chile", "Kenya", "Morocco",
+    "Canada", "Mexico", "Australia", "New Zealand", "Norway", "Iceland", "Vietnam",
+    "Indonesia", "Jordan", "Turkey", "Portugal", "Scotland", "Argentina", "Tanzania",
+]
+TAGS = [
+    "Beach", "Mountain", "Temple", "Hiking", "Food", "Culture", "Wildlife", "Island",
+    "Desert", "Skiing", "Lake", "City", "History", "Diving", "Nightlife", "Architecture",
+    "Waterfall", "Volcano", "Glacier", "Wine", "Market", "Safari", "Rainforest", "Castle",
+]
+
+# saved_destinations.destinations(...) embeds follow this foreign key
+EMBEDS = {("saved_destinations", "destinations"): ("destination_id", "id")}
+
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat(timespec="microseconds")
+
+
+def _normalized_tags(tags) -> list:
+    # Generated column from sql/destinations_browse_indexes.sql
+    return [tag.strip().lower() for tag in tags or []]
+
+
+def _words(rng: random.Random, count: int) -> str:
+    vocabulary = ("quiet", "ancient", "sunlit", "winding", "coastal", "alpine", "hidden", "vast",
+                  "trail", "harbour", "valley", "market", "terrace", "ridge", "lagoon", "village")
+    return " ".join(rng.choice(vocabulary) for _ in range(count))
+
+
+def _itinerary(rng: random.Random, start: datetime, days: int) -> list:
+    return [
+        {
+            "day": day + 1,
+            "date": (start + timedelta(days=day)).date().isoformat(),
+            "activities": [
+                {
+                    "time": f"{9 + 3 * slot:02d}:00",
+                    "title": _words(rng, 3).title(),
+                    "description": _words(rng, 18),
+                    "location": _words(rng, 2).title(),
+                    "country": rng.choice(COUNTRIES),
+                }
+                for slot in range(4)
+            ],
+        }
+        for day in range(days)
+    ]
+
+
+class FakeSupabase:
+    """Tables are lists of dict rows guarded by one lock; every response can be delayed by `latency` seconds."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables = {"destinations": [], "trips": [], "saved_destinations": []}
+        self.users = []
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._next_destination_id = 1
+
+    # --- seeding -------------------------------------------------------------
+
+    def seed(self, destinations: int = 500, users: int = 50, trips_per_user: int = 5,
+             saved_per_user: int = 10, trip_days: int = 7, seed: int = 1):
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+
+        for i in range(destinations):
+            created = now - timedelta(minutes=destinations - i)
+            self._insert_destination({
+                "name": f"{_words(rng, 2).title()} {i}",
+                "location": f"{_words(rng, 1).title()}, {rng.choice(COUNTRIES)}",
+                "description": _words(rng, 30),
+                "tags": rng.sample(TAGS, 4),
+                "image_url": f"https://images.example.com/{i}.jpg",
+                "image_prompt": _words(rng, 12),
+                "is_personalized": False,
+                "country": rng.choice(COUNTRIES),
+                "region": rng.sample(REGIONS, rng.choice((1, 1, 2))),
+                "created_at": _iso(created),
+                "updated_at": _iso(created),
+            })
+
+        destination_ids = [row["id"] for row in self.tables["destinations"]]
+        for u in range(users):
+            user_id = str(uuid.UUID(int=u + 1))
+            self.users.append({
+                "id": user_id,
+                "aud": "authenticated",
+                "role": "authenticated",
+                "email": f"traveler{u}@example.com",
+                "created_at": _iso(now),
+                "app_metadata": {},
+                "user_metadata": {
+                    "full_name": f"Traveler {u}",
+                    "subscribed_to_newsletter": u % 2 == 0,
+                },
+            })
+            for t in range(trips_per_user):
+                start = now + timedelta(days=30 + t * 10)
+                itinerary = _itinerary(rng, start, trip_days)
+                self.tables["trips"].append({
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "trip_name": f"Trip {t} to {rng.choice(COUNTRIES)}",
+                    "destination": rng.choice(COUNTRIES),
+                    "start_date": start.date().isoformat(),
+                    "end_date": (start + timedelta(days=trip_days - 1)).date().isoformat(),
+                    "currency": "SGD",
+                    "budget_range": "mid",
+                    "budget_amount": rng.choice((2000, 4000, 8000)),
+                    "companions": rng.choice(("solo", "couple", "family", "friends")),
+                    "number_of_people": rng.choice((1, 2, 4)),
+                    "specific_destinations": [],
+                    "itinerary": itinerary,
+                    "countries": sorted({a["country"] for d in itinerary for a in d["activities"]}),
+                    "created_at": _iso(now - timedelta(hours=t)),
+                    "version": 1,
+                })
+            for destination_id in rng.sample(destination_ids, min(saved_per_user, len(destination_ids))):
+                self.tables["saved_destinations"].append({
+                    "user_id": user_id,
+                    "destination_id": destination_id,
+                    "created_at": _iso(now - timedelta(minutes=rng.randint(1, 10000))),
+                })
+
+    def _insert_destination(self, row: dict) -> dict:
+        row = dict(row)
+        row["id"] = self._next_destination_id
+        self._next_destination_id += 1
+        now = _iso(datetime.now(timezone.utc))
+        row.setdefault("created_at", now)
+        row.setdefault("updated_at", now)
+        row["tags_normalized"] = _normalized_tags(row.get("tags"))
+        self.tables["destinations"].append(row)
+        return row
+
+    # --- PostgREST ------------------------------------------------------------
+
+    def select(self, table: str, params: list) -> list:
+        rows = [row for row in self.tables[table] if _matches(row, params)]
+        for column, descending in reversed(_order(params)):
+            rows.sort(key=lambda row: _sort_key(row.get(column)), reverse=descending)
+        limit = _param(params, "limit")
+        if limit is not None:
+            rows = rows[:int(limit)]
+        return [self._project(table, row, _param(params, "select") or "*") for row in rows]
+
+    def _project(self, table: str, row: dict, select: str) -> dict:
+        result = {}
+        for column in _split_top_level(select):
+            column = column.strip()
+            if column == "*":
+                result.update(row)
+            elif "(" in column:
+                embedded, inner = column[:-1].split("(", 1)
+                local_key, remote_key = EMBEDS[(table, embedded)]
+                match = next((r for r in self.tables[embedded] if r.get(remote_key) == row.get(local_key)), None)
+                result[embedded] = self._project(embedded, match, inner) if match else None
+            else:
+                result[column] = row.get(column)
+        return result
+
+    def insert(self, table: str, body, upsert: bool) -> list:
+        rows = body if isinstance(body, list) else [body]
+        created = []
+        for row in rows:
+            row = dict(row)
+            if table == "destinations":
+                created.append(self._insert_destination(row))
+                continue
+            if table == "trips":
+                if not row.get("id"):
+                    row["id"] = str(uuid.uuid4())
+                existing = next((r for r in self.tables["trips"] if r["id"] == row["id"]), None)
+                if existing is not None and upsert:
+                    existing.update(row)
+                    existing["version"] = existing.get("version", 1) + 1
+                    created.append(existing)
+                    continue
+                row.setdefault("version", 1)
+            row.setdefault("created_at", _iso(datetime.now(timezone.utc)))
+            self.tables[table].append(row)
+            created.append(row)
+        return created
+
+    def update(self, table: str, params: list, changes: dict) -> list:
+        updated = []
+        for row in self.tables[table]:
+            if _matches(row, params):
+                row.update(changes)
+                if table == "trips":
+                    row["version"] = row.get("version", 1) + 1
+                if table == "destinations":
+                    row["updated_at"] = _iso(datetime.now(timezone.utc))
+                    row["tags_normalized"] = _normalized_tags(row.get("tags"))
+                updated.append(row)
+        return updated
+
+    def delete(self, table: str, params: list) -> list:
+        kept, removed = [], []
+        for row in self.tables[table]:
+            (removed if _matches(row, params) else kept).append(row)
+        self.tables[table] = kept
+        return removed
+
+    def rpc(self, name: str, args: dict, params: list) -> list:
+        if name == "random_destinations":
+            exclude = {str(i) for i in args.get("exclude_ids") or []}
+            candidates = [r for r in self.tables["destinations"] if str(r["id"]) not in exclude]
+            sample = random.sample(candidates, min(int(args.get("sample_size", 4)), len(candidates)))
+            select = _param(params, "select") or "*"
+            return [self._project("destinations", row, select) for row in sample]
+        if name == "trip_summaries":
+            trips = [t for t in self.tables["trips"] if t["user_id"] == args.get("p_user_id")]
+            trips.sort(key=lambda t: t["created_at"], reverse=True)
+            summaries = []
+            for trip in trips:
+                summary = {k: v for k, v in trip.items() if k not in ("itinerary", "specific_destinations", "version")}
+                itinerary = trip.get("itinerary") or []
+                summary["day_count"] = len(itinerary)
+                summary["activity_count"] = sum(len(d.get("activities") or []) for d in itinerary)
+                summaries.append(summary)
+            return summaries
+        raise KeyError(name)
+
+    def handle(self, method: str, path: str, query: str, headers, body):
+        """Return (status, payload) for one request."""
+        params = parse_qsl(query, keep_blank_values=True)
+        parts = path.strip("/").split("/")
+        prefer = headers.get("Prefer", "")
+
+        with self._lock:
+            self.requests += 1
+            if parts[:2] == ["auth", "v1"]:
+                if method == "GET" and parts[2:4] == ["admin", "users"]:
+                    page = int(_param(params, "page") or 1)
+                    per_page = int(_param(params, "per_page") or 50)
+                    return 200, {"users": self.users[(page - 1) * per_page:page * per_page], "aud": "authenticated"}
+                if method == "DELETE" and parts[2:4] == ["admin", "users"]:
+                    self.users = [u for u in self.users if u["id"] != parts[4]]
+                    return 200, {}
+                return 404, {"message": "not implemented in fake"}
+
+            if parts[:2] != ["rest", "v1"]:
+                return 404, {"message": "not implemented in fake"}
+
+            if parts[2] == "rpc":
+                try:
+                    return 200, self.rpc(parts[3], body or {}, params)
+                except KeyError:
+                    return 404, {"code": "PGRST202", "message": f"function {parts[3]} not found"}
+
+            table = parts[2]
+            if table not in self.tables:
+                return 404, {"code": "42P01", "message": f"relation {table} does not exist"}
+            if method == "GET":
+                return 200, self.select(table, params)
+            if method == "POST":
+                rows = self.insert(table, body, upsert="merge-duplicates" in prefer)
+            elif method == "PATCH":
+                rows = self.update(table, params, body or {})
+            elif method == "DELETE":
+                rows = self.delete(table, params)
+            else:
+                return 405, {"message": "method not allowed"}
+            if "return=representation" in prefer:
+                return 201 if method == "POST" else 200, rows
+            return 201 if method == "POST" else 204, None
+
+
+# --- PostgREST query parsing --------------------------------------------------
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "or", "and", "on_conflict", "columns"}
+
+
+def _param(params: list, name: str):
+    for key, value in params:
+        if key == name:
+            return value
+    return None
+
+
+def _order(params: list) -> list:
+    spec = _param(params, "order")
+    if not spec:
+        return []
+    order = []
+    for item in spec.split(","):
+        column, _, direction = item.partition(".")
+        order.append((column, direction.startswith("desc")))
+    return order
+
+
+def _split_top_level(text: str) -> list:
+    """Split on commas that are not inside parentheses, braces or quotes."""
+    items, depth, quoted, current = [], 0, False, ""
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch in "({":
+            depth += 1
+        elif not quoted and ch in ")}":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            items.append(current)
+            current = ""
+        else:
+            current += ch
+    if current:
+        items.append(current)
+    return items
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+def _list_value(value: str) -> list:
+    return [_unquote(v.strip()) for v in _split_top_level(value.strip("{}()"))]
+
+
+def _coerce(filter_value: str, row_value):
+    if isinstance(row_value, bool):
+        return filter_value == "true"
+    if isinstance(row_value, int):
+        try:
+            return int(filter_value)
+        except ValueError:
+            return filter_value
+    return filter_value
+
+
+def _sort_key(value):
+    return (value is None, value if value is not None else 0)
+
+
+def _compare(row_value, op: str, raw: str) -> bool:
+    if op in ("cs", "ov"):
+        wanted = _list_value(raw)
+        have = row_value or []
+        return all(w in have for w in wanted) if op == "cs" else any(w in have for w in wanted)
+    if op == "in":
+        return str(row_value) in _list_value(raw)
+    if op == "is":
+        return row_value is None if raw == "null" else str(row_value).lower() == raw
+    value = _coerce(_unquote(raw), row_value)
+    if row_value is None:
+        return False
+    try:
+        return {
+            "eq": lambda: row_value == value,
+            "neq": lambda: row_value != value,
+            "lt": lambda: row_value < value,
+            "lte": lambda: row_value <= value,
+            "gt": lambda: row_value > value,
+            "gte": lambda: row_value >= value,
+        }[op]()
+    except TypeError:
+        return str(row_value) == str(value) if op == "eq" else False
+
+
+def _condition(row: dict, expression: str) -> bool:
+    """Evaluate one or=(...) element: "col.op.value", "and(...)" or "or(...)"."""
+    if expression.startswith(("and(", "or(")):
+        combinator, inner = expression.split("(", 1)
+        results = [_condition(row, part) for part in _split_top_level(inner[:-1])]
+        return all(results) if combinator == "and" else any(results)
+    column, op, raw = expression.split(".", 2)
+    return _compare(row.get(column), op, raw)
+
+
+def _matches(row: dict, params: list) -> bool:
+    for key, value in params:
+        if key in ("or", "and"):
+            parts = _split_top_level(value[1:-1])
+            results = [_condition(row, part) for part in parts]
+            if not (any(results) if key == "or" else all(results)):
+                return False
+        elif key not in RESERVED_PARAMS:
+            op, _, raw = value.partition(".")
+            negate = op == "not"
+            if negate:
+                op, _, raw = raw.partition(".")
+            if _compare(row.get(key), op, raw) == negate:
+                return False
+    return True
+
+
+# --- HTTP server ----------------------------------------------------------------
+
+def serve(fake: FakeSupabase, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start serving `fake` on a background thread and return the server (see .server_address)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _handle(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                body = None
+            url = urlsplit(self.path)
+            if fake.latency:
+                time.sleep(fake.latency)
+            status, payload = fake.handle(self.command, url.path, url.query, self.headers, body)
+            data = json.dumps(payload).encode() if payload is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = do_PUT = _handle
+
+        def log_message(self, *args):
+            pass
+
+    return start_server(Handler, host, port)
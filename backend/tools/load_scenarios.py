@@ -0,0 +1,223 @@
+"""
+Load scenarios, one per user journey, covering every route of the API.
+
+Each scenario is a function (session, data, rng) that makes one iteration of
+requests through `session.request(label, ...)`; the runner calls it in a loop
+from several threads and reports latency per label. `data` is the seeded
+Dataset, so scenarios can pick real user, trip and destination ids.
+"""
+import time
+import uuid
+from datetime import date, timedelta
+from urllib.parse import quote, urlencode
+
+SCENARIOS = {}
+
+
+class Scenario:
+    def __init__(self, name: str, run, description: str, concurrency: int = None):
+        self.name = name
+        self.run = run
+        self.description = description
+        # Fixed concurrency for endpoints that are never hit in parallel (e.g. cron jobs)
+        self.concurrency = concurrency
+
+
+def scenario(name: str, description: str, concurrency: int = None):
+    def register(fn):
+        SCENARIOS[name] = Scenario(name, fn, description, concurrency)
+        return fn
+    return register
+
+
+class Dataset:
+    """Ids seeded into the fake database, for scenarios to pick from."""
+
+    def __init__(self, fake_supabase):
+        tables = fake_supabase.tables
+        self.user_ids = [user["id"] for user in fake_supabase.users]
+        self.destination_ids = [row["id"] for row in tables["destinations"]]
+        self.trip_ids = {}
+        for trip in tables["trips"]:
+            self.trip_ids.setdefault(trip["user_id"], []).append(trip["id"])
+        self.tags = sorted({tag for row in tables["destinations"] for tag in row.get("tags") or []})
+        self.countries = sorted({row["country"] for row in tables["destinations"] if row.get("country")})
+        self.regions = sorted({r for row in tables["destinations"] for r in row.get("region") or []})
+
+
+def trip_request(rng, days: int = 5, destination: str = None, unique: bool = False) -> dict:
+    """A generate/questions request body. `unique` defeats the itinerary cache so Gemini is called."""
+    start = date.today() + timedelta(days=rng.randint(30, 200))
+    destination = destination or rng.choice(("Japan", "Italy", "Peru", "Kenya", "Iceland", "Vietnam"))
+    if unique:
+        destination = f"{destination} {uuid.uuid4().hex[:8]}"
+    return {
+        "destination": destination,
+        "startDate": start.isoformat(),
+        "endDate": (start + timedelta(days=days - 1)).isoformat(),
+        "currency": "SGD",
+        "budgetAmount": rng.choice((2000, 4000, 8000)),
+        "companions": rng.choice(("solo", "couple", "family", "friends")),
+        "numberOfPeople": rng.choice((1, 2, 4)),
+        "specificDestinations": [],
+    }
+
+
+# --- destinations ----------------------------------------------------------------
+
+@scenario("browse", "Catalog browsing: first page, two cursor pages, a filtered page and a 304 revalidation")
+def browse(session, data, rng):
+    status, headers, body = session.request("GET /api/destinations", "GET", "/api/destinations?limit=20")
+    cursor = body.get("nextCursor") if status == 200 else None
+    for _ in range(2):
+        if not cursor:
+            break
+        status, _, body = session.request("GET /api/destinations?cursor", "GET", f"/api/destinations?limit=20&cursor={quote(cursor)}")
+        cursor = body.get("nextCursor") if status == 200 else None
+
+    filters = rng.choice((
+        {"region": rng.choice(data.regions)},
+        {"country": rng.choice(data.countries)},
+        {"tag": rng.choice(data.tags).lower()},
+    ))
+    session.request("GET /api/destinations?filter", "GET", f"/api/destinations?limit=20&{urlencode(filters)}")
+
+    etag = headers.get("ETag")
+    if etag:
+        session.request("GET /api/destinations (If-None-Match)", "GET", "/api/destinations?limit=20",
+                        headers={"If-None-Match": etag}, ok=(304,))
+
+
+@scenario("random", "Shuffled deck: a new deck, its next page, and a page excluding seen ids")
+def random_deck(session, data, rng):
+    status, headers, body = session.request("GET /api/destinations/random", "GET",
+                                            f"/api/destinations/random?seed={rng.randint(1, 10 ** 6)}")
+    cursor = headers.get("X-Deck-Cursor")
+    if cursor:
+        session.request("GET /api/destinations/random?cursor", "GET", f"/api/destinations/random?cursor={quote(cursor)}")
+    exclude = ",".join(str(i) for i in rng.sample(data.destination_ids, min(8, len(data.destination_ids))))
+    session.request("GET /api/destinations/random?exclude", "GET", f"/api/destinations/random?exclude={exclude}")
+
+
+@scenario("personalized", "Tag-matched recommendations")
+def personalized(session, data, rng):
+    tags = ",".join(rng.sample(data.tags, 3))
+    session.request("GET /api/destinations/personalized", "GET", f"/api/destinations/personalized?tags={tags}")
+
+
+# --- trips and saved destinations ------------------------------------------------------
+
+@scenario("trips_read", "Trips page: full list, summary list and one trip")
+def trips_read(session, data, rng):
+    user_id = rng.choice(data.user_ids)
+    session.request("GET /api/trips", "GET", f"/api/trips?userId={user_id}")
+    session.request("GET /api/trips?view=summary", "GET", f"/api/trips?userId={user_id}&view=summary")
+    trips = data.trip_ids.get(user_id)
+    if trips:
+        session.request("GET /api/trips/<id>", "GET", f"/api/trips/{rng.choice(trips)}?userId={user_id}")
+
+
+@scenario("trips_write", "Trip lifecycle: create, replace, JSON Patch edit and delete")
+def trips_write(session, data, rng):
+    user_id = rng.choice(data.user_ids)
+    trip = trip_request(rng)
+    itinerary = [
+        {"day": n, "date": trip["startDate"], "activities": [
+            {"time": "09:00", "title": "Walk", "description": "Old town", "location": "Centre", "country": "Japan"}
+        ]}
+        for n in range(1, 6)
+    ]
+    trip.update(id=str(uuid.uuid4()), userId=user_id, tripName="Bench trip", itinerary=itinerary, countries=["Japan"])
+
+    status, _, saved = session.request("POST /api/trips", "POST", "/api/trips", trip, ok=(201,))
+    if status != 201:
+        return
+    trip_id = saved["id"]
+    status, _, updated = session.request("PUT /api/trips/<id>", "PUT", f"/api/trips/{trip_id}",
+                                         dict(trip, tripName="Renamed bench trip"))
+    version = updated.get("version") if status == 200 else None
+    session.request("PATCH /api/trips/<id>", "PATCH", f"/api/trips/{trip_id}", {
+        "operations": [{"op": "replace", "path": "/itinerary/0/activities/0/time", "value": "10:00"}],
+        "version": version,
+    })
+    session.request("DELETE /api/trips/<id>", "DELETE", f"/api/trips/{trip_id}")
+
+
+@scenario("saved", "Saved destinations: list, save and unsave")
+def saved(session, data, rng):
+    user_id = rng.choice(data.user_ids)
+    session.request("GET /api/saved-destinations", "GET", f"/api/saved-destinations?userId={user_id}")
+    body = {"userId": user_id, "destinationId": rng.choice(data.destination_ids)}
+    session.request("POST /api/saved-destinations", "POST", "/api/saved-destinations", body, ok=(201,))
+    session.request("DELETE /api/saved-destinations", "DELETE", "/api/saved-destinations", body)
+
+
+@scenario("delete_user", "Account deletion for a user with no data (does not shrink the dataset)")
+def delete_user(session, data, rng):
+    session.request("DELETE /api/user/<id>", "DELETE", f"/api/user/{uuid.uuid4()}")
+
+
+# --- itinerary (Gemini) ----------------------------------------------------------------------
+
+@scenario("questions", "Clarifying questions for a small set of destinations (mostly cache hits)")
+def questions(session, data, rng):
+    session.request("POST /api/itinerary/questions", "POST", "/api/itinerary/questions", trip_request(rng))
+
+
+@scenario("generate", "Itinerary generation: a 5-day cache miss followed by the same request (cache hit)")
+def generate(session, data, rng):
+    trip = trip_request(rng, days=5, unique=True)
+    session.request("POST /api/itinerary/generate (miss)", "POST", "/api/itinerary/generate", trip)
+    session.request("POST /api/itinerary/generate (hit)", "POST", "/api/itinerary/generate", trip)
+
+
+@scenario("generate_long", "Itinerary generation for a 21-day trip (outline plus parallel segments)")
+def generate_long(session, data, rng):
+    session.request("POST /api/itinerary/generate (21 days)", "POST", "/api/itinerary/generate",
+                    trip_request(rng, days=21, unique=True))
+
+
+@scenario("stream", "Streamed itinerary generation, read to the final event")
+def stream(session, data, rng):
+    session.request("POST /api/itinerary/generate/stream", "POST", "/api/itinerary/generate/stream",
+                    trip_request(rng, days=5, unique=True))
+
+
+@scenario("jobs", "Queued generation: submit, poll every 200ms until finished")
+def jobs(session, data, rng):
+    started = time.perf_counter()
+    status, _, body = session.request("POST /api/itinerary/jobs", "POST", "/api/itinerary/jobs",
+                                      trip_request(rng, days=5, unique=True), ok=(202,))
+    if status != 202:
+        return
+    while True:
+        time.sleep(0.2)
+        status, _, job = session.request("GET /api/itinerary/jobs/<id>", "GET", body["statusUrl"])
+        if status != 200 or job.get("status") in ("succeeded", "failed"):
+            break
+    session.record("job end-to-end", time.perf_counter() - started, status == 200 and job.get("status") == "succeeded")
+
+
+# --- newsletter (Resend) -------------------------------------------------------------------
+
+@scenario("newsletter", "Welcome and weekly emails to one subscriber")
+def newsletter(session, data, rng):
+    body = {"email": f"bench+{uuid.uuid4().hex[:8]}@example.com", "name": "Bench", "tags": rng.sample(data.tags, 2)}
+    session.request("POST /api/newsletter/welcome", "POST", "/api/newsletter/welcome", body)
+    session.request("POST /api/newsletter/send", "POST", "/api/newsletter/send", body)
+
+
+@scenario("send_all", "Weekly newsletter to every subscribed user (cron endpoint, run serially)", concurrency=1)
+def send_all(session, data, rng):
+    session.request("POST /api/newsletter/send-all", "POST", "/api/newsletter/send-all")
+
+
+# --- operational endpoints ------------------------------------------------------------------
+
+@scenario("ops", "Cache, queue and Prometheus endpoints")
+def ops(session, data, rng):
+    session.request("GET /api/destinations/cache-stats", "GET", "/api/destinations/cache-stats")
+    session.request("GET /api/itinerary/cache-stats", "GET", "/api/itinerary/cache-stats")
+    session.request("GET /api/itinerary/jobs/stats", "GET", "/api/itinerary/jobs/stats")
+    session.request("GET /metrics", "GET", "/metrics")
+
@@ -0,0 +1,121 @@
+"""
+Mixed-traffic load test: slow itinerary generations alongside fast destination reads.
+
+While `--slow` clients keep POSTing to /api/itinerary/generate, `--fast` clients hit
+GET /api/destinations/random as quickly as they can. The report shows the latency
+of the fast reads, which is what the serving mode is supposed to protect.
+
+Run from the backend folder against a running server, e.g.:
+    gunicorn -c /dev/null -b 0.0.0.0:5001 app:app  # before: one sync worker
+    gunicorn -c gunicorn.conf.py app:app           # after: threaded workers
+    python tools/load_test_mixed.py --base-url http://127.0.0.1:5001
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+TRIP = {
+    "destination": "Japan",
+    "startDate": "2026-04-01",
+    "endDate": "2026-04-07",
+    "currency": "SGD",
+    "budgetAmount": 4000,
+    "companions": "couple",
+}
+
+
+def timed_request(request: urllib.request.Request, timeout: float) -> tuple:
+    """Return (seconds, HTTP status or None on a connection error)."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = None
+    return time.perf_counter() - start, status
+
+
+def percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(base_url: str, duration: float, slow_clients: int, fast_clients: int, timeout: float):
+    stop = threading.Event()
+    results = {"fast": [], "slow": []}
+    errors = {"fast": 0, "slow": 0}
+    lock = threading.Lock()
+
+    def worker(kind: str):
+        while not stop.is_set():
+            if kind == "slow":
+                request = urllib.request.Request(
+                    f"{base_url}/api/itinerary/generate",
+                    data=json.dumps(TRIP).encode(),
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                )
+            else:
+                request = urllib.request.Request(f"{base_url}/api/destinations/random")
+
+            seconds, status = timed_request(request, timeout)
+            with lock:
+                if status is None:
+                    errors[kind] += 1
+                else:
+                    results[kind].append(seconds)
+
+    threads = [threading.Thread(target=worker, args=("slow",), daemon=True) for _ in range(slow_clients)]
+    # Let the slow calls occupy the server before measuring the fast path
+    for t in threads:
+        t.start()
+    time.sleep(0.5)
+
+    fast_threads = [threading.Thread(target=worker, args=("fast",), daemon=True) for _ in range(fast_clients)]
+    for t in fast_threads:
+        t.start()
+
+    time.sleep(duration)
+    stop.set()
+    for t in threads + fast_threads:
+        t.join(timeout=timeout)
+
+    # A blocked server shows up as a few very slow requests followed by a burst of
+    # fast ones, which per-request percentiles hide; count the stalls separately
+    print(f"{'traffic':<8} {'requests':>8} {'errors':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'>1s':>5}")
+    for kind in ("fast", "slow"):
+        samples = results[kind]
+        print(
+            f"{kind:<8} {len(samples):>8} {errors[kind]:>6} {len(samples) / duration:>7.1f} "
+            f"{percentile(samples, 50) * 1000:>8.0f} {percentile(samples, 95) * 1000:>8.0f} "
+            f"{percentile(samples, 99) * 1000:>8.0f} {(max(samples) if samples else 0) * 1000:>8.0f} "
+            f"{sum(1 for s in samples if s > 1):>5}"
+        )
+    if results["fast"]:
+        print(f"\nfast-path mean: {statistics.mean(results['fast']) * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5001")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of fast traffic to measure")
+    parser.add_argument("--slow", type=int, default=2, help="concurrent itinerary generations")
+    parser.add_argument("--fast", type=int, default=4, help="concurrent destination readers")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    run(args.base_url.rstrip("/"), args.duration, args.slow, args.fast, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
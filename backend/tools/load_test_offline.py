@@ -0,0 +1,355 @@
+"""
+Offline load test: boot the API under gunicorn against local fakes and measure every route.
+
+Starts in-memory stand-ins for Supabase (PostgREST + auth admin), Gemini and
+Resend (see tools/fakes), seeds N destinations, users and trips, then runs
+each scenario in tools/load_scenarios.py for --duration seconds with
+--concurrency clients and prints throughput and p50/p95/p99 latency per
+request. No credentials or network access are needed.
+
+Run from the backend folder:
+    python tools/load_test_offline.py                          # every scenario
+    python tools/load_test_offline.py browse trips_read -c 16  # some scenarios
+    python tools/load_test_offline.py --json baseline.json     # save results
+    python tools/load_test_offline.py --compare baseline.json  # exit 1 on a p95 regression
+
+Client threads and the fakes share this process, so absolute numbers on a
+small machine include some of their overhead; compare runs on the same host.
+"""
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fakes import gemini as fake_gemini
+from fakes import resend as fake_resend
+from fakes import supabase as fake_supabase
+from load_scenarios import SCENARIOS, Dataset
+from load_test_mixed import percentile
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# p95 differences below this are noise at any tolerance
+NOISE_FLOOR_MS = 5
+
+
+class Recorder:
+    """Latencies (seconds) and error counts per request label, shared by all client threads."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, label: str, seconds: float, ok: bool):
+        with self._lock:
+            self.samples.setdefault(label, [])
+            self.errors.setdefault(label, 0)
+            if ok:
+                self.samples[label].append(seconds)
+            else:
+                self.errors[label] += 1
+
+    def summary(self, duration: float) -> dict:
+        with self._lock:
+            return {
+                label: {
+                    "requests": len(samples),
+                    "errors": self.errors[label],
+                    "rps": round(len(samples) / duration, 2),
+                    "p50_ms": round(percentile(samples, 50) * 1000, 1),
+                    "p95_ms": round(percentile(samples, 95) * 1000, 1),
+                    "p99_ms": round(percentile(samples, 99) * 1000, 1),
+                    "max_ms": round((max(samples) if samples else 0) * 1000, 1),
+                }
+                for label, samples in self.samples.items()
+            }
+
+
+class Session:
+    """One keep-alive connection to the app, like a browser tab; not thread-safe."""
+
+    def __init__(self, host: str, port: int, recorder: Recorder, timeout: float):
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self.recorder = recorder
+        self._conn = None
+
+    def record(self, label: str, seconds: float, ok: bool):
+        self.recorder.record(label, seconds, ok)
+
+    def request(self, label: str, method: str, path: str, body=None, headers: dict = None, ok: tuple = (200,)) -> tuple:
+        """
+        Send one request and record its latency (to the last body byte) under `label`.
+
+        Returns:
+            (status, response headers, body) where body is decoded JSON for JSON
+            responses and bytes otherwise; status is 0 on a connection error.
+        """
+        request_headers = {"Accept-Encoding": "gzip"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            request_headers["Content-Type"] = "application/json"
+        request_headers.update(headers or {})
+
+        started = time.perf_counter()
+        for attempt in range(2):
+            reused = self._conn is not None
+            if not reused:
+                self._conn = http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+            try:
+                self._conn.request(method, path, body=payload, headers=request_headers)
+                response = self._conn.getresponse()
+                data = response.read()
+                break
+            except (OSError, http.client.HTTPException):
+                self._conn.close()
+                self._conn = None
+                # Like a browser, retry once when the server had already closed an idle keep-alive connection
+                if not reused or attempt:
+                    self.record(label, time.perf_counter() - started, False)
+                    return 0, {}, {}
+                started = time.perf_counter()
+        self.record(label, time.perf_counter() - started, response.status in ok)
+
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        if (response.getheader("Content-Type") or "").startswith("application/json"):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                pass
+        return response.status, response.headers, data
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+
+
+def run_scenario(scenario, data: Dataset, host: str, port: int, concurrency: int, duration: float,
+                 timeout: float, seed: int) -> tuple:
+    """Run `scenario` in a loop from `concurrency` threads. Returns (summary, iterations)."""
+    recorder = Recorder()
+    warmup = Recorder()
+    # Every client finishes its warm-up before the clock starts
+    ready = threading.Barrier(concurrency + 1)
+    stop = threading.Event()
+    iterations = [0]
+    lock = threading.Lock()
+
+    def client(index: int):
+        rng = random.Random(seed + index)
+        # One untimed iteration first so connection setup and cold caches are not measured
+        session = Session(host, port, warmup, timeout)
+        try:
+            scenario.run(session, data, rng)
+        except Exception as e:
+            print(f"⚠️ {scenario.name} warm-up failed: {e}", flush=True)
+        session.recorder = recorder
+        ready.wait()
+        while not stop.is_set():
+            try:
+                scenario.run(session, data, rng)
+            except Exception as e:
+                session.record(f"{scenario.name}: {type(e).__name__}", 0, False)
+            with lock:
+                iterations[0] += 1
+        session.close()
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    started = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join(timeout=timeout)
+    # In-flight iterations finish after the deadline, so divide by the real elapsed time
+    return recorder.summary(time.perf_counter() - started), iterations[0]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(port: int, env: dict, log_path: str, workers: int, threads: int):
+    """Start gunicorn with the production config and wait until it answers."""
+    env = dict(env, GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_WORKERS=str(workers),
+               GUNICORN_THREADS=str(threads), GUNICORN_LOG_LEVEL="warning")
+    log = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {process.returncode}; see {log_path}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/itinerary/jobs/stats")
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"gunicorn did not become ready; see {log_path}")
+
+
+def app_environment(supabase_port: int, gemini_port: int, resend_port: int, workdir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "SUPABASE_URL": f"http://127.0.0.1:{supabase_port}",
+        "SUPABASE_SERVICE_ROLE_KEY": "bench-service-role-key",
+        "GEMINI_API_KEY": "bench-gemini-key",
+        "GOOGLE_GEMINI_BASE_URL": f"http://127.0.0.1:{gemini_port}",
+        "RESEND_API_KEY": "re_bench",
+        "RESEND_API_URL": f"http://127.0.0.1:{resend_port}",
+        # Fresh caches, job records and metrics for every run
+        "ITINERARY_CACHE_PATH": os.path.join(workdir, "itinerary_cache.sqlite3"),
+        "ITINERARY_JOB_STORE_PATH": os.path.join(workdir, "itinerary_jobs.sqlite3"),
+        "PROMETHEUS_MULTIPROC_DIR": os.path.join(workdir, "prometheus"),
+    })
+    env.pop("QUESTIONS_CACHE_PATH", None)
+    return env
+
+
+def print_results(results: dict):
+    print(f"\n{'scenario / request':<48} {'requests':>8} {'errors':>6} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, result in results.items():
+        print(f"{name} ({result['concurrency']} clients, {result['iterations']} iterations)")
+        for label, stats in result["requests"].items():
+            print(f"  {label:<46} {stats['requests']:>8} {stats['errors']:>6} {stats['rps']:>8.1f} "
+                  f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Requests whose p95 grew by more than `tolerance` (and the noise floor), or that now fail."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("scenarios", {}).get(name, {}).get("requests", {})
+        for label, stats in result["requests"].items():
+            old = before.get(label)
+            if old is None:
+                continue
+            if stats["errors"] > old["errors"] and stats["errors"] > 0.01 * (stats["requests"] + stats["errors"]):
+                regressions.append(f"{name} / {label}: {stats['errors']} errors (was {old['errors']})")
+            limit = old["p95_ms"] * (1 + tolerance)
+            if stats["p95_ms"] > limit and stats["p95_ms"] - old["p95_ms"] > NOISE_FLOOR_MS:
+                regressions.append(f"{name} / {label}: p95 {stats['p95_ms']:.1f} ms (was {old['p95_ms']:.1f} ms)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="concurrent clients per scenario")
+    parser.add_argument("-d", "--duration", type=float, default=10, help="seconds to run each scenario")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+
+    data_group = parser.add_argument_group("dataset")
+    data_group.add_argument("--destinations", type=int, default=500)
+    data_group.add_argument("--users", type=int, default=50)
+    data_group.add_argument("--trips-per-user", type=int, default=5)
+    data_group.add_argument("--saved-per-user", type=int, default=10)
+
+    fakes_group = parser.add_argument_group("fakes")
+    fakes_group.add_argument("--db-latency", type=float, default=0.005, help="seconds added to every Supabase call")
+    fakes_group.add_argument("--gemini-ttft", type=float, default=0.5, help="seconds before Gemini's first token")
+    fakes_group.add_argument("--gemini-tps", type=float, default=200, help="Gemini output tokens per second")
+    fakes_group.add_argument("--gemini-words", type=int, default=20, help="words per generated description")
+    fakes_group.add_argument("--gemini-error-rate", type=float, default=0.0, help="fraction of Gemini calls answered 429")
+    fakes_group.add_argument("--email-latency", type=float, default=0.1, help="seconds per Resend call")
+
+    server_group = parser.add_argument_group("server")
+    server_group.add_argument("--workers", type=int, default=2, help="GUNICORN_WORKERS")
+    server_group.add_argument("--threads", type=int, default=16, help="GUNICORN_THREADS")
+
+    output_group = parser.add_argument_group("output")
+    output_group.add_argument("--json", metavar="PATH", help="write results as JSON")
+    output_group.add_argument("--compare", metavar="PATH", help="baseline JSON from an earlier --json run")
+    output_group.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth over the baseline")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"{name:<14} {scenario.description}")
+        return
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    selected = [SCENARIOS[name] for name in args.scenarios or SCENARIOS]
+
+    supabase = fake_supabase.FakeSupabase(latency=args.db_latency)
+    supabase.seed(destinations=args.destinations, users=args.users, trips_per_user=args.trips_per_user,
+                  saved_per_user=args.saved_per_user, seed=args.seed)
+    gemini = fake_gemini.FakeGemini(ttft=args.gemini_ttft, tokens_per_second=args.gemini_tps,
+                                    description_words=args.gemini_words, error_rate=args.gemini_error_rate,
+                                    seed=args.seed)
+    resend = fake_resend.FakeResend(latency=args.email_latency)
+    servers = [fake_supabase.serve(supabase), fake_gemini.serve(gemini), fake_resend.serve(resend)]
+    data = Dataset(supabase)
+
+    workdir = tempfile.mkdtemp(prefix="bucketgem_bench_")
+    log_path = os.path.join(workdir, "gunicorn.log")
+    port = free_port()
+    env = app_environment(*(server.server_address[1] for server in servers), workdir)
+    print(f"🚀 Booting the API on :{port} ({args.workers} workers x {args.threads} threads); log: {log_path}", flush=True)
+    app = start_app(port, env, log_path, args.workers, args.threads)
+
+    results = {}
+    try:
+        for scenario in selected:
+            concurrency = scenario.concurrency or args.concurrency
+            print(f"⏱️  {scenario.name}: {scenario.description} ({concurrency} clients, {args.duration:g}s)", flush=True)
+            summary, iterations = run_scenario(scenario, data, "127.0.0.1", port, concurrency,
+                                               args.duration, args.timeout, args.seed)
+            results[scenario.name] = {"concurrency": concurrency, "iterations": iterations, "requests": summary}
+    finally:
+        app.terminate()
+        app.wait(timeout=30)
+        for server in servers:
+            server.shutdown()
+
+    print_results(results)
+    print(f"\nFakes: {supabase.requests} Supabase requests, {gemini.calls} Gemini calls "
+          f"({gemini.output_tokens} output tokens), {resend.sent} emails")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "scenarios": results}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 
-import React, { useState, useEffect, useMemo, useCallback } from 'react';
+import React, { useState, useEffect, useMemo, useCallback, useRef } from 'react';
 import { createRoot } from 'react-dom/client';
 import * as Lucide from 'lucide-react';
 import type { User } from '@supabase/supabase-js';
@@ -10,7 +10,7 @@ import { HeroCarousel } from './src/components/HeroCarousel';
 import { Destination, DestinationCard } from './src/components/DestinationCard';
 import { Passport } from './src/components/Passport';
 import { TripPlanningForm, TripPlan } from './src/components/TripPlanningForm';
-import { Trips } from './src/components/Trips';
+import { Trips, TripSummary, toTripSummary } from './src/components/Trips';
 import { SignIn } from './src/auth/sign_in';
 import { Registration } from './src/auth/registration';
 import { About } from './src/components/About';
@@ -36,7 +36,7 @@ function VoyagerApp() {
   const [savedDestinations, setSavedDestinations] = useState<Destination[]>([]);
   const [currentView, setCurrentView] = useState<'explore' | 'passport' | 'tripForm' | 'trips' | 'signIn' | 'registration' | 'about' | 'profile'>('explore');
   const [mobileMenuOpen, setMobileMenuOpen] = useState(false);
-  const [trips, setTrips] = useState<TripPlan[]>([]);
+  const [trips, setTrips] = useState<TripSummary[]>([]);
   const [editingTripId, setEditingTripId] = useState<string | null>(null);
 
   // Track the currently logged-in user (null means not logged in)
@@ -202,10 +202,10 @@ function VoyagerApp() {
     }
   }, [user?.id]);
 
-  // Load trips from Supabase when user changes
+  // Load the trips list (summaries only; itineraries are fetched per trip) when user changes
   useEffect(() => {
     if (user) {
-      fetch(`${API_BASE_URL}/api/trips?userId=${user.id}`)
+      fetch(`${API_BASE_URL}/api/trips?userId=${user.id}&view=summary`)
         .then(res => res.ok ? res.json() : [])
         .then(data => setTrips(data))
         .catch(() => setTrips([]));
@@ -278,7 +278,7 @@ function VoyagerApp() {
         });
         if (res.ok) {
           const updated = await res.json();
-          setTrips(prev => prev.map(t => t.id === editingTripId ? updated : t));
+          setTrips(prev => prev.map(t => t.id === editingTripId ? toTripSummary(updated) : t));
         }
         setEditingTripId(null);
       } else {
@@ -290,7 +290,7 @@ function VoyagerApp() {
         });
         if (res.ok) {
           const saved = await res.json();
-          setTrips(prev => [saved, ...prev]);
+          setTrips(prev => [toTripSummary(saved), ...prev]);
         }
       }
     } catch (err) {
@@ -309,6 +309,18 @@ function VoyagerApp() {
     }
   }, []);
 
+  // Fetch one trip with its full itinerary (the trips list only holds summaries)
+  const loadTrip = useCallback(async (id: string): Promise<TripPlan | null> => {
+    if (!user) return null;
+    try {
+      const res = await fetch(`${API_BASE_URL}/api/trips/${id}?userId=${user.id}`);
+      return res.ok ? await res.json() : null;
+    } catch (err) {
+      console.error('Failed to load trip:', err);
+      return null;
+    }
+  }, [user?.id]);
+
   // Start a new trip - clears form cache and navigates to the form
   const handleNewTrip = useCallback(() => {
     if (user) {
@@ -375,16 +387,21 @@ function VoyagerApp() {
       .map(([tag]) => tag);          // Extract just the tag names
   }, [tagFrequency]);
 
+  // Cursor into the server's shuffled deck, so "shuffle" never repeats a destination
+  const deckCursorRef = useRef<string | null>(null);
+
   // Load random destinations (default behavior)
   const loadRandomDestinations = useCallback(async () => {
     setLoading(true);
     try {
-      const response = await fetch(`${API_BASE_URL}/api/destinations/random`);
+      const cursorParam = deckCursorRef.current ? `?cursor=${encodeURIComponent(deckCursorRef.current)}` : '';
+      const response = await fetch(`${API_BASE_URL}/api/destinations/random${cursorParam}`);
 
       if (!response.ok) {
         throw new Error('Network response was not ok');
       }
 
+      deckCursorRef.current = response.headers.get('X-Deck-Cursor');
       const data = await response.json();
       setDestinations(data);
     } catch (err) {
@@ -873,6 +890,7 @@ function VoyagerApp() {
             onDeleteTrip={handleTripDelete}
             onPlanTrip={handleNewTrip}
             onEditTrip={handleEditTrip}
+            onLoadTrip={loadTrip}
           />
         )}
 
@@ -7,7 +7,7 @@ export interface Destination {
   location: string;
   description: string;
   tags: string[];
-  imagePrompt: string;
+  imagePrompt?: string;  // Only sent by endpoints that select FULL_COLUMNS
   imageUrl?: string;
   isPersonalized: boolean;
   country?: string;  // Country where the destination is located
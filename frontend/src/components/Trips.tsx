@@ -1,13 +1,31 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import * as Lucide from 'lucide-react';
 import { Button } from './Button';
 import { TripPlan, ItineraryDay } from './TripPlanningForm';
 
+// A row of GET /api/trips?view=summary: the trip without its itinerary, plus counts
+export type TripSummary = Omit<TripPlan, 'itinerary' | 'specificDestinations'> & {
+  dayCount: number;
+  activityCount: number;
+};
+
+// Summarise a full trip (e.g. the response to a save) for the trips list
+export function toTripSummary(trip: TripPlan): TripSummary {
+  const { itinerary = [], specificDestinations: _, ...rest } = trip;
+  return {
+    ...rest,
+    dayCount: itinerary.length,
+    activityCount: itinerary.reduce((total, day) => total + (day.activities?.length || 0), 0),
+  };
+}
+
 interface TripsProps {
-  trips: TripPlan[];
+  trips: TripSummary[];
   onDeleteTrip: (id: string) => void;
   onPlanTrip: () => void;
   onEditTrip: (trip: TripPlan) => void;
+  // Fetches the full trip (with itinerary) when one is opened or edited
+  onLoadTrip: (id: string) => Promise<TripPlan | null>;
 }
 
 const CURRENCY_SYMBOLS: Record<string, string> = {
@@ -34,6 +52,11 @@ function calculateTotalBudget(budgetAmount: number, numberOfPeople: number | und
   return budgetAmount * (numberOfPeople || 1);
 }
 
+function getPlanDisplay(dayCount: number, activityCount: number): string {
+  const days = `${dayCount} ${dayCount === 1 ? 'day' : 'days'}`;
+  return `${days}, ${activityCount} ${activityCount === 1 ? 'activity' : 'activities'}`;
+}
+
 function getCompanionDisplay(companions: string, numberOfPeople: number | undefined): string {
   const label = COMPANION_LABELS[companions] || companions;
   if (companions === 'solo') {
@@ -45,11 +68,17 @@ function getCompanionDisplay(companions: string, numberOfPeople: number | undefi
 // Trip Detail Modal Component
 function TripDetailModal({
   trip,
+  itinerary,
+  loading,
+  failed,
   onClose,
   onEdit,
   onDelete
 }: {
-  trip: TripPlan;
+  trip: TripSummary;
+  itinerary: ItineraryDay[] | null;
+  loading: boolean;
+  failed: boolean;
   onClose: () => void;
   onEdit: () => void;
   onDelete: () => void;
@@ -142,15 +171,24 @@ function TripDetailModal({
             </div>
           </div>
 
-          {/* Itinerary */}
-          {trip.itinerary && trip.itinerary.length > 0 && (
+          {/* Itinerary (fetched when the modal opens) */}
+          {loading && (
+            <div className="flex items-center justify-center gap-2 py-6 text-slate-400 text-sm">
+              <Lucide.Loader2 className="w-5 h-5 animate-spin" />
+              Loading itinerary...
+            </div>
+          )}
+          {failed && (
+            <p className="text-sm text-rose-500 text-center py-6">Couldn't load the itinerary. Please try again.</p>
+          )}
+          {itinerary && itinerary.length > 0 && (
             <div>
               <div className="flex items-center gap-2 text-emerald-600 font-bold tracking-widest text-[10px] uppercase mb-3">
                 <Lucide.Route className="w-4 h-4" />
                 Itinerary
               </div>
               <div className="space-y-4">
-                {trip.itinerary.map((day: ItineraryDay) => (
+                {itinerary.map((day: ItineraryDay) => (
                   <div key={day.day} className="bg-slate-50 rounded-2xl p-4">
                     <div className="flex items-center gap-2 mb-3">
                       <span className="w-7 h-7 bg-emerald-500 text-white text-xs font-bold rounded-full flex items-center justify-center">
@@ -203,12 +241,37 @@ function TripDetailModal({
   );
 }
 
-export function Trips({ trips, onDeleteTrip, onPlanTrip, onEditTrip }: TripsProps) {
-  const [selectedTrip, setSelectedTrip] = useState<TripPlan | null>(null);
+export function Trips({ trips, onDeleteTrip, onPlanTrip, onEditTrip, onLoadTrip }: TripsProps) {
+  const [selectedTrip, setSelectedTrip] = useState<TripSummary | null>(null);
+  const [selectedDetail, setSelectedDetail] = useState<TripPlan | null>(null);
+  const [detailLoading, setDetailLoading] = useState(false);
+  const [detailFailed, setDetailFailed] = useState(false);
 
-  const handleEditTrip = (trip: TripPlan) => {
+  // The list only has summaries, so fetch the itinerary of the trip being viewed
+  useEffect(() => {
+    setSelectedDetail(null);
+    setDetailFailed(false);
+    if (!selectedTrip) return;
+
+    let cancelled = false;
+    setDetailLoading(true);
+    onLoadTrip(selectedTrip.id)
+      .then(detail => {
+        if (cancelled) return;
+        setSelectedDetail(detail);
+        setDetailFailed(detail === null);
+      })
+      .finally(() => { if (!cancelled) setDetailLoading(false); });
+    return () => { cancelled = true; };
+  }, [selectedTrip?.id, onLoadTrip]);
+
+  // Editing needs the full trip (specific destinations), which the summary doesn't carry
+  const handleEditTrip = async (trip: TripSummary) => {
+    const detail = selectedDetail?.id === trip.id ? selectedDetail : await onLoadTrip(trip.id);
     setSelectedTrip(null);
-    onEditTrip(trip);
+    if (detail) {
+      onEditTrip(detail);
+    }
   };
 
   const handleDeleteTrip = (tripId: string) => {
@@ -321,6 +384,12 @@ export function Trips({ trips, onDeleteTrip, onPlanTrip, onEditTrip }: TripsProp
                     <Lucide.Users className="w-4 h-4 text-slate-400 shrink-0" />
                     <span>{getCompanionDisplay(trip.companions, trip.numberOfPeople)}</span>
                   </div>
+                  {trip.dayCount > 0 && (
+                    <div className="flex items-center gap-3 text-slate-600">
+                      <Lucide.Route className="w-4 h-4 text-slate-400 shrink-0" />
+                      <span>{getPlanDisplay(trip.dayCount, trip.activityCount)}</span>
+                    </div>
+                  )}
                 </div>
               </div>
             );
@@ -333,6 +402,9 @@ export function Trips({ trips, onDeleteTrip, onPlanTrip, onEditTrip }: TripsProp
       {selectedTrip && (
         <TripDetailModal
           trip={selectedTrip}
+          itinerary={selectedDetail ? selectedDetail.itinerary || [] : null}
+          loading={detailLoading}
+          failed={detailFailed}
           onClose={() => setSelectedTrip(null)}
           onEdit={() => handleEditTrip(selectedTrip)}
           onDelete={() => handleDeleteTrip(selectedTrip.id)}